@@ -0,0 +1,34 @@
+"""Index article favorites by user.
+
+Revision ID: 3f1c2b9d7e41
+Revises: aaddef142d08
+Create Date: 2026-10-19 09:12:31.504127
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3f1c2b9d7e41"
+down_revision: Union[str, None] = "aaddef142d08"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # the primary key leads with article_id, so loading one user's favorites
+    # would otherwise scan the whole table
+    op.create_index(
+        "ix_article_favorites_user_id_article_id",
+        "article_favorites",
+        ["user_id", "article_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_article_favorites_user_id_article_id", table_name="article_favorites"
+    )
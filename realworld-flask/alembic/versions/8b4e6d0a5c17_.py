@@ -0,0 +1,57 @@
+"""Add follower and following counters to users.
+
+Revision ID: 8b4e6d0a5c17
+Revises: 3f1c2b9d7e41
+Create Date: 2026-10-19 10:03:52.118934
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8b4e6d0a5c17"
+down_revision: Union[str, None] = "3f1c2b9d7e41"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "users",
+        sa.Column(
+            "followers_count", sa.Integer(), nullable=False, server_default="0"
+        ),
+    )
+    op.add_column(
+        "users",
+        sa.Column(
+            "following_count", sa.Integer(), nullable=False, server_default="0"
+        ),
+    )
+
+    # the primary key leads with user_id, counting followers needs the reverse
+    op.create_index(
+        "ix_user_follows_following_user_id", "user_follows", ["following_user_id"]
+    )
+
+    op.execute(
+        """
+        UPDATE users u
+        SET followers_count = (
+                SELECT COUNT(*) FROM user_follows f WHERE f.following_user_id = u.id
+            ),
+            following_count = (
+                SELECT COUNT(*) FROM user_follows f WHERE f.user_id = u.id
+            )
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_user_follows_following_user_id", table_name="user_follows")
+    op.drop_column("users", "following_count")
+    op.drop_column("users", "followers_count")
@@ -0,0 +1,4 @@
+import time
+
+# Reference point for the startup timing reported by create_app
+IMPORT_STARTED_AT = time.perf_counter()
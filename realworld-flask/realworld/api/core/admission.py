@@ -0,0 +1,81 @@
+import time
+import threading
+import typing as typ
+from collections import Counter
+
+# Priority classes, health checks are never queued or shed
+HEALTH = "health"
+WRITE = "write"
+READ = "read"
+
+
+class AdmissionController:
+    """
+    Bounds the number of in-flight database-bound requests to what the connection pool can
+    serve. A request over the limit waits up to `queue_timeout` seconds in a bounded queue
+    and is shed otherwise, instead of holding a worker thread for the full pool timeout.
+    Reads may only use `max_in_flight - write_reserve` slots so writes keep some headroom.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int,
+        write_reserve: int,
+        queue_timeout: float,
+        max_queue: int,
+    ):
+        self.max_in_flight = max_in_flight
+        self.queue_timeout = queue_timeout
+        self.max_queue = max_queue
+        self._limits = {
+            WRITE: max_in_flight,
+            READ: max(1, max_in_flight - write_reserve),
+        }
+        self._in_flight = 0
+        self._queued = 0
+        self._admitted: typ.Counter[str] = Counter()
+        self._shed: typ.Counter[str] = Counter()
+        self._cond = threading.Condition()
+
+    def acquire(self, priority: str) -> bool:
+        """Admit the request (possibly after queueing), False when it should be rejected"""
+        if priority == HEALTH:
+            return True
+
+        limit = self._limits[priority]
+        with self._cond:
+            if self._in_flight >= limit:
+                if self._queued >= self.max_queue:
+                    self._shed[priority] += 1
+                    return False
+
+                deadline = time.monotonic() + self.queue_timeout
+                self._queued += 1
+                try:
+                    while self._in_flight >= limit:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self._shed[priority] += 1
+                            return False
+                        self._cond.wait(remaining)
+                finally:
+                    self._queued -= 1
+
+            self._in_flight += 1
+            self._admitted[priority] += 1
+            return True
+
+    def release(self) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            # waiters have different limits, wake all of them to re-check
+            self._cond.notify_all()
+
+    def metrics(self) -> dict:
+        return {
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self._in_flight,
+            "queued": self._queued,
+            "admitted": dict(self._admitted),
+            "shed": dict(self._shed),
+        }
@@ -39,6 +39,12 @@ def _decode_jwt(token: str) -> typ.Tuple[bool, typ.Union[dict, str]]:
         return False, "Unknown token error."
 
 
+def get_token_cache_info() -> dict:
+    """Size and hit rate of the decoded-token cache of this process"""
+    info = _decode_jwt.cache_info()
+    return {"entries": info.currsize, "max_entries": info.maxsize, "hits": info.hits, "misses": info.misses}
+
+
 def _get_token_from_request() -> typ.Optional[str]:
     encoded_token = request.headers.get("Authorization")
     if not encoded_token:
@@ -66,7 +72,16 @@ def validate_token(func):
 
 
 def get_user_id_from_token() -> typ.Optional[str]:
-    is_valid, decoded = _decode_jwt(_get_token_from_request())
+    return get_user_id_from_authorization(request.headers.get("Authorization"))
+
+
+def get_user_id_from_authorization(authorization: typ.Optional[str]) -> typ.Optional[str]:
+    """User id from an Authorization header value, for callers outside a Flask request"""
+    if not authorization:
+        return None
+
+    # Authorization: Token <token>
+    is_valid, decoded = _decode_jwt(authorization.split(" ")[1])
     if is_valid:
         return decoded.get("user_id")
     return None
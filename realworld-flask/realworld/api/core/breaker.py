@@ -0,0 +1,104 @@
+import time
+import logging
+import threading
+import typing as typ
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of attempting a call while the circuit is open"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Circuit '{name}' is open, retry in {retry_after:.1f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Closed: calls go through, `failure_threshold` consecutive failures open the circuit.
+    Open: calls fail fast with CircuitOpenError for `reset_timeout` seconds.
+    Half-open: a single trial call is let through, its outcome closes or re-opens the circuit.
+    A trial that has not reported back after `reset_timeout` seconds is abandoned for a new one.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.transitions: typ.Counter[str] = Counter()
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._trial_started_at = 0.0
+        self._lock = threading.Lock()
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError unless the caller may attempt the call"""
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            retry_after = self._opened_at + self.reset_timeout - time.monotonic()
+            if self.state == OPEN and retry_after <= 0:
+                self._transition(HALF_OPEN)
+            if self.state == HALF_OPEN and self._trial_available():
+                self._trial_in_flight = True
+                self._trial_started_at = time.monotonic()
+                return
+            raise CircuitOpenError(self.name, max(retry_after, 1.0))
+
+    def allows_calls(self) -> bool:
+        """Non-consuming check, e.g. to skip a replica while its circuit is open"""
+        with self._lock:
+            return (
+                self.state == CLOSED
+                or (self.state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout)
+                or (self.state == HALF_OPEN and self._trial_available())
+            )
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._trial_in_flight = False
+            if self.state != CLOSED:
+                self._transition(CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self.state == HALF_OPEN or (
+                self.state == CLOSED and self._failures >= self.failure_threshold
+            ):
+                self._opened_at = time.monotonic()
+                self._transition(OPEN)
+
+    def metrics(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "transitions": dict(self.transitions),
+        }
+
+    def _trial_available(self) -> bool:
+        if not self._trial_in_flight:
+            return True
+        # a trial that never reported back (e.g. it timed out waiting for the pool or raised
+        # something other than a database error) must not keep the circuit half-open forever
+        if time.monotonic() - self._trial_started_at > self.reset_timeout:
+            logger.warning(f"Circuit '{self.name}' trial call did not report back, allowing another")
+            self._trial_in_flight = False
+            return True
+        return False
+
+    def _transition(self, state: str) -> None:
+        logger.warning(f"Circuit '{self.name}' {self.state} -> {state}")
+        self.transitions[f"{self.state}->{state}"] += 1
+        self.state = state
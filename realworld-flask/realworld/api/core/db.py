@@ -1,12 +1,24 @@
 import os
+import re
 import logging
+import hashlib
+import threading
 import typing as typ
-from sqlalchemy import create_engine, text
+from flask import current_app, g, request, has_request_context
+from itsdangerous import BadSignature, Signer
+from sqlalchemy import create_engine, event, text, bindparam, Uuid
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.sql.elements import BindParameter
 from sqlalchemy.pool import QueuePool
 from contextlib import contextmanager
+from functools import lru_cache
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.orm.session import Session, Connection
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import SQLAlchemyError, TimeoutError as PoolTimeoutError
+from realworld.api.core.breaker import CircuitBreaker, CircuitOpenError
+from realworld.api.core.metrics import HistogramFamily
+from realworld.api.core.query_budget import record_statement
+from realworld.api.core.tracing import record_statement_span
 import time
 
 logger = logging.getLogger(__name__)
@@ -15,21 +27,63 @@ logger = logging.getLogger(__name__)
 def get_database_config():
     """Get database configuration based on environment"""
     environment = os.getenv('FLASK_ENV', 'production')
+    pool_size, read_pool_size = _split_pool('DB_READ_POOL_SIZE', int(os.getenv('DB_POOL_SIZE', '10')), minimum=1)
+    max_overflow, read_max_overflow = _split_pool('DB_READ_MAX_OVERFLOW', int(os.getenv('DB_MAX_OVERFLOW', '20')), minimum=0)
     
     config = {
-        'pool_size': int(os.getenv('DB_POOL_SIZE', '10')),
-        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', '20')),
+        'pool_size': pool_size,
+        'max_overflow': max_overflow,
         'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', '30')),
         'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', '3600')),
-        'echo': environment == 'development' and os.getenv('DB_ECHO', 'False').lower() == 'true'
+        'echo': environment == 'development' and os.getenv('DB_ECHO', 'False').lower() == 'true',
+        # 'psycopg2' (default) or 'psycopg' for psycopg 3
+        'driver': os.getenv('DB_DRIVER', 'psycopg2').lower(),
+        # psycopg 3 only: prepare a statement server-side after it ran this many times (-1 disables)
+        'prepare_threshold': int(os.getenv('DB_PREPARE_THRESHOLD', '5')),
+        # Read replicas: comma separated host[:port] list sharing the primary's credentials
+        'replica_hosts': [h.strip() for h in os.getenv('DB_REPLICA_HOSTS', '').split(',') if h.strip()],
+        'replica_max_lag': float(os.getenv('DB_REPLICA_MAX_LAG_SECONDS', '5')),
+        'replica_lag_check_interval': float(os.getenv('DB_REPLICA_LAG_CHECK_INTERVAL', '5')),
+        # How long a client's reads stay on the primary after it wrote something
+        'read_your_writes_window': float(os.getenv('DB_READ_YOUR_WRITES_SECONDS', '10')),
+        # Separate pool of read-only autocommit connections to the primary
+        'read_pool_size': read_pool_size,
+        'read_max_overflow': read_max_overflow,
+        # Circuit breaker per database server: fail fast with 503 instead of blocking workers
+        'breaker_failure_threshold': int(os.getenv('DB_BREAKER_FAILURE_THRESHOLD', '5')),
+        'breaker_reset_timeout': float(os.getenv('DB_BREAKER_RESET_TIMEOUT', '10')),
+        # Test pooled connections on checkout (one extra round trip) instead of failing the first request after a failover
+        'pool_pre_ping': os.getenv('DB_POOL_PRE_PING', 'False').lower() == 'true',
+        # Statements slower than this are logged with their route
+        'slow_query_ms': float(os.getenv('DB_SLOW_QUERY_MS', '500')),
+        # Background health probe on its own connection, /api/ready and /api/metrics read its cached result
+        'health_probe_interval': float(os.getenv('DB_HEALTH_PROBE_INTERVAL', '5')),
+        'health_probe_timeout': float(os.getenv('DB_HEALTH_PROBE_TIMEOUT', '2')),
     }
     
     return config
 
-def get_database_url():
-    """Get database URL with proper configuration"""
+def _split_pool(read_variable: str, total: int, minimum: int) -> typ.Tuple[int, int]:
+    """
+    (write, read) pool setting. The read pool is carved out of `total`, half of it unless
+    `read_variable` sizes it explicitly, and the write pool gets the rest, so DB_POOL_SIZE /
+    DB_MAX_OVERFLOW stay the budget. The write pool keeps at least `minimum`.
+    """
+    read = int(os.getenv(read_variable, total // 2))
+    read = max(minimum, min(read, total - minimum))
+    return max(minimum, total - read), read
+
+def connection_budget(db_config: dict) -> int:
+    """Most primary connections the request pools of one process may open"""
+    return sum(db_config[key] for key in ('pool_size', 'max_overflow', 'read_pool_size', 'read_max_overflow'))
+
+def get_database_url(driver: str = 'psycopg2', host: typ.Optional[str] = None):
+    """Get database URL with proper configuration, `host` (host[:port]) overrides the primary"""
     db_host = os.getenv('POSTGRES_HOST', 'localhost')
     db_port = os.getenv('POSTGRES_PORT', '5432')
+    if host:
+        db_host, _, port = host.partition(':')
+        db_port = port or db_port
     db_name = os.getenv('POSTGRES_DB', 'realworlddb')
     db_user = os.getenv('POSTGRES_USER')
     db_password = os.getenv('POSTGRES_PASSWORD')
@@ -37,69 +91,493 @@ def get_database_url():
     if not all([db_user, db_password]):
         raise ValueError("Database credentials not provided. Check POSTGRES_USER and POSTGRES_PASSWORD environment variables.")
     
-    return f"postgresql+psycopg2://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
-
-# Initialize engine with proper configuration
-db_config = get_database_config()
-database_url = get_database_url()
-
-_ENGINE = create_engine(
-    database_url,
-    poolclass=QueuePool,
-    pool_size=db_config['pool_size'],
-    max_overflow=db_config['max_overflow'],
-    pool_timeout=db_config['pool_timeout'],
-    pool_recycle=db_config['pool_recycle'],
-    echo=db_config['echo'],
-    # Connection arguments for better reliability
-    connect_args={
+    if driver not in ('psycopg2', 'psycopg'):
+        raise ValueError(f"Unsupported DB_DRIVER: {driver}. Use 'psycopg2' or 'psycopg'.")
+    
+    return f"postgresql+{driver}://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
+
+def uuid_bind(name: str) -> BindParameter:
+    """
+    uuid-typed bind for ids in raw SQL. Drivers that render bind casts (asyncpg, psycopg 3)
+    send an untyped str as VARCHAR, which Postgres does not compare with a uuid column.
+    """
+    return bindparam(name, type_=Uuid(as_uuid=False))
+
+def _get_connect_args(db_config: dict) -> dict:
+    """DBAPI connect() arguments for the configured driver"""
+    connect_args = {
         "connect_timeout": 10,
         "application_name": f"realworld-flask-{os.getenv('FLASK_ENV', 'production')}"
     }
-)
+    if db_config['driver'] == 'psycopg':
+        # Server-side prepared statements: repeated handler queries skip parse/plan.
+        # None (threshold < 0) disables preparing, e.g. behind PgBouncer transaction pooling.
+        threshold = db_config['prepare_threshold']
+        connect_args["prepare_threshold"] = threshold if threshold >= 0 else None
+    return connect_args
+
+def _create_engine(url: str, read_only: bool = False, name: str = 'primary') -> Engine:
+    db_config = registry.config
+    connect_args = _get_connect_args(db_config)
+    engine_options = {}
+    if read_only:
+        # Every statement runs in its own implicit read-only transaction: no BEGIN/COMMIT
+        # round trips, and the server rejects writes on these connections.
+        connect_args["options"] = "-c default_transaction_read_only=on"
+        engine_options["isolation_level"] = "AUTOCOMMIT"
+
+    engine = create_engine(
+        url,
+        poolclass=QueuePool,
+        pool_size=db_config['read_pool_size' if read_only else 'pool_size'],
+        max_overflow=db_config['read_max_overflow' if read_only else 'max_overflow'],
+        pool_timeout=db_config['pool_timeout'],
+        pool_recycle=db_config['pool_recycle'],
+        pool_pre_ping=db_config['pool_pre_ping'],
+        echo=db_config['echo'],
+        # Connection arguments for better reliability
+        connect_args=connect_args,
+        **engine_options
+    )
+
+    breaker = _breaker_for(engine)
+
+    @event.listens_for(engine, "handle_error")
+    def _on_disconnect(context):
+        # A dropped established connection (e.g. RDS failover): SQLAlchemy invalidates the
+        # whole pool, the breaker counts it. Connect errors are counted by _guarded_connect.
+        if context.is_disconnect and context.connection is not None and not context.is_pre_ping:
+            breaker.record_failure()
+
+    _instrument_engine(engine, name)
+    return engine
+
+_BREAKERS: typ.Dict[str, CircuitBreaker] = {}
+
+def _server_key(engine: Engine) -> str:
+    return f"{engine.url.host}:{engine.url.port or 5432}"
+
+def _breaker_for(engine: Engine) -> CircuitBreaker:
+    """The circuit breaker of the engine's database server, shared by every engine pointing at it"""
+    return _BREAKERS.setdefault(
+        _server_key(engine),
+        CircuitBreaker(
+            _server_key(engine),
+            failure_threshold=registry.config['breaker_failure_threshold'],
+            reset_timeout=registry.config['breaker_reset_timeout'],
+        )
+    )
+
+def _guarded_connect(engine: Engine, connect: typ.Callable[[], Connection]) -> Connection:
+    """Check out a connection unless the server's circuit is open, recording the outcome"""
+    breaker = _BREAKERS[_server_key(engine)]
+    breaker.before_call()
+    started_at = time.perf_counter()
+    try:
+        conn = connect()
+    except PoolTimeoutError:
+        # pool saturation, not a database failure
+        raise
+    except SQLAlchemyError:
+        breaker.record_failure()
+        raise
+    breaker.record_success()
+    _POOL_WAIT_MS.observe(_POOL_NAMES[engine], (time.perf_counter() - started_at) * 1000)
+    return conn
+
+def get_circuit_breaker_metrics() -> typ.Dict[str, dict]:
+    return {name: breaker.metrics() for name, breaker in _BREAKERS.items()}
+
+#
+# Instrumentation
+#
+
+_POOL_NAMES: typ.Dict[Engine, str] = {}
+_POOL_WAIT_MS = HistogramFamily()
+_CONNECTION_HOLD_MS = HistogramFamily()
+_STATEMENT_MS = HistogramFamily()
+_STATEMENT_SAMPLES: typ.Dict[str, str] = {}
+_slow_query_count = 0
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+@lru_cache(maxsize=2048)
+def _fingerprint(statement: str) -> str:
+    """Stable id for a statement with whitespace collapsed and literals replaced by '?'"""
+    normalized = _LITERALS.sub('?', ' '.join(statement.split()))
+    fingerprint = hashlib.sha1(normalized.encode()).hexdigest()[:12]
+    _STATEMENT_SAMPLES.setdefault(fingerprint, normalized[:500])
+    return fingerprint
+
+def _current_route() -> str:
+    return (request.endpoint or 'unknown') if has_request_context() else 'background'
+
+def _instrument_engine(engine: Engine, name: str):
+    """Record connection hold time per route and statement latency per fingerprint"""
+    _POOL_NAMES[engine] = name
 
-_Session = sessionmaker(bind=_ENGINE)
+    @event.listens_for(engine.pool, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info['checked_out_at'] = time.perf_counter()
+        connection_record.info['route'] = _current_route()
+
+    @event.listens_for(engine.pool, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        checked_out_at = connection_record.info.pop('checked_out_at', None)
+        if checked_out_at is not None:
+            _CONNECTION_HOLD_MS.observe(
+                connection_record.info.pop('route', 'unknown'),
+                (time.perf_counter() - checked_out_at) * 1000
+            )
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._query_started_at = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        global _slow_query_count
+        duration_ms = (time.perf_counter() - context._query_started_at) * 1000
+        fingerprint = _fingerprint(statement)
+        _STATEMENT_MS.observe(fingerprint, duration_ms)
+        record_statement(fingerprint)
+        record_statement_span(_STATEMENT_SAMPLES[fingerprint], fingerprint, name, duration_ms)
+        if duration_ms >= registry.config['slow_query_ms']:
+            _slow_query_count += 1
+            logger.warning(
+                f"Slow query ({duration_ms:.1f}ms, {name}, route={_current_route()}, "
+                f"fingerprint={fingerprint}): {_STATEMENT_SAMPLES[fingerprint][:300]}"
+            )
+
+def warm_statement_cache(statements: typ.Iterable[typ.Any]) -> int:
+    """
+    Compile statements the way the configured driver will send them and fingerprint them, so
+    the fingerprint cache and statement samples are filled before a preloading master forks
+    """
+    dialect = make_url(f"postgresql+{registry.config['driver']}://").get_dialect()()
+    fingerprints = {_fingerprint(str(statement.compile(dialect=dialect))) for statement in statements}
+    return len(fingerprints)
+
+def get_statement_sample(fingerprint: str) -> typ.Optional[str]:
+    return _STATEMENT_SAMPLES.get(fingerprint)
+
+def get_query_metrics() -> dict:
+    """Aggregated pool and statement metrics since process start"""
+    return {
+        "pool_wait_ms": _POOL_WAIT_MS.snapshot(),
+        "connection_hold_ms": _CONNECTION_HOLD_MS.snapshot(),
+        "statements": {
+            fingerprint: {"statement": _STATEMENT_SAMPLES.get(fingerprint), **snapshot}
+            for fingerprint, snapshot in _STATEMENT_MS.snapshot().items()
+        },
+        "slow_queries": _slow_query_count,
+        "slow_query_threshold_ms": registry.config['slow_query_ms'],
+    }
+
+class DatabaseRegistry:
+    """
+    The process's database state: config, primary and read engines, session factory and
+    replicas. Nothing is created at import, the config is read and the engines are built on
+    first use, so importing the app needs neither credentials nor a database. A forked child
+    drops what it inherited (its pools hold the parent's sockets) and builds its own.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._config: typ.Optional[dict] = None
+        self._engine: typ.Optional[Engine] = None
+        self._read_engine: typ.Optional[Engine] = None
+        self._session_factory: typ.Optional[sessionmaker] = None
+        self._replicas: typ.List['_Replica'] = []
+        self.init_ms: typ.Optional[float] = None
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def init_app(self, app):
+        app.extensions['database'] = self
+
+    @property
+    def config(self) -> dict:
+        if self._config is None:
+            self._config = get_database_config()
+        return self._config
+
+    @property
+    def engine(self) -> Engine:
+        return self._engine or self._create_engines()._engine
+
+    @property
+    def read_engine(self) -> Engine:
+        return self._read_engine or self._create_engines()._read_engine
+
+    @property
+    def session_factory(self) -> sessionmaker:
+        return self._session_factory or self._create_engines()._session_factory
+
+    @property
+    def replicas(self) -> typ.List['_Replica']:
+        if self._engine is None:
+            self._create_engines()
+        return self._replicas
+
+    def is_initialized(self) -> bool:
+        return self._engine is not None
+
+    def reset(self, close: bool = True):
+        """
+        Dispose every engine and forget the config, the next use starts over from the
+        environment. In a freshly forked worker pass close=False: the pooled sockets belong
+        to the parent, the child only forgets them.
+        """
+        with self._lock:
+            for engine in [self._engine, self._read_engine, *(replica.engine for replica in self._replicas)]:
+                if engine is not None:
+                    engine.dispose(close=close)
+                    _POOL_NAMES.pop(engine, None)
+            self._config = None
+            self._engine = self._read_engine = self._session_factory = None
+            self._replicas = []
+            self.init_ms = None
+
+    def _after_fork(self):
+        # a lock held by another parent thread at fork time would never be released here
+        self._lock = threading.Lock()
+        self.reset(close=False)
+
+    def _create_engines(self) -> 'DatabaseRegistry':
+        with self._lock:
+            if self._engine is None:
+                started_at = time.perf_counter()
+                url = get_database_url(self.config['driver'])
+                read_engine = _create_engine(url, read_only=True, name='primary-read')
+                engine = _create_engine(url)
+                self._replicas = [_Replica(host) for host in self.config['replica_hosts']]
+                self._read_engine = read_engine
+                self._session_factory = sessionmaker(bind=engine)
+                # published last, the unlocked fast paths above check it
+                self._engine = engine
+                self.init_ms = round((time.perf_counter() - started_at) * 1000, 3)
+                logger.info(f"Database engines created in {self.init_ms}ms")
+        return self
+
+registry = DatabaseRegistry()
 
 def get_db():
     """Get database connection for health checks and simple queries"""
-    return _ENGINE
+    return registry.engine
 
-def _create_db_connection() -> typ.Tuple[Session, Connection]:
-    """Create a new database connection with retry logic."""
-    max_retries = 3
-    retry_delay = 1
-    
-    for attempt in range(max_retries):
-        try:
-            session = _Session()
-            conn = session.connection()
-            return session, conn
-        except SQLAlchemyError as e:
-            logger.warning(f"Database connection attempt {attempt + 1} failed: {e}")
-            if attempt < max_retries - 1:
-                time.sleep(retry_delay * (2 ** attempt))  # Exponential backoff
-            else:
-                logger.error("All database connection attempts failed")
-                raise
+#
+# Read replicas
+#
+
+# Replication lag: 0 when every received WAL record is replayed, otherwise the age of
+# the last replayed transaction. A server that is not a standby reports 0.
+_REPLICA_LAG_QUERY = text("""
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END AS lag_seconds
+""")
+
+class _Replica:
+    """
+    A replica engine and its last measured replication lag. The lag is measured by the
+    replica lag prober's background thread (realworld.api.core.health), request threads only
+    read it: a replica without a recent measurement is not used.
+    """
+
+    def __init__(self, host: str):
+        self.host = host
+        self.engine = _create_engine(
+            get_database_url(registry.config['driver'], host), read_only=True, name=f"replica-{host}"
+        )
+        self.lag_seconds = float('inf')
+        self.checked_at: typ.Optional[float] = None
+
+    def record_lag(self, lag_seconds: float) -> None:
+        self.lag_seconds, self.checked_at = lag_seconds, time.monotonic()
+
+    def is_usable(self) -> bool:
+        # a measurement older than a few probe intervals means the prober is stuck or slow
+        stale_after = 3 * registry.config['replica_lag_check_interval'] + registry.config['health_probe_timeout']
+        return (
+            self.checked_at is not None
+            and time.monotonic() - self.checked_at <= stale_after
+            and self.lag_seconds <= registry.config['replica_max_lag']
+            and _BREAKERS[_server_key(self.engine)].allows_calls()
+        )
+
+_replica_cursor = 0
+
+PRIMARY_PIN_COOKIE = 'db_primary_until'
+PRIMARY_PIN_HEADER = 'X-DB-Primary-Until'
+
+# tolerated difference between the clocks of the hosts that issue and check a token
+_PIN_CLOCK_SKEW_SECONDS = 5.0
+
+class PinToken(typ.NamedTuple):
+    """
+    A client's read-your-writes token, two epoch times (0 when unset): until when its reads
+    stay on the primary, and until when per-process caches skip their entries for it.
+    """
+    primary_until: float = 0.0
+    caches_until: float = 0.0
+
+def _pin_signer(secret_key: str) -> Signer:
+    return Signer(secret_key, salt='db-primary-pin')
+
+def format_pin_token(token: PinToken, secret_key: str) -> str:
+    """The cookie and header value, signed so a client cannot extend its own pin"""
+    return _pin_signer(secret_key).sign(f"{token.primary_until:.0f}:{token.caches_until:.0f}").decode()
+
+def parse_pin_token(value: typ.Optional[str], secret_key: str) -> typ.Optional[PinToken]:
+    """The token from the cookie or header value, None when it is missing, malformed or not signed by us"""
+    try:
+        primary_until, caches_until = (float(part) for part in _pin_signer(secret_key).unsign(value).split(b':'))
+    except (TypeError, ValueError, BadSignature):
+        return None
+    return PinToken(primary_until, caches_until)
+
+def pin_active(until: float, max_seconds: float) -> bool:
+    """
+    True for an expiry still in the future but no further ahead than `max_seconds`, the longest
+    the issuer hands out, so a token does not outlive that even if the signing key leaked
+    """
+    now = time.time()
+    return now < until <= now + max_seconds + _PIN_CLOCK_SKEW_SECONDS
+
+def _request_pin_token() -> typ.Optional[PinToken]:
+    if 'db_pin_token' not in g:
+        g.db_pin_token = parse_pin_token(
+            request.headers.get(PRIMARY_PIN_HEADER) or request.cookies.get(PRIMARY_PIN_COOKIE),
+            current_app.secret_key,
+        )
+    return g.db_pin_token
+
+def _is_pinned_to_primary() -> bool:
+    """True while the client is inside its read-your-writes window (cookie or header token)"""
+    token = _request_pin_token()
+    return token is not None and pin_active(token.primary_until, registry.config['read_your_writes_window'])
+
+def is_pinned_to_primary() -> bool:
+    """True when the current request comes from a client inside its read-your-writes window"""
+    return has_request_context() and _is_pinned_to_primary()
+
+def process_caches_bypassed_until() -> float:
+    """Until when the current request's client asked per-process caches to skip it, 0 when not"""
+    token = has_request_context() and _request_pin_token()
+    return token.caches_until if token else 0.0
+
+def bypass_process_caches(seconds: float) -> None:
+    """
+    Tell the client, once this request's write commits, to skip per-process caches (e.g. the
+    membership indexes) for `seconds`, so the writer never reads another worker's older copy.
+    Independent of the read-your-writes window, which only keeps its reads off the replicas.
+    """
+    if has_request_context():
+        g.db_cache_bypass_seconds = max(g.get('db_cache_bypass_seconds', 0.0), seconds)
+
+def after_commit(callback: typ.Callable[[], None]) -> None:
+    """
+    Run `callback` once the request's transaction commits, dropped if it rolls back.
+    Outside a request (scripts) it runs right away. The write is already committed when
+    it runs, so an error in it is logged and does not fail the request.
+    """
+    if has_request_context():
+        g.setdefault('db_after_commit', []).append(callback)
+    else:
+        callback()
+
+def _run_after_commit(committed: bool) -> None:
+    if has_request_context():
+        callbacks = g.pop('db_after_commit', None) or []
+        if committed:
+            for callback in callbacks:
+                try:
+                    callback()
+                except Exception:
+                    logger.exception("after_commit callback failed")
+
+def _is_read_request() -> bool:
+    return has_request_context() and request.method in ('GET', 'HEAD') and not _is_pinned_to_primary()
+
+def _select_replica_engine() -> typ.Optional[Engine]:
+    """The next replica within the lag threshold, if any"""
+    global _replica_cursor
+    replicas = registry.replicas
+    for _ in range(len(replicas)):
+        _replica_cursor = (_replica_cursor + 1) % len(replicas)
+        replica = replicas[_replica_cursor]
+        if replica.is_usable():
+            return replica.engine
+    if replicas:
+        logger.debug("No replica within the lag threshold, reading from the primary")
+    return None
+
+def _select_engine(read_only: bool) -> Engine:
+    """Route reads to the next replica within the lag threshold, everything else to the primary"""
+    if read_only:
+        return _select_replica_engine() or registry.engine
+    return registry.engine
+
+def read_your_writes_token() -> typ.Optional[PinToken]:
+    """
+    The token to hand back when this request wrote through the primary, extending the one the
+    client sent. The app returns it as a cookie and header.
+    """
+    if not g.get('db_primary_write'):
+        return None
+    now = time.time()
+    # already checked against its maximum lifetime by the reader, so it only needs to be current
+    sent = _request_pin_token() or PinToken()
+    primary_until = now + registry.config['read_your_writes_window'] if registry.config['replica_hosts'] else 0.0
+    cache_seconds = g.get('db_cache_bypass_seconds', 0.0)
+    token = PinToken(
+        max(primary_until, sent.primary_until if sent.primary_until > now else 0.0),
+        max(now + cache_seconds if cache_seconds else 0.0, sent.caches_until if sent.caches_until > now else 0.0),
+    )
+    return token if any(token) else None
+
+def _create_db_connection(engine: Engine) -> typ.Tuple[Session, Connection]:
+    """Create a new database connection, failing fast while the server's circuit breaker is open."""
+    session = registry.session_factory(bind=engine)
+    try:
+        return session, _guarded_connect(engine, session.connection)
+    except Exception:
+        session.close()
+        raise
 
 @contextmanager
-def get_db_connection():
-    """Context manager for handling database transactions with proper error handling."""
+def get_db_connection(read_only: typ.Optional[bool] = None):
+    """
+    Context manager for handling database transactions with proper error handling.
+    Reads (by default: GET/HEAD requests outside the read-your-writes window) go to a replica when configured.
+    """
+    if read_only is None:
+        read_only = _is_read_request()
+    engine = _select_engine(read_only)
+
     session = None
     try:
-        session, conn = _create_db_connection()
+        session, conn = _create_db_connection(engine)
         yield conn
         session.commit()
         logger.debug("Database transaction committed successfully")
+        if engine is registry.engine and has_request_context() and request.method not in ('GET', 'HEAD'):
+            g.db_primary_write = True
         
+    except CircuitOpenError:
+        raise
     except SQLAlchemyError as e:
         logger.error(f"Database error occurred: {e}")
+        _run_after_commit(committed=False)
         if session:
             session.rollback()
             logger.debug("Database transaction rolled back")
         raise e
     except Exception as e:
         logger.error(f"Unexpected error occurred: {e}")
+        _run_after_commit(committed=False)
         if session:
             session.rollback()
             logger.debug("Database transaction rolled back due to unexpected error")
@@ -107,36 +585,83 @@ def get_db_connection():
     finally:
         if session:
             session.close()
+    # only reached once the transaction committed, every except branch re-raises
+    _run_after_commit(committed=True)
+
+
+@contextmanager
+def get_db_read_connection(deferrable: bool = False, allow_replica: bool = True):
+    """
+    Context manager for read-only handlers. Checks out a raw pooled read-only connection
+    (a replica, or the primary's read pool while the client is pinned to it) without an ORM
+    session: each statement is its own read-only transaction, so there is no BEGIN/COMMIT.
+    `deferrable` runs the block as one SERIALIZABLE READ ONLY DEFERRABLE transaction instead,
+    for multi-statement reads that need a consistent snapshot.
+    """
+    engine = None
+    if allow_replica and not (has_request_context() and _is_pinned_to_primary()):
+        engine = _select_replica_engine()
+    read_engine = registry.read_engine
+    engine = engine or read_engine
 
-def check_database_connection():
-    """Check if database connection is healthy"""
     try:
-        with get_db_connection() as conn:
-            result = conn.execute(text("SELECT 1")).fetchone()
-            return result is not None
-    except Exception as e:
-        logger.error(f"Database health check failed: {e}")
-        return False
+        conn = _guarded_connect(engine, engine.connect)
+    except (CircuitOpenError, SQLAlchemyError) as e:
+        if engine is read_engine:
+            raise
+        logger.warning(f"Replica unavailable, reading from the primary: {e}")
+        conn = _guarded_connect(read_engine, read_engine.connect)
 
-def get_database_info():
-    """Get database connection information for monitoring"""
     try:
-        with get_db_connection() as conn:
-            result = conn.execute(text("SELECT version()")).fetchone()
-            return {
-                "status": "connected",
-                "version": result[0] if result else "unknown",
-                "pool_size": _ENGINE.pool.size(),
-                "checked_out_connections": _ENGINE.pool.checkedout(),
-                "overflow": _ENGINE.pool.overflow(),
-                "database_name": os.getenv('POSTGRES_DB', 'realworlddb'),
-                "host": os.getenv('POSTGRES_HOST', 'localhost')
+        with conn:
+            if deferrable:
+                conn.exec_driver_sql("BEGIN ISOLATION LEVEL SERIALIZABLE READ ONLY DEFERRABLE")
+                try:
+                    yield conn
+                finally:
+                    conn.exec_driver_sql("COMMIT")
+            else:
+                yield conn
+    except SQLAlchemyError as e:
+        logger.error(f"Database error occurred: {e}")
+        raise e
+
+def get_cache_info():
+    """Entries of the per-process statement caches, ours and SQLAlchemy's compiled cache per engine"""
+    fingerprints = _fingerprint.cache_info()
+    return {
+        "statement_fingerprints": {"entries": fingerprints.currsize, "max_entries": fingerprints.maxsize,
+                                   "hits": fingerprints.hits, "misses": fingerprints.misses},
+        "statement_samples": {"entries": len(_STATEMENT_SAMPLES)},
+        "statement_histograms": {"entries": len(_STATEMENT_MS.items()), "max_entries": _STATEMENT_MS.max_keys},
+        "connection_hold_histograms": {"entries": len(_CONNECTION_HOLD_MS.items()), "max_entries": _CONNECTION_HOLD_MS.max_keys},
+        "compiled_statements": {
+            name: {"entries": len(engine._compiled_cache), "max_entries": engine._compiled_cache.capacity}
+            for engine, name in list(_POOL_NAMES.items())
+            if engine._compiled_cache is not None
+        },
+    }
+
+def get_pool_info():
+    """Connection pool state of this process, answered from memory without touching the database"""
+    engine, read_engine = registry.engine, registry.read_engine
+    return {
+        "pool_size": engine.pool.size(),
+        "checked_out_connections": engine.pool.checkedout(),
+        "overflow": engine.pool.overflow(),
+        "read_pool": {
+            "pool_size": read_engine.pool.size(),
+            "checked_out_connections": read_engine.pool.checkedout(),
+            "overflow": read_engine.pool.overflow(),
+        },
+        "replicas": [
+            {
+                "host": replica.host,
+                "lag_seconds": replica.lag_seconds if replica.lag_seconds != float('inf') else None,
+                "checked_out_connections": replica.engine.pool.checkedout(),
             }
-    except Exception as e:
-        logger.error(f"Failed to get database info: {e}")
-        return {
-            "status": "error",
-            "error": str(e),
-            "database_name": os.getenv('POSTGRES_DB', 'realworlddb'),
-            "host": os.getenv('POSTGRES_HOST', 'localhost')
-        }
+            for replica in registry.replicas
+        ],
+        "database_name": os.getenv('POSTGRES_DB', 'realworlddb'),
+        "host": os.getenv('POSTGRES_HOST', 'localhost')
+    }
@@ -0,0 +1,104 @@
+import os
+import time
+import asyncio
+import logging
+import typing as typ
+from contextlib import asynccontextmanager
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import SQLAlchemyError, TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, create_async_engine
+from realworld.api.core.db import (
+    registry,
+    get_database_url,
+    _breaker_for,
+    _instrument_engine,
+    _POOL_NAMES,
+    _POOL_WAIT_MS,
+)
+
+logger = logging.getLogger(__name__)
+
+# Async data layer of the ASGI serving mode (realworld.asgi), backed by asyncpg.
+# It only serves reads, writes keep going through the WSGI app and core.db.
+
+_ASYNC_ENGINE: typ.Optional[AsyncEngine] = None
+
+
+def _create_async_engine() -> AsyncEngine:
+    db_config = registry.config
+    url = make_url(get_database_url()).set(drivername='postgresql+asyncpg')
+    # asyncpg caches prepared statements per connection, DB_PREPARE_THRESHOLD=-1 turns
+    # the cache off as it does for psycopg 3 (e.g. behind PgBouncer transaction pooling)
+    statement_cache_size = 100 if db_config['prepare_threshold'] >= 0 else 0
+
+    engine = create_async_engine(
+        url,
+        pool_size=db_config['read_pool_size'],
+        max_overflow=db_config['read_max_overflow'],
+        pool_timeout=db_config['pool_timeout'],
+        pool_recycle=db_config['pool_recycle'],
+        pool_pre_ping=db_config['pool_pre_ping'],
+        echo=db_config['echo'],
+        # Same semantics as the sync read pool: each statement is its own read-only transaction
+        isolation_level='AUTOCOMMIT',
+        connect_args={
+            'timeout': 10,
+            'prepared_statement_cache_size': statement_cache_size,
+            'server_settings': {
+                'application_name': f"realworld-flask-{os.getenv('FLASK_ENV', 'production')}-async",
+                'default_transaction_read_only': 'on',
+            },
+        },
+    )
+    # the sync facade carries the pool and cursor events, so /api/metrics covers it too
+    _breaker_for(engine.sync_engine)
+    _instrument_engine(engine.sync_engine, 'primary-async')
+    return engine
+
+
+def get_async_engine() -> AsyncEngine:
+    """The process-wide async engine, created on first use inside the running event loop"""
+    global _ASYNC_ENGINE
+    if _ASYNC_ENGINE is None:
+        _ASYNC_ENGINE = _create_async_engine()
+    return _ASYNC_ENGINE
+
+
+async def dispose_async_engine() -> None:
+    global _ASYNC_ENGINE
+    if _ASYNC_ENGINE is not None:
+        await _ASYNC_ENGINE.dispose()
+        _ASYNC_ENGINE = None
+
+
+@asynccontextmanager
+async def get_async_read_connection() -> typ.AsyncIterator[AsyncConnection]:
+    """
+    Async counterpart of get_db_read_connection: a read-only autocommit connection to the
+    primary, guarded by the primary's circuit breaker. Replicas are not used in async mode.
+    """
+    engine = get_async_engine()
+    breaker = _breaker_for(engine.sync_engine)
+    breaker.before_call()
+    started_at = time.perf_counter()
+    try:
+        conn = await engine.connect()
+    except PoolTimeoutError:
+        # pool saturation, not a database failure
+        raise
+    except (SQLAlchemyError, OSError, asyncio.TimeoutError):
+        # asyncpg raises connect errors (refused, timed out) without SQLAlchemy wrapping them
+        breaker.record_failure()
+        raise
+    breaker.record_success()
+    _POOL_WAIT_MS.observe(
+        _POOL_NAMES[engine.sync_engine], (time.perf_counter() - started_at) * 1000
+    )
+
+    try:
+        yield conn
+    except SQLAlchemyError as e:
+        logger.error(f"Async read error: {e}")
+        raise
+    finally:
+        await conn.close()
@@ -0,0 +1,215 @@
+import os
+import math
+import time
+import logging
+import threading
+import typing as typ
+from datetime import datetime, timezone
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+from realworld.api.core.db import registry, get_database_url, _get_connect_args, _REPLICA_LAG_QUERY
+
+logger = logging.getLogger(__name__)
+
+
+class DatabaseProber:
+    """
+    Probes the database from a background thread over a dedicated single-connection pool and
+    caches the outcome, so health checks answer from memory and never wait on (or take a
+    connection from) the request pools. A result older than `stale_after` seconds, e.g.
+    because the probe thread is stuck, is reported as stale and not ready.
+    """
+
+    def __init__(self):
+        # read from the database config when the probe starts
+        self.interval: typ.Optional[float] = None
+        self.timeout: typ.Optional[float] = None
+        self.stale_after: typ.Optional[float] = None
+        self._engine: typ.Optional[Engine] = None
+        self._thread: typ.Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._pid: typ.Optional[int] = None
+        self._lock = threading.Lock()
+        # replaced as a whole by the probe thread, readers never see a partial update
+        self._state = {
+            "status": "unknown",
+            "healthy": False,
+            "error": "not probed yet",
+            "checked_at": None,
+            "_checked_monotonic": None,
+        }
+
+    def ensure_started(self) -> None:
+        """Start the probe thread, or restart it in a forked worker (threads do not survive fork)"""
+        if self._is_running():
+            return
+        with self._lock:
+            if self._is_running():
+                return
+            if self._engine is not None:
+                # the pooled connection belongs to the parent process, leave it alone
+                self._engine.dispose(close=False)
+            self.interval = registry.config['health_probe_interval']
+            self.timeout = registry.config['health_probe_timeout']
+            self.stale_after = 3 * self.interval + self.timeout
+            self._pid = os.getpid()
+            self._engine = self._create_engine()
+            self._stop = threading.Event()
+            self._thread = threading.Thread(
+                target=self._run, name="db-health-prober", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def probe(self) -> None:
+        started_at = time.perf_counter()
+        try:
+            with self._engine.connect() as conn:
+                version = conn.execute(text("SELECT version()")).scalar()
+            state = {
+                "status": "connected",
+                "healthy": True,
+                "version": version,
+                "latency_ms": round((time.perf_counter() - started_at) * 1000, 3),
+            }
+        except Exception as e:
+            state = {"status": "error", "healthy": False, "error": str(e)}
+
+        # log transitions only, a down database would otherwise log every interval
+        if state["healthy"] != self._state["healthy"] or self._state["status"] == "unknown":
+            if state["healthy"]:
+                logger.info("Database health probe succeeded")
+            else:
+                logger.error(f"Database health probe failed: {state['error']}")
+
+        state["checked_at"] = datetime.now(tz=timezone.utc).isoformat()
+        state["_checked_monotonic"] = time.monotonic()
+        self._state = state
+
+    def snapshot(self) -> dict:
+        """The last probe result with its age, `ready` is false when unhealthy or stale"""
+        state = self._state
+        checked = state["_checked_monotonic"]
+        age = time.monotonic() - checked if checked is not None else None
+        stale = age is None or age > self.stale_after
+        snapshot = {key: value for key, value in state.items() if not key.startswith("_")}
+        snapshot.update(
+            age_seconds=round(age, 3) if age is not None else None,
+            stale=stale,
+            ready=state["healthy"] and not stale,
+        )
+        return snapshot
+
+    def _is_running(self) -> bool:
+        return (
+            self._pid == os.getpid()
+            and self._thread is not None
+            and self._thread.is_alive()
+        )
+
+    def _create_engine(self) -> Engine:
+        return _create_probe_engine(get_database_url(registry.config['driver']), self.timeout)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.probe()
+            self._stop.wait(self.interval)
+
+
+class ReplicaLagProber:
+    """
+    Measures the replication lag of every configured replica from a background thread, each
+    over its own single-connection pool, and records it on the registry's replicas. Request
+    threads only read the last measurement (see `_Replica.is_usable`), so a slow or
+    unreachable replica never holds up a request or counts against its query budget.
+    Does nothing without replicas.
+    """
+
+    def __init__(self):
+        # read from the database config when the probe starts
+        self.interval: typ.Optional[float] = None
+        self.timeout: typ.Optional[float] = None
+        self._engines: typ.Dict[str, Engine] = {}
+        self._thread: typ.Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._pid: typ.Optional[int] = None
+        self._lock = threading.Lock()
+
+    def ensure_started(self) -> None:
+        """Start the probe thread, or restart it in a forked worker (threads do not survive fork)"""
+        if self._is_running():
+            return
+        with self._lock:
+            if self._is_running():
+                return
+            for engine in self._engines.values():
+                # the pooled connections belong to the parent process, leave them alone
+                engine.dispose(close=False)
+            db_config = registry.config
+            self.interval = db_config['replica_lag_check_interval']
+            self.timeout = db_config['health_probe_timeout']
+            self._engines = {
+                host: _create_probe_engine(get_database_url(db_config['driver'], host), self.timeout)
+                for host in db_config['replica_hosts']
+            }
+            if not self._engines:
+                return
+            self._pid = os.getpid()
+            self._stop = threading.Event()
+            self._thread = threading.Thread(
+                target=self._run, name="db-replica-lag-prober", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def probe(self) -> None:
+        for replica in registry.replicas:
+            engine = self._engines.get(replica.host)
+            if engine is None:
+                continue
+            try:
+                with engine.connect() as conn:
+                    lag_seconds = float(conn.execute(_REPLICA_LAG_QUERY).scalar())
+            except Exception as e:
+                if replica.lag_seconds != float('inf') or replica.checked_at is None:
+                    logger.warning(f"Replica {replica.host} lag check failed: {e}")
+                lag_seconds = float('inf')
+            replica.record_lag(lag_seconds)
+
+    def _is_running(self) -> bool:
+        return (
+            self._pid == os.getpid()
+            and self._thread is not None
+            and self._thread.is_alive()
+        )
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.probe()
+            self._stop.wait(self.interval)
+
+
+def _create_probe_engine(url: str, timeout: float) -> Engine:
+    """A single-connection pool whose connects and statements give up after `timeout` seconds"""
+    db_config = registry.config
+    connect_args = _get_connect_args(db_config)
+    connect_args["connect_timeout"] = max(1, math.ceil(timeout))
+    connect_args["options"] = f"-c statement_timeout={int(timeout * 1000)}"
+    return create_engine(
+        url,
+        poolclass=QueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=timeout,
+        pool_recycle=db_config['pool_recycle'],
+        connect_args=connect_args,
+    )
+
+
+database_prober = DatabaseProber()
+replica_lag_prober = ReplicaLagProber()
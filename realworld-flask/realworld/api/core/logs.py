@@ -0,0 +1,171 @@
+import os
+import sys
+import json
+import time
+import queue
+import atexit
+import random
+import logging
+import typing as typ
+from logging.handlers import QueueHandler, QueueListener
+from flask import Flask, g, request
+
+# Log records are handed to a queue by the request threads and encoded and written to stdout by
+# one listener thread, so a slow or blocked stdout (e.g. a backed-up log driver) never stalls a
+# request. The listener does not survive fork, every process (e.g. gunicorn worker) restarts it.
+
+ACCESS_LOGGER = 'realworld.access'
+
+# attributes every LogRecord has, anything else was passed with `extra=`
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+_TRACEBACK_FORMATTER = logging.Formatter()
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, fields passed with `extra=` become top-level keys"""
+
+    def __init__(self, static_fields: typ.Optional[dict] = None):
+        super().__init__()
+        self.static_fields = static_fields or {}
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = record.__dict__
+        entry = {
+            'timestamp': f"{time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(record.created))}.{int(record.msecs):03d}Z",
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            **self.static_fields,
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exception'] = record.exc_text
+        for key in fields.keys() - _RECORD_ATTRIBUTES:
+            if not key.startswith('_'):
+                entry[key] = fields[key]
+        return json.dumps(entry, default=str)
+
+
+class _QueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge the arguments and render the traceback in the logging thread (they may change
+        # or pin frames until the listener gets to them), the JSON encoding happens there.
+        # No copy: this is the root handler, the last one to see the record.
+        record.msg, record.args = record.getMessage(), None
+        if record.exc_info:
+            record.exc_text = _TRACEBACK_FORMATTER.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class _LogPipeline:
+    def __init__(self):
+        self.handler: typ.Optional[_QueueHandler] = None
+        self.listener: typ.Optional[QueueListener] = None
+        self.output: typ.Optional[logging.Handler] = None
+
+    def start(self, output: logging.Handler):
+        self.stop()
+        log_queue = queue.SimpleQueue()
+        self.output = output
+        self.handler = _QueueHandler(log_queue)
+        self.listener = QueueListener(log_queue, output, respect_handler_level=True)
+        self.listener.start()
+        return self.handler
+
+    def stop(self):
+        """Flush what is queued and stop the listener thread"""
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+
+    def after_fork(self):
+        # the parent's listener thread is gone and its queue may have been mid-operation
+        if self.handler is not None:
+            log_queue = queue.SimpleQueue()
+            self.handler.queue = log_queue
+            self.listener = QueueListener(log_queue, self.output, respect_handler_level=True)
+            self.listener.start()
+
+
+_pipeline = _LogPipeline()
+atexit.register(_pipeline.stop)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_pipeline.after_fork)
+
+
+def configure_logging(
+    level: int,
+    json_format: bool = True,
+    stream: typ.Optional[typ.TextIO] = None,
+    static_fields: typ.Optional[dict] = None,
+) -> None:
+    """
+    Route every log record through the queue to a single stream handler, replacing the root
+    logger's handlers (e.g. from logging.basicConfig). Safe to call again, e.g. per app.
+    """
+    output = logging.StreamHandler(stream or sys.stdout)
+    if json_format:
+        output.setFormatter(JsonFormatter(static_fields))
+    else:
+        output.setFormatter(logging.Formatter('%(asctime)s [%(levelname)s] %(name)s: %(message)s', '%Y-%m-%d %H:%M:%S'))
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(_pipeline.start(output))
+    root.setLevel(level)
+
+
+def stop_logging() -> None:
+    """Write out what is still queued and stop the listener, e.g. before a worker exits"""
+    _pipeline.stop()
+
+
+def register_access_log(
+    app: Flask,
+    sample_rate: float = 1.0,
+    skip_endpoints: typ.Collection[str] = (),
+) -> None:
+    """
+    One access record per request with its duration. Successful reads are logged at
+    `sample_rate` (0..1), writes and errors always; `skip_endpoints` (e.g. health checks)
+    are never logged.
+    """
+    access_logger = logging.getLogger(ACCESS_LOGGER)
+
+    @app.before_request
+    def start_access_timer():
+        g.setdefault('request_started_at', time.perf_counter())
+
+    @app.after_request
+    def log_access(response):
+        started_at = g.get('request_started_at')
+        if started_at is None or request.endpoint in skip_endpoints:
+            return response
+        if (
+            sample_rate < 1.0
+            and response.status_code < 400
+            and request.method in ('GET', 'HEAD')
+            and random.random() >= sample_rate
+        ):
+            return response
+
+        duration_ms = round((time.perf_counter() - started_at) * 1000, 3)
+        access_logger.info(
+            '%s %s %s %.1fms', request.method, request.path, response.status_code, duration_ms,
+            extra={
+                'method': request.method,
+                'path': request.path,
+                'endpoint': request.endpoint,
+                'status': response.status_code,
+                'duration_ms': duration_ms,
+                'bytes': response.content_length,
+                'remote_addr': request.access_route[0] if request.access_route else request.remote_addr,
+                'request_id': g.get('request_id') or request.headers.get('X-Request-ID', 'unknown'),
+                'trace_id': trace.trace_id if (trace := g.get('trace')) is not None else None,
+                'sample_rate': sample_rate,
+            },
+        )
+        return response
@@ -0,0 +1,277 @@
+import os
+import time
+import uuid
+import threading
+import typing as typ
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from contextvars import ContextVar
+from flask import g, has_request_context
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.sql import text as satext
+from realworld.api.core.db import uuid_bind, after_commit, bypass_process_caches, pin_active, process_caches_bypassed_until
+
+# Until when the client of an ASGI request asked to skip the cached ids, the counterpart of
+# process_caches_bypassed_until() for the async routes (set by realworld.asgi)
+async_caches_bypassed_until: ContextVar[float] = ContextVar('async_caches_bypassed_until', default=0.0)
+
+_LOW_MASK = (1 << 64) - 1
+
+
+def _halves(member_id) -> typ.Tuple[int, int]:
+    """The high and low 64 bits of a uuid, given as a ``UUID`` or in its text form"""
+    if isinstance(member_id, uuid.UUID):
+        value = member_id.int
+    else:
+        # the text form as the drivers return it, a fraction of the cost of uuid.UUID()
+        digits = str(member_id).replace('-', '')
+        if len(digits) != 32:
+            raise ValueError(f"not a uuid: {member_id!r}")
+        value = int(digits, 16)
+    return value >> 64, value & _LOW_MASK
+
+
+class MemberIds:
+    """Immutable set of uuids, sorted into two arrays of their 64-bit halves.
+
+    A ``frozenset`` of ``str`` ids costs well over 100 bytes per id, this
+    keeps the index to 16 bytes per id. ``in`` accepts a ``str`` or a
+    ``UUID`` and bisects the halves.
+    """
+
+    __slots__ = ('_high', '_low')
+
+    def __init__(self, member_ids: typ.Iterable = ()):
+        halves = sorted({_halves(member_id) for member_id in member_ids})
+        # from lists, an array built from a generator over-allocates
+        self._high = array('Q', [high for high, _ in halves])
+        self._low = array('Q', [low for _, low in halves])
+
+    def __len__(self) -> int:
+        return len(self._high)
+
+    def __contains__(self, member_id) -> bool:
+        try:
+            return self._search(*_halves(member_id))[1]
+        except ValueError:
+            return False
+
+    @property
+    def nbytes(self) -> int:
+        return (len(self._high) + len(self._low)) * self._high.itemsize
+
+    def with_id(self, member_id) -> "MemberIds":
+        high, low = _halves(member_id)
+        index, found = self._search(high, low)
+        if found:
+            return self
+        ids = self._copy()
+        ids._high.insert(index, high)
+        ids._low.insert(index, low)
+        return ids
+
+    def without_id(self, member_id) -> "MemberIds":
+        index, found = self._search(*_halves(member_id))
+        if not found:
+            return self
+        ids = self._copy()
+        ids._high.pop(index)
+        ids._low.pop(index)
+        return ids
+
+    def _search(self, high: int, low: int) -> typ.Tuple[int, bool]:
+        """Index of the uuid, or where it would be inserted, and whether it is held"""
+        highs, lows = self._high, self._low
+        start = bisect_left(highs, high)
+        # the uuids sharing the high half are sorted by their low half
+        index = bisect_left(lows, low, start, bisect_right(highs, high, start))
+        return index, index < len(highs) and highs[index] == high and lows[index] == low
+
+    def _copy(self) -> "MemberIds":
+        ids = MemberIds()
+        ids._high = array('Q', self._high)
+        ids._low = array('Q', self._low)
+        return ids
+
+
+_NO_IDS = MemberIds()
+
+
+class ViewerMembershipIndex:
+    """Per-process cache of "viewer -> ids" memberships (e.g. followed users).
+
+    A viewer's ids are loaded lazily with a single query the first time they
+    are needed and stored as immutable ``MemberIds`` so callers can resolve
+    a whole page of rows in memory without holding the lock. Entries are
+    evicted least-recently-used once ``max_viewers`` viewers or ``max_ids``
+    ids in total are held, a viewer with more than ``max_ids`` ids is not
+    cached at all. Entries expire after ``ttl_seconds``. ``get_async`` is the same lookup for the ASGI routes.
+
+    Only the viewer changes their own memberships, so only the writer can
+    notice a stale entry. Writes call ``add``/``discard``: the request reads
+    its own ids from the database from then on, this process's entry is
+    updated once the transaction commits, and the client's read-your-writes
+    token tells every process to skip the cached ids for ``ttl_seconds``.
+    This is separate from the token's (shorter) primary pin, the ids are
+    reloaded from wherever the request reads. By the time the bypass
+    expires every entry loaded before the write has expired too. Clients
+    that send back neither the cookie nor the header may see another
+    process's entry for up to ``ttl_seconds``.
+    """
+
+    def __init__(self, load_query: str, *, max_viewers: int, max_ids: int, ttl_seconds: float):
+        self._load_query = satext(load_query).bindparams(uuid_bind("viewer_id"))
+        self._max_viewers = max_viewers
+        self._max_ids = max_ids
+        self._ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, typ.Tuple[float, MemberIds]]" = OrderedDict()
+        self._held_ids = 0
+        self._lock = threading.Lock()
+
+    def get(
+        self, db_conn: Connection, viewer_id: typ.Optional[str]
+    ) -> MemberIds:
+        if not viewer_id:
+            return _NO_IDS
+
+        now = time.monotonic()
+        if not self._skips_cache(viewer_id) and (ids := self._lookup(viewer_id, now)) is not None:
+            return ids
+
+        rows = db_conn.execute(self._load_query.bindparams(viewer_id=viewer_id))
+        return self._load(viewer_id, rows, now)
+
+    async def get_async(
+        self, db_conn: AsyncConnection, viewer_id: typ.Optional[str]
+    ) -> MemberIds:
+        if not viewer_id:
+            return _NO_IDS
+
+        now = time.monotonic()
+        if not self._bypassed(async_caches_bypassed_until.get()) and (ids := self._lookup(viewer_id, now)) is not None:
+            return ids
+
+        rows = await db_conn.execute(self._load_query.bindparams(viewer_id=viewer_id))
+        return self._load(viewer_id, rows, now)
+
+    def add(self, viewer_id: str, member_id: typ.Optional[str]) -> None:
+        if member_id is not None:
+            self._write(viewer_id, lambda ids: ids.with_id(member_id))
+
+    def discard(self, viewer_id: str, member_id: typ.Optional[str]) -> None:
+        if member_id is not None:
+            self._write(viewer_id, lambda ids: ids.without_id(member_id))
+
+    def invalidate(self, viewer_id: typ.Optional[str] = None) -> None:
+        with self._lock:
+            if viewer_id is None:
+                self._entries.clear()
+                self._held_ids = 0
+            elif entry := self._entries.pop(viewer_id, None):
+                self._held_ids -= len(entry[1])
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        with self._lock:
+            nbytes = sum(ids.nbytes for _, ids in self._entries.values())
+            viewers = len(self._entries)
+            members = self._held_ids
+        return {
+            "entries": viewers,
+            "max_entries": self._max_viewers,
+            "member_ids": members,
+            "max_member_ids": self._max_ids,
+            "member_id_bytes": nbytes,
+            "ttl_seconds": self._ttl_seconds,
+        }
+
+    def _write(
+        self,
+        viewer_id: str,
+        apply: typ.Callable[[MemberIds], MemberIds],
+    ) -> None:
+        if has_request_context():
+            g.setdefault('membership_writes', set()).add((id(self), viewer_id))
+        bypass_process_caches(self._ttl_seconds)
+        after_commit(lambda: self._update(viewer_id, apply))
+
+    def _written_in_request(self, viewer_id: str) -> bool:
+        return has_request_context() and (id(self), viewer_id) in g.get('membership_writes', ())
+
+    def _skips_cache(self, viewer_id: str) -> bool:
+        # the request's own uncommitted write, or a client that wrote recently
+        return self._written_in_request(viewer_id) or self._bypassed(process_caches_bypassed_until())
+
+    def _bypassed(self, until: float) -> bool:
+        # a bypass is never handed out for longer than the TTL
+        return pin_active(until, self._ttl_seconds)
+
+    def _update(
+        self,
+        viewer_id: str,
+        apply: typ.Callable[[MemberIds], MemberIds],
+    ) -> None:
+        # only refresh viewers that are already loaded, a cold viewer is
+        # loaded from the database (including this write) on the next read
+        with self._lock:
+            if entry := self._entries.get(viewer_id):
+                ids = apply(entry[1])
+                self._held_ids += len(ids) - len(entry[1])
+                self._entries[viewer_id] = (entry[0], ids)
+
+    def _lookup(self, viewer_id: str, now: float) -> typ.Optional[MemberIds]:
+        with self._lock:
+            entry = self._entries.get(viewer_id)
+            if entry and entry[0] > now:
+                self._entries.move_to_end(viewer_id)
+                return entry[1]
+        return None
+
+    def _load(self, viewer_id: str, rows, now: float) -> MemberIds:
+        ids = MemberIds(row[0] for row in rows)
+        # ids read inside an open write transaction are not cached, it may still roll back
+        if not self._written_in_request(viewer_id):
+            with self._lock:
+                self._store(viewer_id, ids, now)
+        return ids
+
+    def _store(self, viewer_id: str, ids: MemberIds, now: float) -> None:
+        if previous := self._entries.pop(viewer_id, None):
+            self._held_ids -= len(previous[1])
+        if len(ids) > self._max_ids:
+            return
+        self._entries[viewer_id] = (now + self._ttl_seconds, ids)
+        self._held_ids += len(ids)
+        while len(self._entries) > self._max_viewers or self._held_ids > self._max_ids:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._held_ids -= len(evicted)
+
+
+# user id -> ids of the users they follow
+follow_index = ViewerMembershipIndex(
+    """
+    SELECT following_user_id
+    FROM user_follows
+    WHERE user_id = :viewer_id
+    """,
+    max_viewers=int(os.getenv("FOLLOW_INDEX_MAX_VIEWERS", "10000")),
+    max_ids=int(os.getenv("FOLLOW_INDEX_MAX_IDS", "1000000")),
+    ttl_seconds=float(os.getenv("FOLLOW_INDEX_TTL_SECONDS", "30")),
+)
+
+
+# user id -> ids of the articles they favorited
+favorites_index = ViewerMembershipIndex(
+    """
+    SELECT article_id
+    FROM article_favorites
+    WHERE user_id = :viewer_id
+    """,
+    max_viewers=int(os.getenv("FAVORITES_INDEX_MAX_VIEWERS", "10000")),
+    max_ids=int(os.getenv("FAVORITES_INDEX_MAX_IDS", "1000000")),
+    ttl_seconds=float(os.getenv("FAVORITES_INDEX_TTL_SECONDS", "30")),
+)
@@ -0,0 +1,224 @@
+import os
+import time
+import atexit
+import logging
+import threading
+import tracemalloc
+import typing as typ
+from collections import deque
+from flask import Flask, g, request
+from realworld.api.core.metrics import HistogramFamily
+
+logger = logging.getLogger(__name__)
+
+# Allocation diagnostics with tracemalloc, off unless MEMORY_SNAPSHOT_INTERVAL is set or an admin
+# starts it (tracing costs CPU on every allocation and memory per traced block). While tracing,
+# a background thread snapshots the heap every interval: the first snapshot is the baseline,
+# growth is reported against it and against the previous one, which is where a slow leak shows.
+
+# per-request allocation buckets in KiB
+REQUEST_ALLOCATION_BUCKETS_KIB = (1, 4, 16, 64, 256, 1024, 4096, 16384, 65536)
+
+_GROUPINGS = ('lineno', 'filename', 'traceback')
+
+_IGNORED_FILES = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def _kib(size: int) -> float:
+    return round(size / 1024, 1)
+
+
+def _site(statistic) -> str:
+    frame = statistic.traceback[0]
+    return f"{frame.filename}:{frame.lineno}"
+
+
+class AllocationTracker:
+    def __init__(self, history: int = 120):
+        self.interval: float = 0
+        self.frames = 1
+        self.baseline: typ.Optional[tracemalloc.Snapshot] = None
+        self.previous: typ.Optional[tracemalloc.Snapshot] = None
+        self.latest: typ.Optional[tracemalloc.Snapshot] = None
+        # (unix time, traced bytes) of every snapshot, the trend without keeping the snapshots
+        self.history: typ.Deque[typ.Tuple[float, int]] = deque(maxlen=history)
+        self.request_allocations = HistogramFamily(buckets=REQUEST_ALLOCATION_BUCKETS_KIB)
+        self._thread: typ.Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._pid: typ.Optional[int] = None
+        self._lock = threading.Lock()
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def configure(self, interval: float, frames: int = 1) -> None:
+        """Snapshot every `interval` seconds (0 disables), keeping `frames` frames per allocation"""
+        self.interval, self.frames = interval, max(1, frames)
+
+    def start(self, frames: typ.Optional[int] = None, interval: typ.Optional[float] = None) -> None:
+        """Start tracing (e.g. from the admin endpoint) and take the baseline snapshot"""
+        with self._lock:
+            if frames is not None:
+                self.frames = max(1, frames)
+            if interval is not None:
+                self.interval = interval
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self.frames)
+                self.baseline = self.previous = self.latest = None
+                self.history.clear()
+        self.take_snapshot()
+        self.ensure_started()
+
+    def stop(self) -> None:
+        """Stop the snapshot thread, tracing stays on"""
+        if self._is_running():
+            self._stop.set()
+            self._thread.join(timeout=5)
+
+    def stop_tracing(self) -> None:
+        """Stop the thread and tracing, dropping the snapshots and their memory"""
+        self.stop()
+        with self._lock:
+            tracemalloc.stop()
+            self.baseline = self.previous = self.latest = None
+
+    def ensure_started(self) -> None:
+        """Start tracing and the snapshot thread, or restart the thread in a forked worker"""
+        if self.interval <= 0 or self._is_running():
+            return
+        if not tracemalloc.is_tracing():
+            self.start()
+            return
+        with self._lock:
+            if self._is_running():
+                return
+            self._pid = os.getpid()
+            self._stop = threading.Event()
+            self._thread = threading.Thread(target=self._run, name="allocation-tracker", daemon=True)
+            self._thread.start()
+
+    def _is_running(self) -> bool:
+        return self._pid == os.getpid() and self._thread is not None and self._thread.is_alive()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.take_snapshot()
+
+    def take_snapshot(self) -> typ.Optional[tracemalloc.Snapshot]:
+        if not tracemalloc.is_tracing():
+            return None
+        try:
+            snapshot = tracemalloc.take_snapshot().filter_traces(_IGNORED_FILES)
+        except Exception as e:
+            logger.error(f"Taking an allocation snapshot failed: {e}")
+            return None
+        with self._lock:
+            if self.baseline is None:
+                self.baseline = snapshot
+            # keep three snapshots at most, the baseline, the one before the latest and the latest
+            self.previous, self.latest = self.latest, snapshot
+            self.history.append((time.time(), tracemalloc.get_traced_memory()[0]))
+        return snapshot
+
+    def report(self, top: int = 20, group_by: str = 'lineno', compare: str = 'baseline', fresh: bool = True) -> dict:
+        """
+        The top allocation sites of the latest snapshot (a fresh one unless `fresh` is false) and
+        the sites that grew most since the `compare` snapshot ("baseline" or "previous")
+        """
+        if group_by not in _GROUPINGS:
+            raise ValueError(f"group_by must be one of {', '.join(_GROUPINGS)}")
+        if not tracemalloc.is_tracing():
+            return {"tracing": False}
+
+        snapshot = self.take_snapshot() if fresh else self.latest
+        with self._lock:
+            earlier = self.baseline if compare == 'baseline' else self.previous
+            history = list(self.history)
+        current, peak = tracemalloc.get_traced_memory()
+        result = {
+            "tracing": True,
+            "frames": tracemalloc.get_traceback_limit(),
+            "traced_kib": _kib(current),
+            "traced_peak_kib": _kib(peak),
+            # what tracemalloc itself uses to store the traces
+            "overhead_kib": _kib(tracemalloc.get_tracemalloc_memory()),
+            "snapshots": [{"at": round(at, 3), "traced_kib": _kib(size)} for at, size in history],
+        }
+        if snapshot is None:
+            return result
+
+        result["top"] = [
+            {
+                "site": _site(statistic),
+                "size_kib": _kib(statistic.size),
+                "count": statistic.count,
+                **({"traceback": statistic.traceback.format()} if group_by == 'traceback' else {}),
+            }
+            for statistic in snapshot.statistics(group_by)[:top]
+        ]
+        if earlier is not None and earlier is not snapshot:
+            result["compared_to"] = compare
+            result["growth"] = [
+                {
+                    "site": _site(difference),
+                    "size_diff_kib": _kib(difference.size_diff),
+                    "count_diff": difference.count_diff,
+                    "size_kib": _kib(difference.size),
+                    **({"traceback": difference.traceback.format()} if group_by == 'traceback' else {}),
+                }
+                for difference in snapshot.compare_to(earlier, group_by)[:top]
+                if difference.size_diff > 0
+            ]
+        return result
+
+
+allocation_tracker = AllocationTracker()
+atexit.register(allocation_tracker.stop)
+
+
+def register_request_allocations(app: Flask) -> None:
+    """
+    While tracing, record the peak of traced memory above its level at the start of each request
+    per route. The peak is process wide, so concurrent requests inflate each other's numbers:
+    read them per route relative to each other, or profile with a single thread.
+    """
+
+    @app.before_request
+    def start_allocation_tracking():
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+            g.allocation_start = tracemalloc.get_traced_memory()[0]
+
+    @app.teardown_request
+    def record_request_allocation(exc):
+        start = g.pop('allocation_start', None)
+        if start is not None and tracemalloc.is_tracing():
+            peak = tracemalloc.get_traced_memory()[1]
+            allocation_tracker.request_allocations.observe(
+                f"{request.method} {request.endpoint or 'unmatched'}", max(0, peak - start) / 1024
+            )
+
+
+def get_cache_sizes() -> dict:
+    """Entries of every in-process cache, the usual suspects when a worker keeps growing"""
+    from realworld.api.core.auth import get_token_cache_info
+    from realworld.api.core.db import get_cache_info
+    from realworld.api.core.membership import follow_index, favorites_index
+    from realworld.api.core.route_metrics import route_metrics
+
+    return {
+        "decoded_tokens": get_token_cache_info(),
+        "follow_index": follow_index.stats(),
+        "favorites_index": favorites_index.stats(),
+        **get_cache_info(),
+        "route_histograms": {
+            "entries": len(route_metrics.latency_ms.items()),
+            "max_entries": route_metrics.latency_ms.max_keys,
+        },
+    }
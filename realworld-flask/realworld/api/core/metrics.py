@@ -0,0 +1,208 @@
+import bisect
+import threading
+import typing as typ
+
+# Upper bounds (milliseconds) of the latency buckets, the last bucket is open ended
+DEFAULT_BUCKETS_MS = (
+    0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000,
+)
+
+# Shards of finished threads are folded into the histogram once it has this many
+_MAX_SHARDS = 64
+
+
+class HistogramData:
+    """Bucket counts, count, sum and max of a histogram, or of the part one thread writes to"""
+
+    __slots__ = ("thread", "counts", "count", "sum", "max")
+
+    def __init__(self, size: int, thread: typ.Optional[threading.Thread] = None):
+        self.thread = thread
+        self.counts = [0] * size
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def merge(self, other: "HistogramData") -> None:
+        for index, bucket_count in enumerate(other.counts):
+            self.counts[index] += bucket_count
+        self.count += other.count
+        self.sum += other.sum
+        self.max = max(self.max, other.max)
+
+    def minus(self, earlier: "HistogramData") -> "HistogramData":
+        """What was recorded since `earlier` (max stays the overall max, it cannot be subtracted)"""
+        delta = HistogramData(len(self.counts))
+        delta.counts = [now - before for now, before in zip(self.counts, earlier.counts)]
+        delta.count = self.count - earlier.count
+        delta.sum = self.sum - earlier.sum
+        delta.max = self.max
+        return delta
+
+
+class Histogram:
+    """
+    Fixed-bucket latency histogram, cheap to update and to merge. Every thread records into its
+    own shard without taking a lock, reads add the shards up (a read racing a write may see it
+    half applied, which a metric can live with).
+    """
+
+    def __init__(self, buckets: typ.Sequence[float] = DEFAULT_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self._local = threading.local()
+        self._shards: typ.List[HistogramData] = []
+        # what threads that have exited recorded
+        self._retired = HistogramData(len(self.buckets) + 1)
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._new_shard()
+        shard.counts[bisect.bisect_left(self.buckets, value)] += 1
+        shard.count += 1
+        shard.sum += value
+        if value > shard.max:
+            shard.max = value
+
+    def _new_shard(self) -> HistogramData:
+        shard = HistogramData(len(self.buckets) + 1, threading.current_thread())
+        with self._lock:
+            if len(self._shards) >= _MAX_SHARDS:
+                # e.g. the development server, which starts a thread per request
+                self._retire_finished()
+            self._shards.append(shard)
+        self._local.shard = shard
+        return shard
+
+    def _retire_finished(self) -> None:
+        """Fold the shards of exited threads into one, called with the lock held"""
+        alive = []
+        for shard in self._shards:
+            if shard.thread.is_alive():
+                alive.append(shard)
+            else:
+                self._retired.merge(shard)
+        self._shards = alive
+
+    def merged(self) -> HistogramData:
+        """All shards added up"""
+        total = HistogramData(len(self.buckets) + 1)
+        with self._lock:
+            self._retire_finished()
+            total.merge(self._retired)
+            shards = list(self._shards)
+        for shard in shards:
+            total.merge(shard)
+        return total
+
+    def percentile(self, pct: float) -> float:
+        """Upper bound of the bucket holding the pct-th percentile (max for the open bucket)"""
+        return percentile(self.buckets, self.merged(), pct)
+
+    def snapshot(self, unit: str = 'ms') -> dict:
+        merged = self.merged()
+        return {
+            "count": merged.count,
+            f"sum_{unit}": round(merged.sum, 3),
+            f"max_{unit}": round(merged.max, 3),
+            f"p50_{unit}": percentile(self.buckets, merged, 50),
+            f"p95_{unit}": percentile(self.buckets, merged, 95),
+            f"p99_{unit}": percentile(self.buckets, merged, 99),
+        }
+
+
+def percentile(buckets: typ.Sequence[float], merged: HistogramData, pct: float) -> float:
+    """Upper bound of the bucket holding the pct-th percentile of histogram data"""
+    if not merged.count:
+        return 0.0
+    rank = merged.count * pct / 100
+    seen = 0
+    for index, bucket_count in enumerate(merged.counts):
+        seen += bucket_count
+        if seen >= rank:
+            return buckets[index] if index < len(buckets) else merged.max
+    return merged.max
+
+
+class HistogramFamily:
+    """Histograms keyed by a label (route, pool, query fingerprint), bounded in cardinality"""
+
+    OVERFLOW_KEY = "__other__"
+
+    def __init__(self, max_keys: int = 500, buckets: typ.Sequence[float] = DEFAULT_BUCKETS_MS):
+        self.max_keys = max_keys
+        self.buckets = tuple(buckets)
+        self._histograms: typ.Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, key: str, value: float) -> None:
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                if key not in self._histograms and len(self._histograms) >= self.max_keys:
+                    key = self.OVERFLOW_KEY
+                histogram = self._histograms.setdefault(key, Histogram(self.buckets))
+        histogram.observe(value)
+
+    def items(self) -> typ.List[typ.Tuple[str, Histogram]]:
+        return list(self._histograms.items())
+
+    def snapshot(self, unit: str = 'ms') -> typ.Dict[str, dict]:
+        return {key: histogram.snapshot(unit) for key, histogram in self.items()}
+
+
+class CounterFamily:
+    """Counters keyed by a label, per-thread like the histograms, bounded in cardinality"""
+
+    OVERFLOW_KEY = HistogramFamily.OVERFLOW_KEY
+
+    def __init__(self, max_keys: int = 500):
+        self.max_keys = max_keys
+        self._local = threading.local()
+        self._shards: typ.List[typ.Tuple[threading.Thread, typ.Dict[str, int]]] = []
+        self._retired: typ.Dict[str, int] = {}
+        self._keys: typ.Set[str] = set()
+        self._lock = threading.Lock()
+
+    def increment(self, key: str, amount: int = 1) -> None:
+        try:
+            counts = self._local.counts
+        except AttributeError:
+            counts = self._new_shard()
+        if key not in self._keys:
+            with self._lock:
+                if key not in self._keys and len(self._keys) >= self.max_keys:
+                    key = self.OVERFLOW_KEY
+                self._keys.add(key)
+        counts[key] = counts.get(key, 0) + amount
+
+    def _new_shard(self) -> typ.Dict[str, int]:
+        counts: typ.Dict[str, int] = {}
+        with self._lock:
+            if len(self._shards) >= _MAX_SHARDS:
+                self._retire_finished()
+            self._shards.append((threading.current_thread(), counts))
+        self._local.counts = counts
+        return counts
+
+    def _retire_finished(self) -> None:
+        alive = []
+        for thread, counts in self._shards:
+            if thread.is_alive():
+                alive.append((thread, counts))
+            else:
+                for key, value in list(counts.items()):
+                    self._retired[key] = self._retired.get(key, 0) + value
+        self._shards = alive
+
+    def snapshot(self) -> typ.Dict[str, int]:
+        with self._lock:
+            self._retire_finished()
+            totals = dict(self._retired)
+            shards = [counts for _, counts in self._shards]
+        for counts in shards:
+            for key, value in list(counts.items()):
+                totals[key] = totals.get(key, 0) + value
+        return totals
@@ -2,6 +2,7 @@ import humps
 import typing as typ
 from datetime import datetime
 from pydantic import BaseModel, field_serializer
+from realworld.api.core.tracing import serializing
 
 
 #
@@ -14,11 +15,15 @@ class BaseCamelModel(BaseModel):
         alias_generator = humps.camelize
         populate_by_name = True
         extra = "ignore"
+        # build validators and serializers on first use rather than at import, most models
+        # are only touched by a few routes and a fresh worker should start serving quickly
+        defer_build = True
 
     def model_dump(self, *args, **kwargs) -> dict:
         if "by_alias" not in kwargs:
             kwargs["by_alias"] = True
-        return super().model_dump(*args, **kwargs)
+        with serializing(type(self).__name__):
+            return super().model_dump(*args, **kwargs)
 
 
 #
@@ -0,0 +1,135 @@
+import os
+import sys
+import time
+import threading
+import typing as typ
+from collections import Counter
+from flask import Flask, request
+
+# A wall-clock stack sampler for a running worker: every `interval` the stacks of all threads are
+# read with sys._current_frames() and counted as collapsed stacks ("outer;inner;leaf count"), the
+# input format of flamegraph.pl, speedscope and friends. Only the profiling request's own thread
+# does any work, the profiled threads are not interrupted beyond giving up the GIL for the read.
+# Threads serving a request carry its route as the root frame, so one flame graph splits by route.
+
+IDLE_ROUTE = 'idle'
+
+# thread ident -> "<METHOD> <endpoint>" of the request the thread is serving
+_active_routes: typ.Dict[int, str] = {}
+
+# one profile per process at a time, a second one would mostly sample the first
+_profile_lock = threading.Lock()
+
+_PREFIXES = tuple(sorted(
+    {os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))}
+    | {path for path in sys.path if path and os.path.isdir(path)},
+    key=len,
+    reverse=True,
+))
+
+
+class ProfileInProgress(Exception):
+    pass
+
+
+def register_route_tracking(app: Flask) -> None:
+    """Remember which route every worker thread is serving, for per-route profiles"""
+
+    @app.before_request
+    def track_route():
+        _active_routes[threading.get_ident()] = f"{request.method} {request.endpoint}"
+
+    @app.teardown_request
+    def untrack_route(exc):
+        _active_routes.pop(threading.get_ident(), None)
+
+
+def _frame_label(code, cache: typ.Dict[typ.Any, str]) -> str:
+    label = cache.get(code)
+    if label is None:
+        filename = code.co_filename
+        for prefix in _PREFIXES:
+            if filename.startswith(prefix):
+                filename = filename[len(prefix):].lstrip(os.sep)
+                break
+        # the function's first line rather than the current one, so samples of a function merge
+        label = f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(";", ",")
+        cache[code] = label
+    return label
+
+
+def sample_stacks(
+    seconds: float,
+    interval: float = 0.01,
+    route: typ.Optional[str] = None,
+    include_idle: bool = False,
+    max_depth: int = 128,
+) -> typ.Tuple[Counter, dict]:
+    """
+    Sample the stacks of the other threads of this process for `seconds`. Only threads serving a
+    request are counted unless `include_idle`; `route` keeps the ones whose route contains it
+    (e.g. "get_articles" or "GET articles_endpoints"). Returns the collapsed stack counts and
+    the sampling statistics.
+    """
+    if not _profile_lock.acquire(blocking=False):
+        raise ProfileInProgress()
+    try:
+        own_ident = threading.get_ident()
+        stacks: Counter = Counter()
+        labels: typ.Dict[typ.Any, str] = {}
+        samples = 0
+        sampling_s = 0.0
+        started_at = time.perf_counter()
+        deadline = started_at + seconds
+        next_sample_at = started_at
+        while True:
+            sample_started_at = time.perf_counter()
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                thread_route = _active_routes.get(ident)
+                if thread_route is None and not include_idle:
+                    continue
+                if route and (thread_route is None or route not in thread_route):
+                    continue
+                names = []
+                while frame is not None and len(names) < max_depth:
+                    names.append(_frame_label(frame.f_code, labels))
+                    frame = frame.f_back
+                names.append(thread_route or IDLE_ROUTE)
+                stacks[";".join(reversed(names))] += 1
+            # do not keep the last frame (and its locals) alive while sleeping
+            frame = None
+            samples += 1
+            sampling_s += time.perf_counter() - sample_started_at
+
+            # fixed rate rather than fixed gaps, so a slow read does not stretch the interval
+            next_sample_at += interval
+            now = time.perf_counter()
+            if next_sample_at >= deadline:
+                break
+            if next_sample_at > now:
+                time.sleep(next_sample_at - now)
+            else:
+                next_sample_at = now
+        elapsed = time.perf_counter() - started_at
+    finally:
+        _profile_lock.release()
+
+    return stacks, {
+        "pid": os.getpid(),
+        "seconds": round(elapsed, 3),
+        "interval_ms": round(interval * 1000, 3),
+        "samples": samples,
+        "stacks": sum(stacks.values()),
+        "route": route,
+        "include_idle": include_idle,
+        # share of the profile spent reading stacks, time the GIL was not available to requests
+        "overhead_pct": round(sampling_s / elapsed * 100, 3) if elapsed else 0.0,
+        "sample_us": round(sampling_s / samples * 1e6, 1) if samples else 0.0,
+    }
+
+
+def collapse(stacks: Counter) -> str:
+    """One "frame;frame;frame count" line per distinct stack, most frequent first"""
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
@@ -0,0 +1,64 @@
+import os
+import logging
+import typing as typ
+from collections import Counter
+from functools import wraps
+from flask import current_app, g, has_request_context, request
+
+logger = logging.getLogger(__name__)
+
+# The same statement this many times in one request is reported as a likely N+1
+REPEATED_STATEMENT_THRESHOLD = int(os.getenv("QUERY_REPEAT_THRESHOLD", "3"))
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def record_statement(fingerprint: str) -> None:
+    """Count a statement against the current request (called from the engine events)"""
+    if has_request_context():
+        if "query_fingerprints" not in g:
+            g.query_fingerprints = Counter()
+        g.query_fingerprints[fingerprint] += 1
+
+
+def get_query_count() -> int:
+    return sum(g.get("query_fingerprints", {}).values())
+
+
+def get_repeated_statements() -> typ.Dict[str, int]:
+    return {
+        fingerprint: count
+        for fingerprint, count in g.get("query_fingerprints", {}).items()
+        if count >= REPEATED_STATEMENT_THRESHOLD
+    }
+
+
+def query_budget(max_queries: int):
+    """
+    Declare how many statements a route may issue. Going over logs a warning, or raises
+    QueryBudgetExceeded when testing (app.testing or QUERY_BUDGET_STRICT=true).
+    Goes below the @blueprint.route decorator.
+    """
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwds):
+            result = func(*args, **kwds)
+
+            if (query_count := get_query_count()) > max_queries:
+                message = (
+                    f"{request.endpoint} issued {query_count} statements, "
+                    f"budget is {max_queries}"
+                )
+                strict = os.getenv("QUERY_BUDGET_STRICT", "FALSE").upper() == "TRUE"
+                if current_app.testing or strict:
+                    raise QueryBudgetExceeded(message)
+                logger.warning(message)
+
+            return result
+
+        return wrapper
+
+    return decorator
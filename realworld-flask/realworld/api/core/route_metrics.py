@@ -0,0 +1,205 @@
+import os
+import sys
+import json
+import time
+import atexit
+import logging
+import threading
+import typing as typ
+from realworld.api.core.metrics import CounterFamily, HistogramData, HistogramFamily, percentile
+
+logger = logging.getLogger(__name__)
+
+# Request count, error count and latency per route, where a route is "<METHOD> <endpoint>"
+# (e.g. "GET articles.get_articles"), so cardinality is bounded by the URL map, not by the URLs.
+# Counters are cumulative since process start. The EMF publisher turns them into per-interval
+# deltas, Prometheus-style scrapers compute rates themselves.
+
+UNMATCHED_ENDPOINT = 'unmatched'
+
+
+class RouteMetrics:
+    def __init__(self):
+        self.latency_ms = HistogramFamily()
+        self.errors = CounterFamily()  # 5xx
+        self.client_errors = CounterFamily()  # 4xx
+
+    def record(self, method: str, endpoint: typ.Optional[str], status: int, duration_ms: float) -> None:
+        route = f"{method} {endpoint or UNMATCHED_ENDPOINT}"
+        self.latency_ms.observe(route, duration_ms)
+        if status >= 500:
+            self.errors.increment(route)
+        elif status >= 400:
+            self.client_errors.increment(route)
+
+    def snapshot(self) -> typ.Dict[str, dict]:
+        errors, client_errors = self.errors.snapshot(), self.client_errors.snapshot()
+        return {
+            route: {
+                "errors": errors.get(route, 0),
+                "client_errors": client_errors.get(route, 0),
+                **histogram.snapshot(),
+            }
+            for route, histogram in sorted(self.latency_ms.items())
+        }
+
+    def render_text(self, prefix: str = 'realworld') -> str:
+        """The counters and cumulative latency buckets in the Prometheus text exposition format"""
+        errors, client_errors = self.errors.snapshot(), self.client_errors.snapshot()
+        lines = [
+            f"# HELP {prefix}_requests_total Requests handled by this process",
+            f"# TYPE {prefix}_requests_total counter",
+        ]
+        routes = sorted(self.latency_ms.items())
+        merged = {route: histogram.merged() for route, histogram in routes}
+        for route, data in merged.items():
+            lines.append(f"{prefix}_requests_total{{{_labels(route)}}} {data.count}")
+
+        lines += [
+            f"# HELP {prefix}_request_errors_total Requests answered with a 4xx or 5xx status",
+            f"# TYPE {prefix}_request_errors_total counter",
+        ]
+        for route in merged:
+            lines.append(f'{prefix}_request_errors_total{{{_labels(route)},class="5xx"}} {errors.get(route, 0)}')
+            lines.append(f'{prefix}_request_errors_total{{{_labels(route)},class="4xx"}} {client_errors.get(route, 0)}')
+
+        lines += [
+            f"# HELP {prefix}_request_duration_ms Request latency in milliseconds",
+            f"# TYPE {prefix}_request_duration_ms histogram",
+        ]
+        for route, histogram in routes:
+            data, cumulative = merged[route], 0
+            for bound, bucket_count in zip(histogram.buckets, data.counts):
+                cumulative += bucket_count
+                lines.append(f'{prefix}_request_duration_ms_bucket{{{_labels(route)},le="{bound:g}"}} {cumulative}')
+            lines.append(f'{prefix}_request_duration_ms_bucket{{{_labels(route)},le="+Inf"}} {data.count}')
+            lines.append(f"{prefix}_request_duration_ms_sum{{{_labels(route)}}} {data.sum:.3f}")
+            lines.append(f"{prefix}_request_duration_ms_count{{{_labels(route)}}} {data.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(route: str) -> str:
+    method, _, endpoint = route.partition(' ')
+    endpoint = endpoint.replace('\\', '\\\\').replace('"', '\\"')
+    return f'method="{method}",endpoint="{endpoint}"'
+
+
+route_metrics = RouteMetrics()
+
+
+class EmfPublisher:
+    """
+    Writes the route metrics of the last interval to stdout as CloudWatch Embedded Metric Format
+    documents, one per route with traffic, from a background thread. CloudWatch Logs extracts
+    them as metrics (dimensions Service and Route) without any PutMetricData calls.
+    """
+
+    def __init__(self, metrics: RouteMetrics, stream: typ.Optional[typ.TextIO] = None):
+        self.metrics = metrics
+        self.stream = stream
+        self.interval: float = 0
+        self.namespace = ''
+        self.service = ''
+        self._previous: typ.Dict[str, typ.Tuple[HistogramData, int, int]] = {}
+        self._thread: typ.Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._pid: typ.Optional[int] = None
+        self._lock = threading.Lock()
+
+    def configure(self, interval: float, namespace: str, service: str) -> None:
+        """Flush every `interval` seconds (0 disables) under the CloudWatch `namespace`"""
+        self.interval, self.namespace, self.service = interval, namespace, service
+
+    def ensure_started(self) -> None:
+        """Start the flush thread, or restart it in a forked worker (threads do not survive fork)"""
+        if self.interval <= 0 or self._is_running():
+            return
+        with self._lock:
+            if self._is_running():
+                return
+            self._pid = os.getpid()
+            # the parent's traffic is not ours to report
+            self._previous = self._totals()
+            self._stop = threading.Event()
+            self._thread = threading.Thread(target=self._run, name="emf-publisher", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the thread and publish what was recorded since the last flush"""
+        if self._is_running():
+            self._stop.set()
+            self._thread.join(timeout=5)
+
+    def _is_running(self) -> bool:
+        return self._pid == os.getpid() and self._thread is not None and self._thread.is_alive()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.flush()
+        self.flush()
+
+    def _totals(self) -> typ.Dict[str, typ.Tuple[HistogramData, int, int]]:
+        errors, client_errors = self.metrics.errors.snapshot(), self.metrics.client_errors.snapshot()
+        return {
+            route: (histogram.merged(), errors.get(route, 0), client_errors.get(route, 0))
+            for route, histogram in self.metrics.latency_ms.items()
+        }
+
+    def flush(self) -> None:
+        try:
+            totals = self._totals()
+            timestamp = int(time.time() * 1000)
+            documents = []
+            for route, (data, errors, client_errors) in totals.items():
+                previous_data, previous_errors, previous_client_errors = self._previous.get(
+                    route, (HistogramData(len(data.counts)), 0, 0)
+                )
+                interval = data.minus(previous_data)
+                if interval.count <= 0:
+                    continue
+                documents.append(self._document(
+                    timestamp, route, interval, errors - previous_errors, client_errors - previous_client_errors
+                ))
+            self._previous = totals
+            if documents:
+                stream = self.stream or sys.stdout
+                stream.write("".join(json.dumps(document) + "\n" for document in documents))
+                stream.flush()
+        except Exception as e:
+            logger.error(f"Publishing route metrics failed: {e}")
+
+    def _document(
+        self, timestamp: int, route: str, interval: HistogramData, errors: int, client_errors: int
+    ) -> dict:
+        buckets = self.metrics.latency_ms.buckets
+        return {
+            "_aws": {
+                "Timestamp": timestamp,
+                "CloudWatchMetrics": [{
+                    "Namespace": self.namespace,
+                    "Dimensions": [["Service", "Route"]],
+                    "Metrics": [
+                        {"Name": "Requests", "Unit": "Count"},
+                        {"Name": "Errors", "Unit": "Count"},
+                        {"Name": "ClientErrors", "Unit": "Count"},
+                        {"Name": "LatencyAvg", "Unit": "Milliseconds"},
+                        {"Name": "LatencyP50", "Unit": "Milliseconds"},
+                        {"Name": "LatencyP95", "Unit": "Milliseconds"},
+                        {"Name": "LatencyP99", "Unit": "Milliseconds"},
+                    ],
+                }],
+            },
+            "Service": self.service,
+            "Route": route,
+            "Requests": interval.count,
+            "Errors": errors,
+            "ClientErrors": client_errors,
+            "LatencyAvg": round(interval.sum / interval.count, 3),
+            "LatencyP50": percentile(buckets, interval, 50),
+            "LatencyP95": percentile(buckets, interval, 95),
+            "LatencyP99": percentile(buckets, interval, 99),
+        }
+
+
+emf_publisher = EmfPublisher(route_metrics)
+atexit.register(emf_publisher.stop)
@@ -0,0 +1,355 @@
+import os
+import re
+import json
+import time
+import queue
+import atexit
+import random
+import logging
+import threading
+import typing as typ
+import urllib.request
+from functools import wraps
+from contextlib import contextmanager
+from contextvars import ContextVar
+from flask import Flask, g, request
+from flask.json.provider import DefaultJSONProvider
+
+logger = logging.getLogger(__name__)
+
+# A trace per request: a server span for the request, child spans for the handler functions
+# (@traced), every SQL statement (from the engine events in core.db) and serialization. The
+# db and serialize durations are always summed up for the Server-Timing header; span objects
+# are only kept for sampled requests and exported as OTLP/JSON from a background thread.
+
+SPAN_KIND_INTERNAL, SPAN_KIND_SERVER, SPAN_KIND_CLIENT = 1, 2, 3
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+_REQUEST_ID = re.compile(r"^[\w.:@/+=-]{1,128}$")
+
+
+class _Span:
+    __slots__ = ("span_id", "parent_id", "name", "kind", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, name: str, kind: int, parent_id: typ.Optional[str], attributes: typ.Optional[dict] = None):
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes = attributes or {}
+        self.error: typ.Optional[str] = None
+
+
+class Trace:
+    """The spans and timings of one request"""
+
+    def __init__(self, trace_id: str, sampled: bool, parent_id: typ.Optional[str] = None):
+        self.trace_id = trace_id
+        self.sampled = sampled
+        self.spans: typ.List[_Span] = []
+        self.current_id: typ.Optional[str] = parent_id
+        self.db_ms = 0.0
+        self.db_statements = 0
+        self.serialize_ms = 0.0
+
+    def start_span(self, name: str, kind: int = SPAN_KIND_INTERNAL, attributes: typ.Optional[dict] = None) -> _Span:
+        span = _Span(name, kind, self.current_id, attributes)
+        self.spans.append(span)
+        self.current_id = span.span_id
+        return span
+
+    def end_span(self, span: _Span) -> None:
+        span.end_ns = time.time_ns()
+        self.current_id = span.parent_id
+
+
+_current_trace: ContextVar[typ.Optional[Trace]] = ContextVar("realworld_trace", default=None)
+
+
+@contextmanager
+def span(name: str, kind: int = SPAN_KIND_INTERNAL, attributes: typ.Optional[dict] = None) -> typ.Iterator[None]:
+    """A child span of the current one, a no-op outside a sampled request"""
+    trace = _current_trace.get()
+    if trace is None or not trace.sampled:
+        yield
+        return
+    current = trace.start_span(name, kind, attributes)
+    try:
+        yield
+    except Exception as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        trace.end_span(current)
+
+
+def traced(func: typ.Callable) -> typ.Callable:
+    """Run the function in a span named after it, e.g. on the handler functions"""
+    # e.g. "articles.get_articles" for realworld.api.routes.v1.articles.handler.get_articles
+    name = f"{func.__module__.removesuffix('.handler').rsplit('.', 1)[-1]}.{func.__name__}"
+
+    @wraps(func)
+    def wrapper(*args, **kwds):
+        trace = _current_trace.get()
+        if trace is None or not trace.sampled:
+            return func(*args, **kwds)
+        with span(name):
+            return func(*args, **kwds)
+
+    return wrapper
+
+
+@contextmanager
+def serializing(name: str) -> typ.Iterator[None]:
+    """Time a serialization step towards Server-Timing, as a span when sampled"""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    started_at = time.perf_counter()
+    try:
+        if trace.sampled:
+            with span(f"serialize {name}"):
+                yield
+        else:
+            yield
+    finally:
+        trace.serialize_ms += (time.perf_counter() - started_at) * 1000
+
+
+def record_statement_span(statement: str, fingerprint: str, pool: str, duration_ms: float) -> None:
+    """Called from the after_cursor_execute event with the statement that just finished"""
+    trace = _current_trace.get()
+    if trace is None:
+        return
+    trace.db_ms += duration_ms
+    trace.db_statements += 1
+    if trace.sampled:
+        end_ns = time.time_ns()
+        current = _Span(
+            statement.split(None, 1)[0].upper() if statement else "SQL",
+            SPAN_KIND_CLIENT,
+            trace.current_id,
+            {"db.system": "postgresql", "db.statement": statement, "db.fingerprint": fingerprint, "db.pool": pool},
+        )
+        current.start_ns, current.end_ns = end_ns - int(duration_ms * 1e6), end_ns
+        trace.spans.append(current)
+
+
+class TracingJSONProvider(DefaultJSONProvider):
+    """Flask's JSON provider with the encoding of responses timed as serialization"""
+
+    def dumps(self, obj: typ.Any, **kwargs: typ.Any) -> str:
+        with serializing("json"):
+            return super().dumps(obj, **kwargs)
+
+
+#
+# Export
+#
+
+
+def _otlp_value(value: typ.Any) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_span(trace_id: str, current: _Span) -> dict:
+    encoded = {
+        "traceId": trace_id,
+        "spanId": current.span_id,
+        "name": current.name,
+        "kind": current.kind,
+        "startTimeUnixNano": str(current.start_ns),
+        "endTimeUnixNano": str(current.end_ns or current.start_ns),
+        "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in current.attributes.items()],
+        # 1 = ok, 2 = error
+        "status": {"code": 2, "message": current.error} if current.error else {"code": 1},
+    }
+    if current.parent_id:
+        encoded["parentSpanId"] = current.parent_id
+    return encoded
+
+
+class SpanExporter:
+    """
+    Batches finished traces and writes them every `interval` seconds as OTLP/JSON
+    (ExportTraceServiceRequest): appended as one line to a file, or POSTed to a collector's
+    /v1/traces endpoint. Drops traces instead of blocking requests when the queue is full.
+    """
+
+    def __init__(self, max_queue: int = 2048):
+        self.target = ""
+        self.service = ""
+        self.interval = 2.0
+        self.dropped = 0
+        self.exported = 0
+        self._queue: "queue.Queue[Trace]" = queue.Queue(max_queue)
+        self._thread: typ.Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._pid: typ.Optional[int] = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.target)
+
+    def configure(self, target: str, service: str, interval: float = 2.0) -> None:
+        self.target, self.service, self.interval = target, service, interval
+
+    def ensure_started(self) -> None:
+        """Start the export thread, or restart it in a forked worker"""
+        if not self.enabled or self._is_running():
+            return
+        with self._lock:
+            if self._is_running():
+                return
+            self._pid = os.getpid()
+            # traces queued by the parent were (or will be) exported by the parent
+            self._queue = queue.Queue(self._queue.maxsize)
+            self._stop = threading.Event()
+            self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the thread after exporting what is queued"""
+        if self._is_running():
+            self._stop.set()
+            self._thread.join(timeout=5)
+
+    def export(self, trace: Trace) -> None:
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            self.dropped += 1
+
+    def metrics(self) -> dict:
+        return {"target": self.target or None, "exported": self.exported, "dropped": self.dropped}
+
+    def _is_running(self) -> bool:
+        return self._pid == os.getpid() and self._thread is not None and self._thread.is_alive()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._flush()
+        self._flush()
+
+    def _flush(self) -> None:
+        traces = []
+        while True:
+            try:
+                traces.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if not traces:
+            return
+        payload = json.dumps({
+            "resourceSpans": [{
+                "resource": {"attributes": [
+                    {"key": "service.name", "value": {"stringValue": self.service}},
+                    {"key": "service.instance.id", "value": {"stringValue": f"{os.getenv('HOSTNAME', 'unknown')}:{os.getpid()}"}},
+                ]},
+                "scopeSpans": [{
+                    "scope": {"name": "realworld.tracing"},
+                    "spans": [_otlp_span(trace.trace_id, current) for trace in traces for current in trace.spans],
+                }],
+            }]
+        })
+        try:
+            if self.target.startswith(("http://", "https://")):
+                post = urllib.request.Request(
+                    self.target, data=payload.encode(), headers={"Content-Type": "application/json"}, method="POST"
+                )
+                with urllib.request.urlopen(post, timeout=5) as response:
+                    response.read()
+            else:
+                with open(self.target.removeprefix("file:"), "a") as f:
+                    f.write(payload + "\n")
+            self.exported += len(traces)
+        except Exception as e:
+            self.dropped += len(traces)
+            logger.warning(f"Exporting {len(traces)} traces to {self.target} failed: {e}")
+
+
+span_exporter = SpanExporter()
+atexit.register(span_exporter.stop)
+
+
+#
+# Flask integration
+#
+
+
+def _start_trace(sample_rate: float) -> Trace:
+    """Continue the caller's trace (W3C traceparent) or start one"""
+    if match := _TRACEPARENT.match(request.headers.get("traceparent", "")):
+        trace_id, parent_id, flags = match.groups()
+        sampled = span_exporter.enabled and (int(flags, 16) & 1 == 1 or random.random() < sample_rate)
+        return Trace(trace_id, sampled, parent_id)
+    return Trace(os.urandom(16).hex(), span_exporter.enabled and random.random() < sample_rate)
+
+
+def register_tracing(app: Flask, sample_rate: float = 1.0) -> None:
+    """
+    Trace every request: X-Request-ID (the caller's, or the trace id), a Server-Timing header
+    with the db, serialize and total durations, and exported spans for sampled requests.
+    """
+    app.json = TracingJSONProvider(app)
+
+    @app.before_request
+    def start_request_trace():
+        g.setdefault('request_started_at', time.perf_counter())
+        trace = _start_trace(sample_rate)
+        g.trace = trace
+        g.trace_token = _current_trace.set(trace)
+        incoming_id = request.headers.get("X-Request-ID", "")
+        g.request_id = incoming_id if _REQUEST_ID.match(incoming_id) else trace.trace_id
+        if trace.sampled:
+            g.trace_span = trace.start_span(
+                f"{request.method} {request.url_rule.rule if request.url_rule else request.path}",
+                SPAN_KIND_SERVER,
+                {
+                    "http.request.method": request.method,
+                    "url.path": request.path,
+                    "http.route": request.url_rule.rule if request.url_rule else "",
+                    "request_id": g.request_id,
+                },
+            )
+
+    @app.after_request
+    def add_server_timing(response):
+        trace = g.get('trace')
+        if trace is None:
+            return response
+        total_ms = (time.perf_counter() - g.request_started_at) * 1000
+        response.headers['X-Request-ID'] = g.request_id
+        response.headers.add(
+            'Server-Timing',
+            f'db;dur={trace.db_ms:.1f};desc="{trace.db_statements} statements", '
+            f'serialize;dur={trace.serialize_ms:.1f}, total;dur={total_ms:.1f}'
+        )
+        if (root := g.get('trace_span')) is not None:
+            root.attributes["http.response.status_code"] = response.status_code
+            root.attributes["db.statement_count"] = trace.db_statements
+            if response.status_code >= 500:
+                root.error = f"HTTP {response.status_code}"
+        return response
+
+    @app.teardown_request
+    def finish_request_trace(exc):
+        trace = g.pop('trace', None)
+        if trace is None:
+            return
+        if (root := g.pop('trace_span', None)) is not None:
+            if exc is not None:
+                root.error = f"{type(exc).__name__}: {exc}"
+            trace.end_span(root)
+            span_exporter.export(trace)
+        _current_trace.reset(g.pop('trace_token'))
@@ -0,0 +1,74 @@
+import gc
+import sys
+import time
+import logging
+import typing as typ
+from flask import Flask
+from sqlalchemy.sql.elements import TextClause
+from realworld.api.core.models import BaseCamelModel
+from realworld.api.core.membership import ViewerMembershipIndex
+
+logger = logging.getLogger(__name__)
+
+# Everything a worker would otherwise build lazily on its first requests, done once in the
+# preloading master instead: the forked workers then share those pages copy-on-write rather
+# than each building (and writing) a private copy. gc.freeze() moves every object that exists
+# at fork time out of the collector's reach, so collections in a worker do not write to the
+# shared pages either (a collection updates the gc header of every object it scans).
+
+
+def _subclasses(cls: type) -> typ.Iterator[type]:
+    for subclass in cls.__subclasses__():
+        yield subclass
+        yield from _subclasses(subclass)
+
+
+def build_models() -> int:
+    """Build the validators and serializers of every model, deferred at import (defer_build)"""
+    built = 0
+    for model in _subclasses(BaseCamelModel):
+        if not model.__pydantic_complete__:
+            model.model_rebuild()
+            built += 1
+    return built
+
+
+def find_statements() -> typ.List[TextClause]:
+    """The SQL the application modules (and objects in them) hold at module level"""
+    statements = []
+    for name, module in list(sys.modules.items()):
+        if not name.startswith('realworld.') or module is None:
+            continue
+        for value in list(vars(module).values()):
+            # type() rather than isinstance(), module globals include Flask's context proxies
+            if issubclass(type(value), TextClause):
+                statements.append(value)
+            elif issubclass(type(value), ViewerMembershipIndex):
+                statements.append(value._load_query)
+    return statements
+
+
+def warm_up(app: Flask) -> dict:
+    """Build what the first requests would, in the process about to fork the workers"""
+    from realworld.api.core.db import warm_statement_cache
+
+    started_at = time.perf_counter()
+    models = build_models()
+    statements = warm_statement_cache(find_statements())
+    # werkzeug compiles the URL map into its matcher on the first request otherwise
+    app.url_map.update()
+    result = {
+        "models": models,
+        "statements": statements,
+        "warmup_ms": round((time.perf_counter() - started_at) * 1000, 1),
+    }
+    app.extensions['startup']['warmup'] = result
+    logger.info(f"Warmed up {models} models and {statements} statements in {result['warmup_ms']}ms")
+    return result
+
+
+def freeze_heap() -> int:
+    """Collect, then exempt everything that is left from future collections (before forking)"""
+    gc.collect()
+    gc.freeze()
+    return gc.get_freeze_count()
@@ -0,0 +1,120 @@
+import os
+import hmac
+from functools import wraps
+from flask import Blueprint, Response, current_app, request
+from realworld.api.core.profiler import ProfileInProgress, collapse, sample_stacks
+from realworld.api.core.memory import allocation_tracker, get_cache_sizes
+
+admin_blueprint = Blueprint("admin_endpoints", __name__, url_prefix="/admin")
+
+MAX_PROFILE_SECONDS = 60
+MIN_INTERVAL_MS = 1
+MAX_TRACE_FRAMES = 64
+
+
+def admin_token_required(func):
+    """
+    Requires the X-Admin-Token header to match ADMIN_TOKEN. Without ADMIN_TOKEN configured the
+    admin endpoints do not exist (404), so they are never reachable by accident.
+    """
+
+    @wraps(func)
+    def wrapper(*args, **kwds):
+        expected = current_app.extensions['config'].ADMIN_TOKEN
+        if not expected:
+            return {"error": "Not found"}, 404
+        provided = request.headers.get("X-Admin-Token", "")
+        if not hmac.compare_digest(provided.encode(), expected.encode()):
+            return {"error": "Invalid admin token."}, 403
+
+        return func(*args, **kwds)
+
+    return wrapper
+
+
+@admin_blueprint.route("/profile", methods=["GET"])
+@admin_token_required
+def profile():
+    """
+    Samples the stacks of this worker's threads for ?seconds=N (default 10, at most 60) every
+    ?interval_ms=M (default 10) and returns them collapsed, one "frame;frame count" line per
+    stack, ready for flamegraph.pl or speedscope. ?route=get_articles keeps the threads serving
+    a matching route, ?idle=1 includes the threads not serving a request.
+    """
+    try:
+        seconds = float(request.args.get("seconds", 10))
+        interval_ms = float(request.args.get("interval_ms", 10))
+    except ValueError:
+        return {"error": "seconds and interval_ms must be numbers."}, 400
+    if not 0 < seconds <= MAX_PROFILE_SECONDS:
+        return {"error": f"seconds must be between 0 and {MAX_PROFILE_SECONDS}."}, 400
+    if interval_ms < MIN_INTERVAL_MS:
+        return {"error": f"interval_ms must be at least {MIN_INTERVAL_MS}."}, 400
+
+    try:
+        stacks, stats = sample_stacks(
+            seconds,
+            interval_ms / 1000,
+            route=request.args.get("route") or None,
+            include_idle=request.args.get("idle", "0").lower() in ("1", "true", "yes"),
+        )
+    except ProfileInProgress:
+        return {"error": "A profile is already running in this worker."}, 409
+
+    if request.args.get("format") == "json":
+        return {"profile": stats, "stacks": dict(stacks.most_common())}
+
+    response = Response(collapse(stacks), mimetype="text/plain")
+    response.headers["X-Profile-Pid"] = str(stats["pid"])
+    response.headers["X-Profile-Samples"] = str(stats["samples"])
+    response.headers["X-Profile-Overhead"] = f"{stats['overhead_pct']}%"
+    return response
+
+
+@admin_blueprint.route("/memory", methods=["GET"])
+@admin_token_required
+def memory() -> dict:
+    """
+    Cache sizes of this worker and, while tracemalloc is tracing, the top ?top=N (default 20)
+    allocation sites grouped by ?group_by=lineno|filename|traceback, the sites that grew most
+    since the ?compare=baseline|previous snapshot and the allocation per route
+    """
+    try:
+        top = int(request.args.get("top", 20))
+        allocations = allocation_tracker.report(
+            top=top,
+            group_by=request.args.get("group_by", "lineno"),
+            compare=request.args.get("compare", "baseline"),
+        )
+    except ValueError as e:
+        return {"error": str(e)}, 400
+
+    return {
+        "pid": os.getpid(),
+        "caches": get_cache_sizes(),
+        "allocations": allocations,
+        "request_allocations": allocation_tracker.request_allocations.snapshot(unit='kib'),
+    }
+
+
+@admin_blueprint.route("/memory/tracing", methods=["POST"])
+@admin_token_required
+def start_memory_tracing() -> dict:
+    """Starts tracemalloc with ?frames=N per allocation, snapshots every ?interval=S seconds"""
+    try:
+        frames = int(request.args.get("frames", 1))
+        interval = float(request.args["interval"]) if "interval" in request.args else None
+    except ValueError:
+        return {"error": "frames and interval must be numbers."}, 400
+    if not 1 <= frames <= MAX_TRACE_FRAMES:
+        return {"error": f"frames must be between 1 and {MAX_TRACE_FRAMES}."}, 400
+
+    allocation_tracker.start(frames=frames, interval=interval)
+    return {"pid": os.getpid(), "tracing": True, "frames": frames, "interval": allocation_tracker.interval}
+
+
+@admin_blueprint.route("/memory/tracing", methods=["DELETE"])
+@admin_token_required
+def stop_memory_tracing() -> dict:
+    allocation_tracker.stop_tracing()
+    return {"pid": os.getpid(), "tracing": False}
@@ -0,0 +1,107 @@
+import typing as typ
+from sqlalchemy.ext.asyncio import AsyncConnection
+from realworld.api.core.models import Article, Comment
+from realworld.api.core.membership import follow_index, favorites_index
+from realworld.api.routes.v1.articles.handler import (
+    GET_ARTICLE_COMMENTS_QUERY,
+    GET_ALL_TAGS_QUERY,
+    _base_get_articles_query,
+    _article_from_row,
+    _comment_from_row,
+)
+
+# Awaitable counterparts of the read handlers in handler.py, same SQL and row mapping
+
+
+async def get_articles(
+    db_conn: AsyncConnection,
+    *,
+    curr_user_id: typ.Optional[str] = None,
+    filter_tag: typ.Optional[str] = None,
+    author_username_filter: typ.Optional[str] = None,
+    favorited_by_username_filter: typ.Optional[str] = None,
+    limit: typ.Optional[int] = 20,
+    offset: typ.Optional[int] = 0,
+) -> typ.List[Article]:
+    articles = (
+        await db_conn.execute(
+            _base_get_articles_query(
+                curr_user_id=curr_user_id,
+                filter_tag=filter_tag,
+                author_username_filter=author_username_filter,
+                favorited_by_username_filter=favorited_by_username_filter,
+                limit=limit,
+                offset=offset,
+            )
+        )
+    ).fetchall()
+
+    following_ids = await follow_index.get_async(db_conn, curr_user_id)
+    favorited_ids = await favorites_index.get_async(db_conn, curr_user_id)
+    return [
+        _article_from_row(article, following_ids, favorited_ids)
+        for article in articles
+    ]
+
+
+async def get_feed_articles(
+    db_conn: AsyncConnection,
+    curr_user_id: str,
+    limit: typ.Optional[int] = 20,
+    offset: typ.Optional[int] = 0,
+) -> typ.List[Article]:
+    articles = (
+        await db_conn.execute(
+            _base_get_articles_query(
+                curr_user_id=curr_user_id,
+                curr_user_feed=True,
+                limit=limit,
+                offset=offset,
+            )
+        )
+    ).fetchall()
+
+    following_ids = await follow_index.get_async(db_conn, curr_user_id)
+    favorited_ids = await favorites_index.get_async(db_conn, curr_user_id)
+    return [
+        _article_from_row(article, following_ids, favorited_ids)
+        for article in articles
+    ]
+
+
+async def get_article_by_slug(
+    db_conn: AsyncConnection, slug: str, curr_user_id: typ.Optional[str]
+) -> typ.Optional[Article]:
+    article = (
+        await db_conn.execute(
+            _base_get_articles_query(slug=slug, curr_user_id=curr_user_id)
+        )
+    ).fetchone()
+
+    if not article:
+        return None
+
+    return _article_from_row(
+        article,
+        await follow_index.get_async(db_conn, curr_user_id),
+        await favorites_index.get_async(db_conn, curr_user_id),
+    )
+
+
+async def get_article_comments(
+    db_conn: AsyncConnection, slug: str, curr_user_id: typ.Optional[str]
+) -> typ.List[Comment]:
+    result = (
+        await db_conn.execute(GET_ARTICLE_COMMENTS_QUERY.bindparams(slug=slug))
+    ).fetchall()
+
+    if not result:
+        return []
+
+    following_ids = await follow_index.get_async(db_conn, curr_user_id)
+    return [_comment_from_row(row, following_ids) for row in result]
+
+
+async def get_all_tags(db_conn: AsyncConnection) -> typ.List[str]:
+    result = (await db_conn.execute(GET_ALL_TAGS_QUERY)).fetchall()
+    return [tag.name for tag in result]
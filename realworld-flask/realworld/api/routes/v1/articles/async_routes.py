@@ -0,0 +1,100 @@
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from realworld.api.core.db_async import get_async_read_connection
+from realworld.api.core.auth import get_user_id_from_authorization
+import realworld.api.routes.v1.articles.async_handler as articles_handler
+from realworld.api.routes.v1.articles.models import (
+    GetTagsResponse,
+    SingleArticleResponse,
+    MultipleArticlesResponse,
+    MultipleCommentsResponse,
+)
+
+
+async def get_articles(request: Request) -> JSONResponse:
+    """
+    Returns most recent articles globally by default, provide tag, author or favorited query parameter to filter results
+    """
+    user_id = get_user_id_from_authorization(request.headers.get("Authorization"))
+    async with get_async_read_connection() as db_conn:
+        articles = await articles_handler.get_articles(
+            db_conn,
+            curr_user_id=user_id,
+            filter_tag=request.query_params.get("tag"),
+            author_username_filter=request.query_params.get("author"),
+            favorited_by_username_filter=request.query_params.get("favorited"),
+            limit=int(request.query_params.get("limit", 20)),
+            offset=int(request.query_params.get("offset", 0)),
+        )
+
+    return JSONResponse(
+        MultipleArticlesResponse(
+            articles=articles,
+            articles_count=len(articles),
+        ).model_dump()
+    )
+
+
+async def get_feed(request: Request) -> JSONResponse:
+    """
+    Returns articles created by followed users, ordered by most recent first.
+    """
+    if not (
+        user_id := get_user_id_from_authorization(request.headers.get("Authorization"))
+    ):
+        return JSONResponse({"message": "Invalid token"}, 401)
+
+    async with get_async_read_connection() as db_conn:
+        articles = await articles_handler.get_feed_articles(
+            db_conn,
+            user_id,
+            limit=int(request.query_params.get("limit", 20)),
+            offset=int(request.query_params.get("offset", 0)),
+        )
+
+    return JSONResponse(
+        MultipleArticlesResponse(
+            articles=articles,
+            articles_count=len(articles),
+        ).model_dump()
+    )
+
+
+async def get_article(request: Request) -> JSONResponse:
+    user_id = get_user_id_from_authorization(request.headers.get("Authorization"))
+    async with get_async_read_connection() as db_conn:
+        article = await articles_handler.get_article_by_slug(
+            db_conn, request.path_params["slug"], curr_user_id=user_id
+        )
+        if not article:
+            return JSONResponse({"message": "Article not found"}, 404)
+
+    return JSONResponse(SingleArticleResponse(article=article).model_dump())
+
+
+async def get_comments(request: Request) -> JSONResponse:
+    user_id = get_user_id_from_authorization(request.headers.get("Authorization"))
+    async with get_async_read_connection() as db_conn:
+        comments = await articles_handler.get_article_comments(
+            db_conn, request.path_params["slug"], curr_user_id=user_id
+        )
+
+    return JSONResponse(MultipleCommentsResponse(comments=comments).model_dump())
+
+
+async def get_tags(request: Request) -> JSONResponse:
+    async with get_async_read_connection() as db_conn:
+        tags = await articles_handler.get_all_tags(db_conn)
+
+    return JSONResponse(GetTagsResponse(tags=tags).model_dump())
+
+
+# /articles/feed has to come before /articles/{slug}
+articles_routes = [
+    Route("/api/articles", get_articles, methods=["GET"]),
+    Route("/api/articles/feed", get_feed, methods=["GET"]),
+    Route("/api/articles/{slug}", get_article, methods=["GET"]),
+    Route("/api/articles/{slug}/comments", get_comments, methods=["GET"]),
+    Route("/api/tags", get_tags, methods=["GET"]),
+]
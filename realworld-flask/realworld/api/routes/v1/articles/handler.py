@@ -3,7 +3,10 @@ import typing as typ
 from uuid import uuid4
 from sqlalchemy.engine import Connection
 from sqlalchemy.sql import text as satext
+from realworld.api.core.db import uuid_bind
 from realworld.api.core.models import Article, Profile, Comment
+from realworld.api.core.membership import MemberIds, follow_index, favorites_index
+from realworld.api.core.tracing import traced
 
 from realworld.api.routes.v1.articles.models import (
     CreateArticleData,
@@ -30,7 +33,7 @@ def _get_curr_profile_by_id(db_conn: Connection, user_id: str) -> Profile:
             FROM users
             WHERE id = :user_id
             """
-        ).bindparams(user_id=user_id)
+        ).bindparams(uuid_bind("user_id"), user_id=user_id)
     ).fetchone()
 
     return Profile(
@@ -59,7 +62,6 @@ def _base_get_articles_query(
     params = {
         "limit": limit,
         "offset": offset,
-        "curr_user_id": curr_user_id,
     }
 
     if article_id:
@@ -92,6 +94,7 @@ def _base_get_articles_query(
         where_clauses.append("uf.user_id = :curr_user_id")
 
     where_clause = "WHERE " + " AND ".join(where_clauses) if where_clauses else ""
+    typed_binds = [uuid_bind("curr_user_id")] if "curr_user_id" in params else []
 
     return satext(
         f"""
@@ -103,6 +106,7 @@ def _base_get_articles_query(
                 a.body,
                 a.created_date,
                 a.updated_date,
+                a.author_user_id,
                 u.username AS author_username,
                 u.bio AS author_bio,
                 u.image_url AS author_image,
@@ -111,17 +115,6 @@ def _base_get_articles_query(
                     FROM article_favorites f
                     WHERE f.article_id = a.id
                 ) AS favorites_count,
-                (
-                    SELECT COUNT(*)
-                    FROM article_favorites f
-                    WHERE f.article_id = a.id AND f.user_id = :curr_user_id
-                ) AS favorited_by_curr_user,
-                (
-                    SELECT COUNT(*)
-                    FROM user_follows uf
-                    WHERE uf.user_id = :curr_user_id
-                    AND uf.following_user_id = u.id
-                ) > 0 AS is_curr_user_following,
                 (
                     SELECT ARRAY_AGG(t.name)
                     FROM tags t
@@ -136,7 +129,68 @@ def _base_get_articles_query(
             LIMIT :limit
             OFFSET :offset
         """
-    ).bindparams(**params)
+    ).bindparams(*typed_binds, **params)
+
+
+GET_ARTICLE_COMMENTS_QUERY = satext(
+    """
+    SELECT
+        ac.id,
+        ac.body,
+        ac.created_date,
+        ac.updated_date,
+        u.username,
+        u.bio,
+        u.image_url,
+        ac.commenter_user_id
+    FROM article_comments ac
+    JOIN users u ON ac.commenter_user_id = u.id
+    JOIN articles a ON ac.article_id = a.id
+    WHERE a.slug = :slug
+    """
+)
+
+GET_ALL_TAGS_QUERY = satext("SELECT * from tags")
+
+
+def _article_from_row(
+    article,
+    following_ids: MemberIds,
+    favorited_ids: MemberIds,
+) -> Article:
+    return Article(
+        id=article.id,
+        slug=article.slug,
+        title=article.title,
+        description=article.description,
+        body=article.body,
+        tag_list=article.tag_list if article.tag_list else [],
+        created_at=article.created_date,
+        updated_at=article.updated_date,
+        favorited=article.id in favorited_ids,
+        favorites_count=article.favorites_count,
+        author=Profile(
+            bio=article.author_bio,
+            username=article.author_username,
+            following=article.author_user_id in following_ids,
+            image=article.author_image,
+        ),
+    )
+
+
+def _comment_from_row(row, following_ids: MemberIds) -> Comment:
+    return Comment(
+        id=str(row.id),
+        body=row.body,
+        created_at=row.created_date,
+        updated_at=row.updated_date,
+        author=Profile(
+            username=row.username,
+            bio=row.bio,
+            image=row.image_url,
+            following=row.commenter_user_id in following_ids,
+        ),
+    )
 
 
 #
@@ -144,6 +198,7 @@ def _base_get_articles_query(
 #
 
 
+@traced
 def get_articles(
     db_conn: Connection,
     *,
@@ -165,29 +220,15 @@ def get_articles(
         )
     ).fetchall()
 
+    following_ids = follow_index.get(db_conn, curr_user_id)
+    favorited_ids = favorites_index.get(db_conn, curr_user_id)
     return [
-        Article(
-            id=article.id,
-            slug=article.slug,
-            title=article.title,
-            description=article.description,
-            body=article.body,
-            tag_list=article.tag_list if article.tag_list else [],
-            created_at=article.created_date,
-            updated_at=article.updated_date,
-            favorited=bool(article.favorited_by_curr_user),
-            favorites_count=article.favorites_count,
-            author=Profile(
-                bio=article.author_bio,
-                username=article.author_username,
-                following=bool(article.is_curr_user_following),
-                image=article.author_image,
-            ),
-        )
+        _article_from_row(article, following_ids, favorited_ids)
         for article in articles
     ]
 
 
+@traced
 def get_feed_articles(
     db_conn: Connection,
     curr_user_id: str,
@@ -203,29 +244,15 @@ def get_feed_articles(
         )
     ).fetchall()
 
+    following_ids = follow_index.get(db_conn, curr_user_id)
+    favorited_ids = favorites_index.get(db_conn, curr_user_id)
     return [
-        Article(
-            id=article.id,
-            slug=article.slug,
-            title=article.title,
-            description=article.description,
-            body=article.body,
-            tag_list=article.tag_list if article.tag_list else [],
-            created_at=article.created_date,
-            updated_at=article.updated_date,
-            favorited=bool(article.favorited_by_curr_user),
-            favorites_count=article.favorites_count,
-            author=Profile(
-                bio=article.author_bio,
-                username=article.author_username,
-                following=bool(article.is_curr_user_following),
-                image=article.author_image,
-            ),
-        )
+        _article_from_row(article, following_ids, favorited_ids)
         for article in articles
     ]
 
 
+@traced
 def get_article_by_slug(
     db_conn: Connection, slug: str, curr_user_id: typ.Optional[str]
 ) -> typ.Optional[Article]:
@@ -236,26 +263,14 @@ def get_article_by_slug(
     if not article:
         return None
 
-    return Article(
-        id=article.id,
-        slug=article.slug,
-        title=article.title,
-        description=article.description,
-        body=article.body,
-        tag_list=article.tag_list if article.tag_list else [],
-        created_at=article.created_date,
-        updated_at=article.updated_date,
-        favorited=bool(article.favorited_by_curr_user),
-        favorites_count=article.favorites_count,
-        author=Profile(
-            bio=article.author_bio,
-            username=article.author_username,
-            following=bool(article.is_curr_user_following),
-            image=article.author_image,
-        ),
+    return _article_from_row(
+        article,
+        follow_index.get(db_conn, curr_user_id),
+        favorites_index.get(db_conn, curr_user_id),
     )
 
 
+@traced
 def create_article(
     db_conn: Connection, curr_user_id: str, data: CreateArticleData
 ) -> Article:
@@ -267,6 +282,7 @@ def create_article(
             RETURNING id, slug
             """
         ).bindparams(
+            uuid_bind("author_user_id"),
             author_user_id=curr_user_id,
             slug=generate_slug(data.title),
             title=data.title,
@@ -296,6 +312,7 @@ def create_article(
     return get_article_by_slug(db_conn, article.slug, curr_user_id)
 
 
+@traced
 def update_article(
     db_conn: Connection, curr_slug: str, curr_user_id: str, data: UpdateArticleData
 ) -> Article:
@@ -324,6 +341,7 @@ def update_article(
             AND author_user_id = :curr_user_id
             """
         ).bindparams(
+            uuid_bind("curr_user_id"),
             slug=curr_slug,
             curr_user_id=curr_user_id,
             **params,
@@ -334,6 +352,7 @@ def update_article(
     return get_article_by_slug(db_conn, slug, curr_user_id)
 
 
+@traced
 def delete_article(db_conn: Connection, slug: str, curr_user_id: str) -> bool:
     result = db_conn.execute(
         satext(
@@ -342,11 +361,12 @@ def delete_article(db_conn: Connection, slug: str, curr_user_id: str) -> bool:
             WHERE slug = :slug
             AND author_user_id = :curr_user_id
             """
-        ).bindparams(slug=slug, curr_user_id=curr_user_id)
+        ).bindparams(uuid_bind("curr_user_id"), slug=slug, curr_user_id=curr_user_id)
     )
     return bool(result.rowcount)
 
 
+@traced
 def create_article_comment(
     db_conn: Connection, slug: str, curr_user_id: str, data: CreateCommentData
 ) -> typ.Tuple[bool, Comment]:
@@ -361,7 +381,7 @@ def create_article_comment(
             )
             RETURNING id, created_date, body
             """
-        ).bindparams(slug=slug, curr_user_id=curr_user_id, body=data.body)
+        ).bindparams(uuid_bind("curr_user_id"), slug=slug, curr_user_id=curr_user_id, body=data.body)
     ).fetchone()
 
     if not result:
@@ -376,57 +396,20 @@ def create_article_comment(
     )
 
 
+@traced
 def get_article_comments(
     db_conn: Connection, slug: str, curr_user_id: typ.Optional[str]
 ) -> typ.List[Comment]:
-    result = db_conn.execute(
-        satext(
-            """
-            SELECT
-                ac.id,
-                ac.body,
-                ac.created_date,
-                ac.updated_date,
-                u.username,
-                u.bio,
-                u.image_url,
-                (
-                    SELECT COUNT(*)
-                    FROM user_follows uf
-                    WHERE uf.user_id = :curr_user_id
-                    AND uf.following_user_id = u.id
-                ) > 0 AS is_following
-            FROM article_comments ac
-            JOIN users u ON ac.commenter_user_id = u.id
-            JOIN articles a ON ac.article_id = a.id
-            WHERE a.slug = :slug
-            """
-        ).bindparams(slug=slug, curr_user_id=curr_user_id)
-    ).fetchall()
+    result = db_conn.execute(GET_ARTICLE_COMMENTS_QUERY.bindparams(slug=slug)).fetchall()
 
     if not result:
         return []
 
-    comments = []
-    for row in result:
-        comments.append(
-            Comment(
-                id=str(row.id),
-                body=row.body,
-                created_at=row.created_date,
-                updated_at=row.updated_date,
-                author=Profile(
-                    username=row.username,
-                    bio=row.bio,
-                    image=row.image_url,
-                    following=bool(row.is_following),
-                ),
-            )
-        )
-
-    return comments
+    following_ids = follow_index.get(db_conn, curr_user_id)
+    return [_comment_from_row(row, following_ids) for row in result]
 
 
+@traced
 def delete_article_comment(
     db_conn: Connection, slug: str, comment_id: int, curr_user_id: str
 ) -> bool:
@@ -438,15 +421,18 @@ def delete_article_comment(
             AND article_id = (SELECT id FROM articles WHERE slug = :slug)
             AND commenter_user_id = :curr_user_id
             """
-        ).bindparams(slug=slug, comment_id=comment_id, curr_user_id=curr_user_id)
+        ).bindparams(
+            uuid_bind("comment_id"), uuid_bind("curr_user_id"), slug=slug, comment_id=comment_id, curr_user_id=curr_user_id
+        )
     )
     return True
 
 
+@traced
 def add_article_favorite(
     db_conn: Connection, slug: str, curr_user_id: str
 ) -> typ.Optional[Article]:
-    db_conn.execute(
+    result = db_conn.execute(
         satext(
             """
             INSERT INTO article_favorites (article_id, user_id)
@@ -454,16 +440,21 @@ def add_article_favorite(
             FROM articles a
             WHERE a.slug = :slug 
             ON CONFLICT DO NOTHING
+            RETURNING article_id
             """
-        ).bindparams(slug=slug, user_id=curr_user_id)
-    )
+        ).bindparams(uuid_bind("user_id"), slug=slug, user_id=curr_user_id)
+    ).fetchone()
+
+    if result:
+        favorites_index.add(curr_user_id, result.article_id)
     return get_article_by_slug(db_conn, slug, curr_user_id)
 
 
+@traced
 def delete_article_favorite(
     db_conn: Connection, slug: str, curr_user_id: str
 ) -> typ.Optional[Article]:
-    db_conn.execute(
+    result = db_conn.execute(
         satext(
             """
             DELETE FROM article_favorites
@@ -473,12 +464,17 @@ def delete_article_favorite(
                 WHERE slug = :slug
             )
             AND user_id = :user_id
+            RETURNING article_id
             """
-        ).bindparams(slug=slug, user_id=curr_user_id)
-    )
+        ).bindparams(uuid_bind("user_id"), slug=slug, user_id=curr_user_id)
+    ).fetchone()
+
+    if result:
+        favorites_index.discard(curr_user_id, result.article_id)
     return get_article_by_slug(db_conn, slug, curr_user_id)
 
 
+@traced
 def get_all_tags(db_conn: Connection) -> typ.List[str]:
-    result = db_conn.execute(satext("SELECT * from tags")).fetchall()
+    result = db_conn.execute(GET_ALL_TAGS_QUERY).fetchall()
     return [tag.name for tag in result]
@@ -1,7 +1,8 @@
 from flask import Blueprint, request
-from realworld.api.core.db import get_db_connection
+from realworld.api.core.db import get_db_connection, get_db_read_connection
 import realworld.api.routes.v1.articles.handler as articles_handler
 from realworld.api.core.auth import validate_token, get_user_id_from_token
+from realworld.api.core.query_budget import query_budget
 from realworld.api.routes.v1.articles.models import (
     # GetArticlesQueryParams,
     # GetFeedQueryParams,
@@ -21,12 +22,13 @@ tags_blueprint = Blueprint("tags_endpoints", __name__, url_prefix="/tags")
 
 
 @articles_blueprint.route("/articles", methods=["GET"])
+@query_budget(3)
 def get_articles() -> dict:
     """
     Returns most recent articles globally by default, provide tag, author or favorited query parameter to filter results
     """
     user_id = get_user_id_from_token()
-    with get_db_connection() as db_conn:
+    with get_db_read_connection() as db_conn:
         articles = articles_handler.get_articles(
             db_conn,
             curr_user_id=user_id,
@@ -45,6 +47,7 @@ def get_articles() -> dict:
 
 @validate_token
 @articles_blueprint.route("/articles/feed", methods=["GET"])
+@query_budget(3)
 def get_feed() -> dict:
     """
     Returns articles created by followed users, ordered by most recent first.
@@ -52,7 +55,7 @@ def get_feed() -> dict:
     if not (user_id := get_user_id_from_token()):
         return {"message": "Invalid token"}, 401
 
-    with get_db_connection() as db_conn:
+    with get_db_read_connection() as db_conn:
         articles = articles_handler.get_feed_articles(
             db_conn,
             user_id,
@@ -67,8 +70,9 @@ def get_feed() -> dict:
 
 
 @articles_blueprint.route("/articles/<string:slug>", methods=["GET"])
+@query_budget(3)
 def get_article(slug: str) -> dict:
-    with get_db_connection() as db_conn:
+    with get_db_read_connection() as db_conn:
         article = articles_handler.get_article_by_slug(
             db_conn, slug, curr_user_id=get_user_id_from_token()
         )
@@ -79,6 +83,7 @@ def get_article(slug: str) -> dict:
 
 
 @articles_blueprint.route("/articles", methods=["POST"])
+@query_budget(5)
 def create_article() -> dict:
     if not (user_id := get_user_id_from_token()):
         return {"message": "Invalid token"}, 401
@@ -91,6 +96,7 @@ def create_article() -> dict:
 
 
 @articles_blueprint.route("/articles/<string:slug>", methods=["PUT"])
+@query_budget(4)
 def update_article(slug) -> dict:
     if not (user_id := get_user_id_from_token()):
         return {"message": "Invalid token"}, 401
@@ -105,6 +111,7 @@ def update_article(slug) -> dict:
 
 
 @articles_blueprint.route("/articles/<string:slug>", methods=["DELETE"])
+@query_budget(1)
 def delete_article(slug: str) -> dict:
     if not (user_id := get_user_id_from_token()):
         return {"message": "Invalid token"}, 401
@@ -120,6 +127,7 @@ def delete_article(slug: str) -> dict:
 # Comments
 #
 @articles_blueprint.route("/articles/<string:slug>/comments", methods=["POST"])
+@query_budget(2)
 def create_comment(slug: str) -> dict:
     if not (user_id := get_user_id_from_token()):
         return {"message": "Invalid token"}, 401
@@ -137,8 +145,9 @@ def create_comment(slug: str) -> dict:
 
 
 @articles_blueprint.route("/articles/<string:slug>/comments", methods=["GET"])
+@query_budget(2)
 def get_comments(slug: str) -> dict:
-    with get_db_connection() as db_conn:
+    with get_db_read_connection() as db_conn:
         comments = articles_handler.get_article_comments(
             db_conn, slug, curr_user_id=get_user_id_from_token()
         )
@@ -149,6 +158,7 @@ def get_comments(slug: str) -> dict:
 @articles_blueprint.route(
     "/articles/<string:slug>/comments/<string:comment_id>", methods=["DELETE"]
 )
+@query_budget(1)
 def delete_comment(slug: str, comment_id: str) -> dict:
     if not (user_id := get_user_id_from_token()):
         return {"message": "Invalid token"}, 401
@@ -163,6 +173,7 @@ def delete_comment(slug: str, comment_id: str) -> dict:
 # Favorites
 #
 @articles_blueprint.route("/articles/<string:slug>/favorite", methods=["POST"])
+@query_budget(4)
 def favorite_article(slug: str) -> dict:
     if not (user_id := get_user_id_from_token()):
         return {"message": "Invalid token"}, 401
@@ -176,6 +187,7 @@ def favorite_article(slug: str) -> dict:
 
 
 @articles_blueprint.route("/articles/<string:slug>/favorite", methods=["DELETE"])
+@query_budget(4)
 def unfavorite_article(slug: str) -> dict:
     if not (user_id := get_user_id_from_token()):
         return {"message": "Invalid token"}, 401
@@ -192,8 +204,9 @@ def unfavorite_article(slug: str) -> dict:
 # Tags
 #
 @tags_blueprint.route("", methods=["GET"])
+@query_budget(1)
 def get_tags() -> dict:
-    with get_db_connection() as db_conn:
+    with get_db_read_connection() as db_conn:
         tags = articles_handler.get_all_tags(db_conn)
 
     return GetTagsResponse(tags=tags).model_dump()
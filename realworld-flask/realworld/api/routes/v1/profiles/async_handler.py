@@ -0,0 +1,40 @@
+import typing as typ
+from sqlalchemy.ext.asyncio import AsyncConnection
+from realworld.api.core.membership import follow_index
+from realworld.api.routes.v1.profiles.models import ProfileData
+from realworld.api.routes.v1.profiles.handler import (
+    GET_PROFILE_QUERY,
+    GET_PROFILES_QUERY,
+    _profile_from_row,
+    _order_profiles,
+)
+
+# Awaitable counterparts of the read handlers in handler.py, same SQL and row mapping
+
+
+async def get_profile(
+    db_conn: AsyncConnection, username: str, curr_user_id: typ.Optional[str] = None
+) -> typ.Optional[ProfileData]:
+    result = (
+        await db_conn.execute(GET_PROFILE_QUERY.bindparams(username=username))
+    ).fetchone()
+
+    if not result:
+        return None
+
+    return _profile_from_row(result, await follow_index.get_async(db_conn, curr_user_id))
+
+
+async def get_profiles(
+    db_conn: AsyncConnection,
+    usernames: typ.List[str],
+    curr_user_id: typ.Optional[str] = None,
+) -> typ.List[ProfileData]:
+    result = (
+        await db_conn.execute(GET_PROFILES_QUERY.bindparams(usernames=list(usernames)))
+    ).fetchall()
+
+    following_ids = await follow_index.get_async(db_conn, curr_user_id)
+    return _order_profiles(
+        [_profile_from_row(row, following_ids) for row in result], usernames
+    )
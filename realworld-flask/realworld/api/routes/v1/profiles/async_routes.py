@@ -0,0 +1,55 @@
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from realworld.api.core.db_async import get_async_read_connection
+from realworld.api.core.auth import get_user_id_from_authorization
+from realworld.api.routes.v1.profiles.routes import MAX_BATCH_USERNAMES
+from realworld.api.routes.v1.profiles.models import (
+    ProfileDataResponse,
+    MultipleProfilesResponse,
+)
+import realworld.api.routes.v1.profiles.async_handler as profiles_handler
+
+
+async def get_profiles(request: Request) -> JSONResponse:
+    """
+    Returns the profiles for a comma separated list of usernames, e.g. ?usernames=a,b,c
+    """
+    usernames = list(
+        dict.fromkeys(
+            username.strip()
+            for username in request.query_params.get("usernames", "").split(",")
+            if username.strip()
+        )
+    )
+    if not usernames:
+        return JSONResponse({"error": "No usernames provided."}, 400)
+    if len(usernames) > MAX_BATCH_USERNAMES:
+        return JSONResponse(
+            {"error": f"At most {MAX_BATCH_USERNAMES} usernames per request."}, 400
+        )
+
+    user_id = get_user_id_from_authorization(request.headers.get("Authorization"))
+    async with get_async_read_connection() as db_conn:
+        profiles = await profiles_handler.get_profiles(db_conn, usernames, user_id)
+
+    return JSONResponse(MultipleProfilesResponse(profiles=profiles).model_dump())
+
+
+async def get_profile(request: Request) -> JSONResponse:
+    user_id = get_user_id_from_authorization(request.headers.get("Authorization"))
+    async with get_async_read_connection() as db_conn:
+        if not (
+            profile := await profiles_handler.get_profile(
+                db_conn, request.path_params["username"], user_id
+            )
+        ):
+            return JSONResponse({"error": "Profile not found."}, 404)
+
+    return JSONResponse(ProfileDataResponse(profile=profile).model_dump())
+
+
+profiles_routes = [
+    Route("/api/profiles", get_profiles, methods=["GET"]),
+    Route("/api/profiles/{username}", get_profile, methods=["GET"]),
+]
@@ -1,74 +1,192 @@
 import typing as typ
 from sqlalchemy.engine import Connection
 from sqlalchemy.sql import text as satext
+from realworld.api.core.db import uuid_bind
+from realworld.api.core.membership import MemberIds, follow_index
+from realworld.api.core.tracing import traced
 from realworld.api.routes.v1.profiles.models import ProfileData
 
 
+GET_PROFILE_QUERY = satext(
+    """
+    SELECT id, username, bio, image_url, followers_count, following_count
+    FROM users
+    WHERE username = :username
+    """
+)
+
+GET_PROFILES_QUERY = satext(
+    """
+    SELECT id, username, bio, image_url, followers_count, following_count
+    FROM users
+    WHERE username = ANY(:usernames)
+    """
+)
+
+
+def _profile_from_row(row, following_ids: MemberIds) -> ProfileData:
+    return ProfileData(
+        username=row.username,
+        bio=row.bio,
+        image=row.image_url,
+        following=row.id in following_ids,
+        followers_count=row.followers_count,
+        following_count=row.following_count,
+    )
+
+
+def _order_profiles(
+    profiles: typ.List[ProfileData], usernames: typ.List[str]
+) -> typ.List[ProfileData]:
+    # keep the requested order, unknown usernames are left out
+    by_username = {profile.username: profile for profile in profiles}
+    return [by_username[username] for username in usernames if username in by_username]
+
+
+@traced
 def get_profile(
     db_conn: Connection, username: str, curr_user_id: typ.Optional[str] = None
 ) -> typ.Optional[ProfileData]:
 
     result = db_conn.execute(
-        satext(
-            """
-            SELECT
-                username,
-                bio,
-                image_url,
-                CASE
-                    WHEN uf.following_user_id IS NOT NULL THEN TRUE ELSE FALSE
-                END AS following
-            FROM users u
-            LEFT JOIN (
-                SELECT following_user_id
-                FROM user_follows
-                WHERE user_id = :curr_user_id
-            ) uf ON u.id = uf.following_user_id
-            WHERE username = :username
-            """
-        ).bindparams(username=username, curr_user_id=curr_user_id)
+        GET_PROFILE_QUERY.bindparams(username=username)
     ).fetchone()
 
     if not result:
         return None
 
-    return ProfileData(
-        username=result.username,
-        bio=result.bio,
-        image=result.image_url,
-        following=result.following,
+    return _profile_from_row(result, follow_index.get(db_conn, curr_user_id))
+
+
+@traced
+def get_profiles(
+    db_conn: Connection,
+    usernames: typ.List[str],
+    curr_user_id: typ.Optional[str] = None,
+) -> typ.List[ProfileData]:
+    result = db_conn.execute(
+        GET_PROFILES_QUERY.bindparams(usernames=list(usernames))
+    ).fetchall()
+
+    following_ids = follow_index.get(db_conn, curr_user_id)
+    return _order_profiles(
+        [_profile_from_row(row, following_ids) for row in result], usernames
     )
 
 
+@traced
 def follow_profile(
     db_conn: Connection, username: str, curr_user_id: typ.Optional[str] = None
 ) -> typ.Optional[ProfileData]:
-    db_conn.execute(
+    result = db_conn.execute(
         satext(
             """
-            INSERT INTO user_follows (user_id, following_user_id)
-            SELECT :curr_user_id, u.id
-            FROM users u
-            WHERE u.username = :username
-            ON CONFLICT (user_id, following_user_id) DO NOTHING
+            WITH locked AS (
+                -- both users are locked in id order before anything else, crossing pairs (a
+                -- follows b while b follows c) would otherwise update them in opposite orders
+                SELECT id, username FROM users
+                WHERE id = :curr_user_id OR username = :username
+                ORDER BY id
+                FOR NO KEY UPDATE
+            ), inserted AS (
+                INSERT INTO user_follows (user_id, following_user_id)
+                SELECT :curr_user_id, l.id
+                FROM locked l
+                WHERE l.username = :username
+                ON CONFLICT (user_id, following_user_id) DO NOTHING
+                RETURNING user_id, following_user_id
+            ), counters AS (
+                UPDATE users u
+                SET following_count = u.following_count
+                        + CASE WHEN u.id = i.user_id THEN 1 ELSE 0 END,
+                    followers_count = u.followers_count
+                        + CASE WHEN u.id = i.following_user_id THEN 1 ELSE 0 END
+                FROM inserted i
+                WHERE u.id IN (i.user_id, i.following_user_id)
+            )
+            SELECT following_user_id FROM inserted
            """
-        ).bindparams(username=username, curr_user_id=curr_user_id)
-    )
+        ).bindparams(uuid_bind("curr_user_id"), username=username, curr_user_id=curr_user_id)
+    ).fetchone()
+
+    if result:
+        follow_index.add(curr_user_id, result.following_user_id)
 
     return get_profile(db_conn, username, curr_user_id)
 
 
+@traced
 def unfollow_profile(
     db_conn: Connection, username: str, curr_user_id: typ.Optional[str] = None
 ) -> typ.Optional[ProfileData]:
-    db_conn.execute(
+    result = db_conn.execute(
         satext(
             """
-            DELETE FROM user_follows
-            WHERE user_id = :curr_user_id
-            AND following_user_id = (SELECT id FROM users WHERE username = :username)
+            WITH locked AS (
+                -- both users are locked in id order before anything else, crossing pairs (a
+                -- follows b while b follows c) would otherwise update them in opposite orders
+                SELECT id, username FROM users
+                WHERE id = :curr_user_id OR username = :username
+                ORDER BY id
+                FOR NO KEY UPDATE
+            ), deleted AS (
+                DELETE FROM user_follows
+                WHERE user_id = :curr_user_id
+                AND following_user_id = (SELECT id FROM locked WHERE username = :username)
+                RETURNING user_id, following_user_id
+            ), counters AS (
+                UPDATE users u
+                SET following_count = u.following_count
+                        - CASE WHEN u.id = d.user_id THEN 1 ELSE 0 END,
+                    followers_count = u.followers_count
+                        - CASE WHEN u.id = d.following_user_id THEN 1 ELSE 0 END
+                FROM deleted d
+                WHERE u.id IN (d.user_id, d.following_user_id)
+            )
+            SELECT following_user_id FROM deleted
             """
-        ).bindparams(username=username, curr_user_id=curr_user_id)
-    )
+        ).bindparams(uuid_bind("curr_user_id"), username=username, curr_user_id=curr_user_id)
+    ).fetchone()
+
+    if result:
+        follow_index.discard(curr_user_id, result.following_user_id)
 
     return get_profile(db_conn, username, curr_user_id)
+
+
+def reconcile_follow_counts(db_conn: Connection) -> int:
+    """
+    Recompute users.followers_count/following_count from user_follows and fix
+    any drift. Follows are blocked for the duration so no increment is lost.
+    Returns the number of corrected users.
+    """
+    db_conn.execute(satext("LOCK TABLE user_follows IN SHARE MODE"))
+    result = db_conn.execute(
+        satext(
+            """
+            WITH actual AS (
+                SELECT
+                    u.id,
+                    (
+                        SELECT COUNT(*)
+                        FROM user_follows f
+                        WHERE f.following_user_id = u.id
+                    ) AS followers_count,
+                    (
+                        SELECT COUNT(*)
+                        FROM user_follows f
+                        WHERE f.user_id = u.id
+                    ) AS following_count
+                FROM users u
+            )
+            UPDATE users u
+            SET followers_count = a.followers_count,
+                following_count = a.following_count
+            FROM actual a
+            WHERE u.id = a.id
+            AND (u.followers_count, u.following_count)
+                IS DISTINCT FROM (a.followers_count, a.following_count)
+            """
+        )
+    )
+    return result.rowcount
@@ -7,7 +7,13 @@ class ProfileData(BaseCamelModel):
     following: bool
     bio: typ.Optional[str] = None
     image: typ.Optional[str] = None
+    followers_count: int = 0
+    following_count: int = 0
 
 
 class ProfileDataResponse(BaseCamelModel):
     profile: ProfileData
+
+
+class MultipleProfilesResponse(BaseCamelModel):
+    profiles: typ.List[ProfileData]
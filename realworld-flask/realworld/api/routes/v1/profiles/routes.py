@@ -1,16 +1,50 @@
-from flask import Blueprint
-from realworld.api.core.db import get_db_connection
+from flask import Blueprint, request
+from realworld.api.core.db import get_db_connection, get_db_read_connection
 from realworld.api.core.auth import validate_token, get_user_id_from_token
-from realworld.api.routes.v1.profiles.models import ProfileDataResponse, ProfileData
+from realworld.api.core.query_budget import query_budget
+from realworld.api.routes.v1.profiles.models import (
+    ProfileDataResponse,
+    ProfileData,
+    MultipleProfilesResponse,
+)
 import realworld.api.routes.v1.profiles.handler as profiles_handler
 
 profiles_blueprint = Blueprint("profiles_endpoints", __name__, url_prefix="/profiles")
 
+MAX_BATCH_USERNAMES = 50
+
+
+@profiles_blueprint.route("", methods=["GET"])
+@query_budget(2)
+def get_profiles() -> dict:
+    """
+    Returns the profiles for a comma separated list of usernames, e.g. ?usernames=a,b,c
+    """
+    usernames = list(
+        dict.fromkeys(
+            username.strip()
+            for username in request.args.get("usernames", "").split(",")
+            if username.strip()
+        )
+    )
+    if not usernames:
+        return {"error": "No usernames provided."}, 400
+    if len(usernames) > MAX_BATCH_USERNAMES:
+        return {"error": f"At most {MAX_BATCH_USERNAMES} usernames per request."}, 400
+
+    with get_db_read_connection() as db_conn:
+        profiles = profiles_handler.get_profiles(
+            db_conn, usernames, get_user_id_from_token()
+        )
+
+    return MultipleProfilesResponse(profiles=profiles).model_dump()
+
 
 @profiles_blueprint.route("/<string:username>", methods=["GET"])
+@query_budget(2)
 def get_profile(username) -> dict:
 
-    with get_db_connection() as db_conn:
+    with get_db_read_connection() as db_conn:
         if not (
             profile := profiles_handler.get_profile(
                 db_conn, username, get_user_id_from_token()
@@ -24,12 +58,15 @@ def get_profile(username) -> dict:
             bio=profile.bio,
             image=profile.image,
             following=profile.following,
+            followers_count=profile.followers_count,
+            following_count=profile.following_count,
         )
     ).model_dump()
 
 
 @validate_token
 @profiles_blueprint.route("/<string:username>/follow", methods=["POST"])
+@query_budget(3)
 def follow_profile(username):
 
     with get_db_connection() as db_conn:
@@ -46,12 +83,15 @@ def follow_profile(username):
             bio=profile.bio,
             image=profile.image,
             following=profile.following,
+            followers_count=profile.followers_count,
+            following_count=profile.following_count,
         )
     ).model_dump()
 
 
 @validate_token
 @profiles_blueprint.route("/<string:username>/follow", methods=["DELETE"])
+@query_budget(3)
 def unfollow_profile(username):
 
     with get_db_connection() as db_conn:
@@ -68,5 +108,7 @@ def unfollow_profile(username):
             bio=profile.bio,
             image=profile.image,
             following=profile.following,
+            followers_count=profile.followers_count,
+            following_count=profile.following_count,
         )
     ).model_dump()
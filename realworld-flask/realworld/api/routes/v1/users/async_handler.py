@@ -0,0 +1,16 @@
+import typing as typ
+from sqlalchemy.ext.asyncio import AsyncConnection
+from .handler import GET_USER_QUERY, _user_from_row
+from .models import UserData
+
+# Awaitable counterparts of the read handlers in handler.py, same SQL and row mapping
+
+
+async def get_user(db_conn: AsyncConnection, user_id: str) -> typ.Optional[UserData]:
+    result = (
+        await db_conn.execute(GET_USER_QUERY.bindparams(user_id=user_id))
+    ).fetchone()
+
+    if result:
+        return _user_from_row(result)
+    return None
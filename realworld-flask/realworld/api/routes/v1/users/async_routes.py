@@ -0,0 +1,25 @@
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from realworld.api.core.db_async import get_async_read_connection
+from realworld.api.core.auth import get_user_id_from_authorization
+from realworld.api.routes.v1.users import async_handler as users_handler
+from realworld.api.routes.v1.users.models import UserDataResponse
+
+
+async def get_current_user(request: Request) -> JSONResponse:
+    if not (
+        user_id := get_user_id_from_authorization(request.headers.get("Authorization"))
+    ):
+        return JSONResponse({"error": "Invalid token."}, 401)
+
+    async with get_async_read_connection() as db_conn:
+        if user := await users_handler.get_user(db_conn, user_id):
+            return JSONResponse(UserDataResponse(user=user).model_dump())
+
+    return JSONResponse({"error": "User does not exist."}, 404)
+
+
+users_routes = [
+    Route("/api/user", get_current_user, methods=["GET"]),
+]
@@ -5,22 +5,27 @@ from sqlalchemy.engine import Connection
 from sqlalchemy.sql import text as satext
 from sqlalchemy.exc import IntegrityError
 
+from realworld.api.core.db import uuid_bind
 from realworld.api.core.models import DBUser
+from realworld.api.core.tracing import traced
 from .models import UpdateUserData, RegisterUserData, UserData
 
 
 logger = Logger(__name__)
 
 
+@traced
 def hash_password(password: str) -> str:
     salt = bcrypt.gensalt()
     return bcrypt.hashpw(password.encode("utf-8"), salt).decode("utf-8")
 
 
+@traced
 def is_valid_password(password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(password.encode("utf-8"), hashed_password.encode("utf-8"))
 
 
+@traced
 def create_user(db_conn: Connection, data: RegisterUserData) -> typ.Optional[DBUser]:
     try:
         result = db_conn.execute(
@@ -52,6 +57,7 @@ def create_user(db_conn: Connection, data: RegisterUserData) -> typ.Optional[DBU
     return None
 
 
+@traced
 def update_user(
     db_conn: Connection, user_id: str, data: UpdateUserData
 ) -> typ.Optional[UserData]:
@@ -67,6 +73,7 @@ def update_user(
             RETURNING username, email, bio, image_url
             """
         ).bindparams(
+            uuid_bind("user_id"),
             user_id=user_id,
             email=data.email,
             bio=data.bio,
@@ -84,6 +91,7 @@ def update_user(
     return None
 
 
+@traced
 def validate_user_creds(
     db_conn: Connection, email: str, password: str
 ) -> typ.Optional[DBUser]:
@@ -112,22 +120,28 @@ def validate_user_creds(
     return None
 
 
+GET_USER_QUERY = satext(
+    """
+    SELECT id, username, email, bio, image_url, created_date, updated_date
+    FROM users
+    WHERE id = :user_id
+    """
+).bindparams(uuid_bind("user_id"))
+
+
+def _user_from_row(row) -> UserData:
+    return UserData(
+        username=row.username,
+        email=row.email,
+        bio=row.bio,
+        image=row.image_url,
+    )
+
+
+@traced
 def get_user(db_conn: Connection, user_id: str) -> typ.Optional[UserData]:
-    result = db_conn.execute(
-        satext(
-            """
-            SELECT id, username, email, bio, image_url, created_date, updated_date
-            FROM users
-            WHERE id = :user_id
-            """
-        ).bindparams(user_id=user_id)
-    ).fetchone()
+    result = db_conn.execute(GET_USER_QUERY.bindparams(user_id=user_id)).fetchone()
 
     if result:
-        return UserData(
-            username=result.username,
-            email=result.email,
-            bio=result.bio,
-            image=result.image_url,
-        )
+        return _user_from_row(result)
     return None
@@ -1,6 +1,7 @@
 from flask import Blueprint, request
-from realworld.api.core.db import get_db_connection
+from realworld.api.core.db import get_db_connection, get_db_read_connection
 from realworld.api.core.auth import generate_jwt, validate_token, get_user_id_from_token
+from realworld.api.core.query_budget import query_budget
 from realworld.api.routes.v1.users import handler as users_handler
 from realworld.api.routes.v1.users.models import (
     RegisterUserRequest,
@@ -19,6 +20,7 @@ users_blueprint = Blueprint(
 
 
 @users_blueprint.route("/users", methods=["POST"])
+@query_budget(1)
 def create_user() -> dict:
     data = RegisterUserRequest.model_validate(request.json)
     with get_db_connection() as db_conn:
@@ -37,9 +39,11 @@ def create_user() -> dict:
 
 
 @users_blueprint.route("/users/login", methods=["POST"])
+@query_budget(1)
 def authenticate_user() -> dict:
     data = LoginUserRequest.model_validate(request.json)
-    with get_db_connection() as db_conn:
+    # credentials are read from the primary, the user may have just registered
+    with get_db_read_connection(allow_replica=False) as db_conn:
         if not (
             user := users_handler.validate_user_creds(
                 db_conn, email=data.user.email, password=data.user.password
@@ -60,11 +64,12 @@ def authenticate_user() -> dict:
 
 @validate_token
 @users_blueprint.route("/user", methods=["GET"])
+@query_budget(1)
 def get_current_user() -> dict:
     if not (user_id := get_user_id_from_token()):
         return {"error": "Invalid token."}, 401
 
-    with get_db_connection() as db_conn:
+    with get_db_read_connection() as db_conn:
         if user := users_handler.get_user(db_conn, user_id):
             return UserDataResponse(user=user).model_dump()
 
@@ -73,6 +78,7 @@ def get_current_user() -> dict:
 
 @validate_token
 @users_blueprint.route("/user", methods=["PUT"])
+@query_budget(1)
 def update_user() -> dict:
     data = UpdateUserRequest.model_validate(request.json)
     with get_db_connection() as db_conn:
@@ -1,19 +1,38 @@
 import os
+import time
 import logging
 from datetime import datetime
-from flask import Flask, jsonify, request
+from flask import Flask, Response, g, jsonify, request
 from flask_cors import CORS
 from pydantic import ValidationError
-from realworld.config import get_config
+from realworld import IMPORT_STARTED_AT
+from realworld.config import Config, get_config
+from realworld.api.core.breaker import CircuitOpenError
+from realworld.api.core.admission import AdmissionController, HEALTH, READ, WRITE
+from realworld.api.core.health import database_prober, replica_lag_prober
+from realworld.api.core.logs import configure_logging, register_access_log
+from realworld.api.core.route_metrics import route_metrics, emf_publisher
+from realworld.api.core.tracing import register_tracing, span_exporter
+from realworld.api.core.profiler import register_route_tracking
+from realworld.api.core.memory import allocation_tracker, register_request_allocations
+from realworld.api.core.query_budget import get_query_count, get_repeated_statements
+from realworld.api.core.db import registry, connection_budget, PRIMARY_PIN_COOKIE, PRIMARY_PIN_HEADER, format_pin_token, read_your_writes_token, get_statement_sample
 from realworld.api.routes.v1.users.routes import users_blueprint
 from realworld.api.routes.v1.profiles.routes import profiles_blueprint
 from realworld.api.routes.v1.articles.routes import articles_blueprint, tags_blueprint
-
-# Initialize configuration
-config = get_config()
+from realworld.api.routes.v1.admin.routes import admin_blueprint
 
 def create_app() -> Flask:
+    """
+    Application factory. Configuration is read here rather than at import time, and the database
+    engines are only created on first use (or in each worker after a fork), so importing the
+    package stays cheap and a preloaded master never hands its connections to a worker.
+    """
+    started_at = time.perf_counter()
+    config = get_config()
     app = Flask(__name__)
+    app.extensions['config'] = config
+    registry.init_app(app)
     
     # Configure Flask app
     app.config['SECRET_KEY'] = config.SECRET_KEY
@@ -23,16 +42,40 @@ def create_app() -> Flask:
     CORS(app, 
          origins=config.CORS_ORIGINS,
          methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'],
-         allow_headers=['Content-Type', 'Authorization', 'X-Requested-With'],
-         expose_headers=['X-Total-Count'])
+         allow_headers=['Content-Type', 'Authorization', 'X-Requested-With', 'X-Request-ID', 'traceparent', PRIMARY_PIN_HEADER],
+         expose_headers=['X-Total-Count', 'X-Query-Count', 'X-Request-ID', 'Server-Timing', PRIMARY_PIN_HEADER])
     
-    _register_blueprints(app)
+    # first, so the request span and Server-Timing total cover every other hook
+    _register_tracing(app, config)
+    _register_blueprints(app, config)
     _register_error_handlers(app)
-    _configure_logging(app)
+    _register_admission_control(app, config)
+    _register_read_your_writes(app)
+    _register_query_tracking(app)
+    _register_route_metrics(app, config)
+    _register_memory_diagnostics(app, config)
+    _configure_logging(app, config)
+    
+    # Probe the database in the background so the first readiness check has a result
+    database_prober.ensure_started()
+    replica_lag_prober.ensure_started()
+    emf_publisher.ensure_started()
+    span_exporter.ensure_started()
+    allocation_tracker.ensure_started()
+    
+    finished_at = time.perf_counter()
+    app.extensions['startup'] = {
+        "import_ms": round((started_at - IMPORT_STARTED_AT) * 1000, 1),
+        "create_app_ms": round((finished_at - started_at) * 1000, 1)
+    }
+    logging.info(
+        f"Application created in {app.extensions['startup']['create_app_ms']}ms "
+        f"(imports took {app.extensions['startup']['import_ms']}ms)"
+    )
     
     return app
 
-def _register_blueprints(app: Flask):
+def _register_blueprints(app: Flask, config: Config):
     """Register all application blueprints"""
     app.register_blueprint(articles_blueprint, url_prefix="/api")
     app.register_blueprint(users_blueprint, url_prefix="/api")
@@ -42,6 +85,10 @@ def _register_blueprints(app: Flask):
     app.register_blueprint(
         tags_blueprint, url_prefix=f"/api{tags_blueprint.url_prefix}"
     )
+    app.register_blueprint(
+        admin_blueprint, url_prefix=f"/api{admin_blueprint.url_prefix}"
+    )
+    register_route_tracking(app)
 
     @app.route("/api/ping")
     def ping():
@@ -88,57 +135,33 @@ def _register_blueprints(app: Flask):
     def readiness_check():
         """
         Readiness check endpoint for ECS deployment
-        Checks database connectivity and application readiness
+        Answers from the background database probe, never from the request pools
         """
-        try:
-            from realworld.api.core.db import check_database_connection, get_database_info
-            
-            db_healthy = check_database_connection()
-            db_info = get_database_info()
-            
-            if db_healthy:
-                return jsonify({
-                    "status": "ready",
-                    "service": config.APP_NAME,
-                    "environment": os.getenv("FLASK_ENV", "production"),
-                    "timestamp": datetime.utcnow().isoformat() + "Z",
-                    "container_id": os.getenv("HOSTNAME", "unknown"),
-                    "checks": {
-                        "database": db_info,
-                        "application": "ready"
-                    }
-                }), 200
-            else:
-                return jsonify({
-                    "status": "not_ready",
-                    "service": config.APP_NAME,
-                    "environment": os.getenv("FLASK_ENV", "production"),
-                    "timestamp": datetime.utcnow().isoformat() + "Z",
-                    "container_id": os.getenv("HOSTNAME", "unknown"),
-                    "checks": {
-                        "database": db_info,
-                        "application": "database_unavailable"
-                    }
-                }), 503
-                
-        except Exception as e:
-            logging.error(f"Readiness check failed: {e}")
-            return jsonify({
-                "status": "not_ready",
-                "service": config.APP_NAME,
-                "environment": os.getenv("FLASK_ENV", "production"),
-                "error": str(e),
-                "timestamp": datetime.utcnow().isoformat() + "Z",
-                "container_id": os.getenv("HOSTNAME", "unknown")
-            }), 503
+        from realworld.api.core.db import get_pool_info
+
+        database_prober.ensure_started()
+        probe = database_prober.snapshot()
+        ready = probe["ready"]
+        return jsonify({
+            "status": "ready" if ready else "not_ready",
+            "service": config.APP_NAME,
+            "environment": os.getenv("FLASK_ENV", "production"),
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "container_id": os.getenv("HOSTNAME", "unknown"),
+            "checks": {
+                "database": {**get_pool_info(), **probe},
+                "application": "ready" if ready else "database_unavailable"
+            }
+        }), 200 if ready else 503
 
     @app.route("/api/metrics")
     def metrics():
         """CloudWatch metrics endpoint for monitoring"""
         try:
-            from realworld.api.core.db import get_database_info
+            from realworld.api.core.db import get_pool_info, get_circuit_breaker_metrics, get_query_metrics
             
-            db_info = get_database_info()
+            db_info = get_pool_info()
+            probe = database_prober.snapshot()
             
             return jsonify({
                 "service": config.APP_NAME,
@@ -152,10 +175,25 @@ def _register_blueprints(app: Flask):
                         "pool_size": db_info.get("pool_size", 0),
                         "checked_out_connections": db_info.get("checked_out_connections", 0),
                         "overflow": db_info.get("overflow", 0),
-                        "status": db_info.get("status", "unknown")
+                        "status": probe["status"],
+                        "probe": {
+                            "checked_at": probe["checked_at"],
+                            "age_seconds": probe["age_seconds"],
+                            "stale": probe["stale"],
+                            "latency_ms": probe.get("latency_ms")
+                        },
+                        "circuit_breakers": get_circuit_breaker_metrics()
                     },
+                    "admission": app.extensions['admission'].metrics(),
+                    "routes": route_metrics.snapshot(),
+                    "tracing": span_exporter.metrics(),
+                    "queries": get_query_metrics(),
                     "application": {
                         "uptime": _get_uptime(),
+                        "startup": {
+                            **app.extensions['startup'],
+                            "database_init_ms": registry.init_ms
+                        },
                         "memory_usage": _get_memory_usage(),
                         "cpu_count": os.cpu_count()
                     }
@@ -170,6 +208,11 @@ def _register_blueprints(app: Flask):
                 "timestamp": datetime.utcnow().isoformat() + "Z"
             }), 500
 
+    @app.route("/api/metrics/prometheus")
+    def metrics_scrape():
+        """Per-route request, error and latency metrics of this process in the Prometheus text format"""
+        return Response(route_metrics.render_text(), mimetype="text/plain; version=0.0.4")
+
 def _register_error_handlers(app: Flask):
     """Register application error handlers with ECS-friendly logging"""
     
@@ -204,6 +247,18 @@ def _register_error_handlers(app: Flask):
             "request_id": _get_request_id()
         }), 500
 
+    @app.errorhandler(CircuitOpenError)
+    def database_unavailable(error):
+        logging.warning(f"Failing fast: {error}")
+        response = jsonify({
+            "error": "Service unavailable",
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "request_id": _get_request_id()
+        })
+        response.status_code = 503
+        response.headers['Retry-After'] = str(int(error.retry_after + 0.5))
+        return response
+
     @app.errorhandler(503)
     def service_unavailable(error):
         logging.error(f"Service unavailable: {error}")
@@ -213,36 +268,140 @@ def _register_error_handlers(app: Flask):
             "request_id": _get_request_id()
         }), 503
 
-def _configure_logging(app: Flask):
+# Endpoints that never touch the request pool, or must answer while it is saturated
+HEALTH_ENDPOINTS = {'ping', 'health_check', 'readiness_check', 'metrics', 'metrics_scrape'}
+# never touch the database, so they are not admitted against the pool either
+ADMIN_ENDPOINTS = {
+    'admin_endpoints.profile', 'admin_endpoints.memory', 'admin_endpoints.start_memory_tracing',
+    'admin_endpoints.stop_memory_tracing',
+}
+
+def _register_admission_control(app: Flask, config: Config):
+    """Queue database-bound requests briefly when the pool is saturated and shed the excess with 503"""
+    
+    admission = AdmissionController(
+        max_in_flight=config.ADMISSION_MAX_IN_FLIGHT or connection_budget(registry.config),
+        write_reserve=config.ADMISSION_WRITE_RESERVE,
+        queue_timeout=config.ADMISSION_QUEUE_TIMEOUT,
+        max_queue=config.ADMISSION_MAX_QUEUE
+    )
+    app.extensions['admission'] = admission
+    
+    @app.before_request
+    def admit_request():
+        if request.method == 'OPTIONS' or request.endpoint in HEALTH_ENDPOINTS or request.endpoint in ADMIN_ENDPOINTS or request.endpoint is None:
+            priority = HEALTH
+        elif request.method in ('GET', 'HEAD'):
+            priority = READ
+        else:
+            priority = WRITE
+        
+        if not admission.acquire(priority):
+            logging.warning(f"Shedding {priority} request: {request.method} {request.path}")
+            response = jsonify({
+                "error": "Service overloaded",
+                "timestamp": datetime.utcnow().isoformat() + "Z",
+                "request_id": _get_request_id()
+            })
+            response.status_code = 503
+            response.headers['Retry-After'] = '1'
+            return response
+        g.admitted = priority != HEALTH
+    
+    @app.teardown_request
+    def release_admission(exc):
+        if g.pop('admitted', False):
+            admission.release()
+
+def _register_read_your_writes(app: Flask):
+    """Pin a client's reads to the primary for a short window after it wrote, so it sees its own writes"""
+
+    @app.after_request
+    def pin_reads_to_primary(response):
+        if token := read_your_writes_token():
+            value = format_pin_token(token, app.secret_key)
+            response.headers[PRIMARY_PIN_HEADER] = value
+            response.set_cookie(
+                PRIMARY_PIN_COOKIE,
+                value,
+                max_age=int(max(token) - time.time()) + 1,
+                httponly=True,
+                samesite='Lax'
+            )
+        return response
+
+def _register_query_tracking(app: Flask):
+    """Report statements per request (X-Query-Count outside production) and flag likely N+1 patterns"""
+    
+    expose_query_count = os.getenv("FLASK_ENV", "production") != "production"
+    
+    @app.after_request
+    def report_queries(response):
+        if expose_query_count:
+            response.headers['X-Query-Count'] = str(get_query_count())
+        for fingerprint, count in get_repeated_statements().items():
+            logging.warning(
+                f"Likely N+1: {request.endpoint} ran statement {fingerprint} {count} times: "
+                f"{(get_statement_sample(fingerprint) or '')[:200]}"
+            )
+        return response
+
+def _register_tracing(app: Flask, config: Config):
+    """Request ids, Server-Timing headers and OTLP span export (TRACE_EXPORT) for sampled requests"""
+    
+    span_exporter.configure(config.TRACE_EXPORT, config.APP_NAME)
+    register_tracing(app, sample_rate=config.TRACE_SAMPLE_RATE)
+
+def _register_route_metrics(app: Flask, config: Config):
+    """Count requests and errors and record latency per route, published as CloudWatch EMF"""
+    
+    emf_publisher.configure(config.METRICS_EMF_INTERVAL, config.METRICS_NAMESPACE, config.APP_NAME)
+    
+    @app.before_request
+    def start_route_timer():
+        g.setdefault('request_started_at', time.perf_counter())
+    
+    @app.after_request
+    def record_route_metrics(response):
+        started_at = g.get('request_started_at')
+        if started_at is not None:
+            route_metrics.record(
+                request.method,
+                request.endpoint,
+                response.status_code,
+                (time.perf_counter() - started_at) * 1000
+            )
+        return response
+
+def _register_memory_diagnostics(app: Flask, config: Config):
+    """tracemalloc snapshots (MEMORY_SNAPSHOT_INTERVAL) and allocation per route, see /api/admin/memory"""
+    
+    allocation_tracker.configure(config.MEMORY_SNAPSHOT_INTERVAL, config.MEMORY_TRACE_FRAMES)
+    if config.MEMORY_TRACK_REQUESTS:
+        register_request_allocations(app)
+
+def _configure_logging(app: Flask, config: Config):
     """Configure logging for ECS CloudWatch integration"""
     
     log_level = getattr(logging, config.LOG_LEVEL.upper(), logging.INFO)
     
-    # ECS-friendly logging format (JSON-like for CloudWatch)
-    log_format = '%(asctime)s [%(levelname)s] %(name)s: %(message)s'
-    if not app.debug:
-        # Structured logging for production/CloudWatch
-        log_format = '{"timestamp": "%(asctime)s", "level": "%(levelname)s", "logger": "%(name)s", "message": "%(message)s", "container_id": "' + os.getenv("HOSTNAME", "unknown") + '"}'
-    
-    logging.basicConfig(
-        level=log_level,
-        format=log_format,
-        datefmt='%Y-%m-%d %H:%M:%S'
+    # JSON lines for CloudWatch outside debug, written to stdout off the request threads
+    configure_logging(
+        log_level,
+        json_format=not app.debug,
+        static_fields={"container_id": os.getenv("HOSTNAME", "unknown")}
     )
     
     # Configure Flask app logger
     app.logger.setLevel(log_level)
     
-    # Add request logging for ALB access logs correlation
+    # One access record per request for ALB access logs correlation
     if not app.debug:
-        @app.before_request
-        def log_request_info():
-            app.logger.info(f"Request: {request.method} {request.url} from {request.remote_addr}")
-        
-        @app.after_request
-        def log_response_info(response):
-            app.logger.info(f"Response: {response.status_code} for {request.method} {request.url}")
-            return response
+        register_access_log(
+            app,
+            sample_rate=config.ACCESS_LOG_SAMPLE_RATE,
+            skip_endpoints=HEALTH_ENDPOINTS
+        )
 
 def _get_uptime():
     """Get application uptime (simplified for ECS)"""
@@ -254,29 +413,36 @@ def _get_uptime():
         return "unknown"
 
 def _get_memory_usage():
-    """Get basic memory usage info"""
+    """Memory of this process (not of the host): resident and virtual size in bytes"""
     try:
         import psutil
-        memory = psutil.virtual_memory()
+        memory = psutil.Process().memory_info()
         return {
-            "total": memory.total,
-            "available": memory.available,
-            "percent": memory.percent
+            "rss": memory.rss,
+            "vms": memory.vms
         }
     except ImportError:
-        return "psutil not available"
+        pass
     except:
         return "unknown"
+    try:
+        # Linux without psutil: sizes in pages
+        with open('/proc/self/statm', 'r') as f:
+            vms_pages, rss_pages = (int(value) for value in f.readline().split()[:2])
+        page_size = os.sysconf('SC_PAGE_SIZE')
+        return {
+            "rss": rss_pages * page_size,
+            "vms": vms_pages * page_size
+        }
+    except (OSError, ValueError):
+        return "unknown"
 
 def _get_request_id():
-    """Generate or extract request ID for tracing"""
-    # In production, you might want to extract this from ALB headers
-    return request.headers.get('X-Request-ID', 'unknown')
-
-# Create the Flask application instance
-app = create_app()
+    """The caller's X-Request-ID, or the trace id generated for this request"""
+    return g.get('request_id') or request.headers.get('X-Request-ID', 'unknown')
 
 if __name__ == '__main__':
+    app = create_app()
     port = int(os.getenv('FLASK_RUN_PORT', 8080))
     host = os.getenv('FLASK_RUN_HOST', '0.0.0.0')
     debug = app.config.get('DEBUG', False)
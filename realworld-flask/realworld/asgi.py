@@ -0,0 +1,165 @@
+"""
+ASGI entrypoint: the read endpoints run as coroutines on the asyncpg engine, so one worker can
+hold thousands of concurrent requests instead of one per thread. Every other request (writes,
+login, health and metrics) falls through to the Flask app, which runs in a thread pool.
+
+The async routes only get the CORS, route metrics and read-your-writes middleware below. They
+are not covered by admission control, @query_budget, tracing and Server-Timing or the access
+log, and they always read from the primary. A deployment that relies on replicas or an explicit
+ADMISSION_MAX_IN_FLIGHT is refused at startup instead of silently losing them.
+
+    uvicorn realworld.asgi:app --host 0.0.0.0 --port 8080
+"""
+
+import time
+import inspect
+import logging
+from datetime import datetime
+from contextlib import asynccontextmanager
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Mount
+from realworld.app import create_app
+from realworld.api.core.breaker import CircuitOpenError
+from realworld.api.core.db import registry, connection_budget, parse_pin_token, PRIMARY_PIN_COOKIE, PRIMARY_PIN_HEADER
+from realworld.api.core.db_async import dispose_async_engine
+from realworld.api.core.membership import async_caches_bypassed_until
+from realworld.api.core.route_metrics import route_metrics
+from realworld.api.routes.v1.articles.async_routes import articles_routes
+from realworld.api.routes.v1.profiles.async_routes import profiles_routes
+from realworld.api.routes.v1.users.async_routes import users_routes
+
+
+@asynccontextmanager
+async def _lifespan(app: Starlette):
+    yield
+    await dispose_async_engine()
+
+
+async def _database_unavailable(request: Request, error: CircuitOpenError) -> JSONResponse:
+    logging.warning(f"Failing fast: {error}")
+    return JSONResponse(
+        {
+            "error": "Service unavailable",
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "request_id": request.headers.get("X-Request-ID", "unknown"),
+        },
+        503,
+        headers={"Retry-After": str(int(error.retry_after + 0.5))},
+    )
+
+
+class _RouteMetricsMiddleware:
+    """
+    Record the async routes in the same per-route metrics as the Flask routes (as
+    "GET async.<handler>"). Requests that fall through to Flask are recorded by Flask.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        started_at = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # the router stores the matched endpoint in the scope
+            endpoint = scope.get("endpoint")
+            if inspect.isfunction(endpoint):
+                route_metrics.record(
+                    scope["method"], f"async.{endpoint.__name__}", status, (time.perf_counter() - started_at) * 1000
+                )
+
+
+class _ReadYourWritesMiddleware:
+    """
+    Flag requests from clients whose read-your-writes token (handed out by the Flask routes
+    after a write) carries a cache bypass, so the membership indexes skip their cached ids
+    """
+
+    def __init__(self, app, secret_key: str):
+        self.app = app
+        self.secret_key = secret_key
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        request = Request(scope)
+        pin_token = parse_pin_token(
+            request.headers.get(PRIMARY_PIN_HEADER) or request.cookies.get(PRIMARY_PIN_COOKIE), self.secret_key
+        )
+        token = async_caches_bypassed_until.set(pin_token.caches_until if pin_token else 0.0)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            async_caches_bypassed_until.reset(token)
+
+
+def check_supported_settings(config, db_config: dict) -> None:
+    """Raise ValueError for settings the async routes would silently ignore"""
+    unsupported = []
+    if db_config['replica_hosts']:
+        unsupported.append('DB_REPLICA_HOSTS')
+    if config.ADMISSION_MAX_IN_FLIGHT:
+        unsupported.append('ADMISSION_MAX_IN_FLIGHT')
+    if unsupported:
+        raise ValueError(
+            f"SERVER_MODE=asgi does not support {', '.join(unsupported)}: the async read routes "
+            "always use the primary and skip admission control, use SERVER_MODE=wsgi"
+        )
+
+
+def create_asgi_app() -> Starlette:
+    flask_app = create_app()
+    config = flask_app.extensions['config']
+    db_config = registry.config
+    check_supported_settings(config, db_config)
+    return Starlette(
+        routes=[
+            *articles_routes,
+            *profiles_routes,
+            *users_routes,
+            # a path or method without an async route is served by Flask
+            Mount(
+                "/",
+                app=WSGIMiddleware(
+                    flask_app,
+                    # one thread per connection the Flask side can check out
+                    workers=connection_budget(db_config),
+                ),
+            ),
+        ],
+        middleware=[
+            # same policy as flask-cors, it also answers the preflights for the Flask routes
+            Middleware(
+                CORSMiddleware,
+                allow_origins=config.CORS_ORIGINS,
+                allow_methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'],
+                allow_headers=['Content-Type', 'Authorization', 'X-Requested-With', 'X-Request-ID', 'traceparent', PRIMARY_PIN_HEADER],
+                expose_headers=['X-Total-Count', 'X-Query-Count', 'X-Request-ID', 'Server-Timing', PRIMARY_PIN_HEADER],
+            ),
+            Middleware(_RouteMetricsMiddleware),
+            Middleware(_ReadYourWritesMiddleware, secret_key=flask_app.secret_key),
+        ],
+        exception_handlers={CircuitOpenError: _database_unavailable},
+        lifespan=_lifespan,
+    )
+
+
+app = create_asgi_app()
@@ -1,6 +1,5 @@
 import os
 import json
-import boto3
 import logging
 from abc import ABC, abstractmethod
 from typing import Dict, Any
@@ -25,6 +24,13 @@ class Config(ABC):
     DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '20'))
     DB_POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', '30'))
     DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '3600'))
+    DB_DRIVER = os.getenv('DB_DRIVER', 'psycopg2').lower()  # 'psycopg2' or 'psycopg' (psycopg 3)
+    
+    # Admission Control Configuration (in-flight limit defaults to the write and read pools together)
+    ADMISSION_MAX_IN_FLIGHT = int(os.getenv('ADMISSION_MAX_IN_FLIGHT', '0'))
+    ADMISSION_WRITE_RESERVE = int(os.getenv('ADMISSION_WRITE_RESERVE', '2'))
+    ADMISSION_QUEUE_TIMEOUT = float(os.getenv('ADMISSION_QUEUE_TIMEOUT', '0.5'))
+    ADMISSION_MAX_QUEUE = int(os.getenv('ADMISSION_MAX_QUEUE', '50'))
     
     # JWT Configuration
     JWT_SECRET_KEY = None  # Will be loaded from security module
@@ -35,6 +41,23 @@ class Config(ABC):
     
     # Logging Configuration
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    ACCESS_LOG_SAMPLE_RATE = float(os.getenv('ACCESS_LOG_SAMPLE_RATE', '1.0'))  # share of successful reads logged
+    
+    # Route Metrics Configuration (CloudWatch Embedded Metric Format lines on stdout, 0 disables)
+    METRICS_EMF_INTERVAL = float(os.getenv('METRICS_EMF_INTERVAL', '60'))
+    METRICS_NAMESPACE = os.getenv('METRICS_NAMESPACE', 'RealWorld/API')
+    
+    # Tracing Configuration (OTLP/JSON file path or collector URL, e.g. http://localhost:4318/v1/traces)
+    TRACE_EXPORT = os.getenv('TRACE_EXPORT', '')
+    TRACE_SAMPLE_RATE = float(os.getenv('TRACE_SAMPLE_RATE', '0.1'))
+    
+    # Memory Diagnostics Configuration (tracemalloc snapshots every N seconds, 0 leaves tracing off)
+    MEMORY_SNAPSHOT_INTERVAL = float(os.getenv('MEMORY_SNAPSHOT_INTERVAL', '0'))
+    MEMORY_TRACE_FRAMES = int(os.getenv('MEMORY_TRACE_FRAMES', '1'))
+    MEMORY_TRACK_REQUESTS = os.getenv('MEMORY_TRACK_REQUESTS', 'False').lower() == 'true'
+    
+    # Admin Configuration (X-Admin-Token for /api/admin/*, the endpoints are disabled without it)
+    ADMIN_TOKEN = os.getenv('ADMIN_TOKEN', '')
     
     # Application Configuration
     APP_NAME = os.getenv('APP_NAME', 'realworld-flask')
@@ -84,13 +107,14 @@ class DevelopmentConfig(Config):
     # Development-specific settings
     DB_ECHO = os.getenv('DB_ECHO', 'True').lower() == 'true'
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'DEBUG')
+    METRICS_EMF_INTERVAL = float(os.getenv('METRICS_EMF_INTERVAL', '0'))
     
     # Allow all origins in development
     CORS_ORIGINS = ['*']
     
     @property
     def DATABASE_URL(self) -> str:
-        return f"postgresql+psycopg2://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
+        return f"postgresql+{self.DB_DRIVER}://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
     
     def get_config_dict(self) -> Dict[str, Any]:
         return {
@@ -123,7 +147,7 @@ class ProductionConfig(Config):
     def DATABASE_URL(self) -> str:
         # For RDS, we might need SSL
         ssl_mode = os.getenv('DB_SSL_MODE', 'require')
-        base_url = f"postgresql+psycopg2://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
+        base_url = f"postgresql+{self.DB_DRIVER}://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
         
         if ssl_mode != 'disable':
             base_url += f"?sslmode={ssl_mode}"
@@ -170,6 +194,3 @@ def get_config() -> Config:
         return config
     else:
         raise ValueError(f"Unknown environment: {env}")
-
-# Global config instance
-config = get_config()
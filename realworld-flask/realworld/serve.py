@@ -0,0 +1,172 @@
+"""
+Production WSGI server: gunicorn with preforked gthread workers around realworld.app:create_app.
+
+    python -m realworld.serve
+
+DB_POOL_SIZE, DB_MAX_OVERFLOW and the read pool settings are the connection budget of the whole
+task here, each worker gets its share so workers x pools stays under RDS max_connections. The app
+is preloaded in the master (imports and schema building happen once), every worker then resets
+the inherited connection pools. SIGTERM stops accepting connections and lets in-flight requests
+finish for SERVER_GRACEFUL_TIMEOUT seconds before workers are killed. SERVER_WARMUP=True also
+builds what requests build lazily in the master and freezes its heap, to share it copy-on-write.
+"""
+
+import os
+import logging
+from gunicorn.app.base import BaseApplication
+
+logger = logging.getLogger(__name__)
+
+
+def _available_cpus() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def get_server_options() -> dict:
+    """gunicorn settings from the SERVER_* environment variables"""
+    return {
+        'bind': f"{os.getenv('FLASK_RUN_HOST', '0.0.0.0')}:{os.getenv('FLASK_RUN_PORT', '8080')}",
+        'workers': int(os.getenv('SERVER_WORKERS', str(_available_cpus()))),
+        'worker_class': 'gthread',
+        'threads': int(os.getenv('SERVER_THREADS', '8')),
+        'preload_app': os.getenv('SERVER_PRELOAD', 'True').lower() == 'true',
+        'timeout': int(os.getenv('SERVER_TIMEOUT', '30')),
+        # below the ECS stopTimeout (30s by default), otherwise the task is killed mid-drain
+        'graceful_timeout': int(os.getenv('SERVER_GRACEFUL_TIMEOUT', '25')),
+        # above the ALB idle timeout (60s), so the ALB never reuses a connection we just closed
+        'keepalive': int(os.getenv('SERVER_KEEPALIVE', '75')),
+        'max_requests': int(os.getenv('SERVER_MAX_REQUESTS', '0')),
+        'max_requests_jitter': int(os.getenv('SERVER_MAX_REQUESTS_JITTER', '0')),
+        'accesslog': None,
+        'errorlog': '-',
+        'loglevel': os.getenv('LOG_LEVEL', 'info').lower(),
+        'when_ready': _when_ready,
+        'post_fork': _post_fork,
+        'worker_exit': _worker_exit,
+    }
+
+
+def apply_worker_pool_budget(workers: int) -> dict:
+    """
+    Split the task-wide pool settings across the workers by rewriting the DB_* environment
+    variables, which the database module reads when the app is created. The read pool is
+    carved out of each worker's DB_POOL_SIZE and DB_MAX_OVERFLOW, so those two are the
+    whole budget.
+    """
+    budget = {}
+    for name, default in (
+        ('DB_POOL_SIZE', '10'),
+        ('DB_MAX_OVERFLOW', '20'),
+        ('DB_READ_POOL_SIZE', None),
+        ('DB_READ_MAX_OVERFLOW', None),
+    ):
+        total = os.getenv(name, default)
+        if total is None:
+            continue
+        minimum = 1 if name.endswith('POOL_SIZE') else 0
+        budget[name] = max(minimum, int(total) // workers)
+
+    os.environ.update({name: str(value) for name, value in budget.items()})
+    return budget
+
+
+def warmup_enabled(options: dict) -> bool:
+    """SERVER_WARMUP builds everything in the master to share it copy-on-write, it needs the preload"""
+    return options['preload_app'] and os.getenv('SERVER_WARMUP', 'False').lower() == 'true'
+
+
+def _when_ready(server):
+    from realworld.api.core.health import database_prober, replica_lag_prober
+    from realworld.api.core.route_metrics import emf_publisher
+    from realworld.api.core.tracing import span_exporter
+    from realworld.api.core.memory import allocation_tracker
+
+    # the preloaded app started probing and publishing in the master, which serves no requests
+    database_prober.stop()
+    replica_lag_prober.stop()
+    emf_publisher.stop()
+    span_exporter.stop()
+    allocation_tracker.stop()
+
+    if server.app.warmup:
+        from realworld.api.core.warmup import freeze_heap
+
+        # last thing before the first fork, the workers inherit a heap the collector leaves alone
+        logger.info(f"Froze {freeze_heap()} objects for the workers to share")
+
+
+def _post_fork(server, worker):
+    from realworld.api.core.db import registry
+    from realworld.api.core.health import database_prober, replica_lag_prober
+    from realworld.api.core.route_metrics import emf_publisher
+    from realworld.api.core.tracing import span_exporter
+    from realworld.api.core.memory import allocation_tracker
+
+    # connections opened by the master (e.g. by the health probe) must not be shared, the
+    # worker creates its own engines on first use
+    registry.reset(close=False)
+    database_prober.ensure_started()
+    replica_lag_prober.ensure_started()
+    emf_publisher.ensure_started()
+    span_exporter.ensure_started()
+    allocation_tracker.ensure_started()
+
+
+def _worker_exit(server, worker):
+    from realworld.api.core.db import registry
+    from realworld.api.core.health import database_prober, replica_lag_prober
+    from realworld.api.core.logs import stop_logging
+    from realworld.api.core.route_metrics import emf_publisher
+    from realworld.api.core.tracing import span_exporter
+
+    # close our connections cleanly instead of leaving them to the server's idle timeout
+    database_prober.stop()
+    replica_lag_prober.stop()
+    # publish the requests of the last, partial interval
+    emf_publisher.stop()
+    span_exporter.stop()
+    registry.reset()
+    # the log listener thread is a daemon, write out what is still queued
+    stop_logging()
+
+
+class ProductionServer(BaseApplication):
+    def __init__(self, options: dict, warmup: bool = False):
+        self.options = options
+        self.warmup = warmup
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from realworld.app import create_app
+
+        app = create_app()
+        if self.warmup:
+            from realworld.api.core.warmup import warm_up
+
+            warm_up(app)
+        return app
+
+
+def main():
+    from realworld.api.core.db import connection_budget, get_database_config
+
+    options = get_server_options()
+    budget = apply_worker_pool_budget(options['workers'])
+    per_worker = connection_budget(get_database_config()) + 1  # + the health probe connection
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(name)s: %(message)s')
+    logger.info(
+        f"Starting {options['workers']} workers x {options['threads']} threads on {options['bind']}, "
+        f"per worker pools {budget}, at most {per_worker * options['workers']} primary connections"
+    )
+    ProductionServer(options, warmup=warmup_enabled(options)).run()
+
+
+if __name__ == '__main__':
+    main()
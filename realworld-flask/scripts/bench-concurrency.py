@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Concurrency benchmark: hold N keep-alive connections open against one or more running servers and
+issue GET requests on all of them for a fixed duration. Reports throughput, latency percentiles and
+errors per target, e.g. the sync (WSGI) and the async (ASGI) serving modes side by side:
+
+    ./run server                                        # sync, port 8080
+    poetry run uvicorn realworld.asgi:app --port 8000   # async
+    python scripts/bench-concurrency.py --target sync=http://localhost:8080 \\
+        --target async=http://localhost:8000 --connections 1000 --duration 30
+
+Raise the open file limit first (ulimit -n 4096), each connection is a socket on both sides.
+"""
+
+import time
+import asyncio
+import argparse
+import statistics
+import typing as typ
+from collections import Counter
+from urllib.parse import urlsplit
+
+DEFAULT_PATHS = [
+    "/api/articles?limit=20",
+    "/api/tags",
+]
+
+
+class _Stats:
+    def __init__(self):
+        self.latencies_ms: typ.List[float] = []
+        self.statuses: typ.Counter[int] = Counter()
+        self.errors: typ.Counter[str] = Counter()
+        self.connected = 0
+
+
+async def _read_response(reader: asyncio.StreamReader) -> typ.Tuple[int, bool]:
+    """Read one HTTP/1.1 response, returns (status, connection kept alive)"""
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    version, status = lines[0].split(" ", 2)[:2]
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        while True:
+            size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif "content-length" in headers:
+        await reader.readexactly(int(headers["content-length"]))
+    else:
+        await reader.read()
+        return int(status), False
+
+    keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+    return int(status), keep_alive
+
+
+async def _connection(
+    host: str,
+    port: int,
+    requests: typ.List[bytes],
+    deadline: float,
+    stats: _Stats,
+    offset: int,
+) -> None:
+    reader = writer = None
+    index = offset
+    while time.monotonic() < deadline:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+                stats.connected += 1
+
+            started_at = time.perf_counter()
+            writer.write(requests[index % len(requests)])
+            index += 1
+            status, keep_alive = await _read_response(reader)
+            stats.latencies_ms.append((time.perf_counter() - started_at) * 1000)
+            stats.statuses[status] += 1
+
+            if not keep_alive:
+                writer.close()
+                writer = None
+        except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError) as e:
+            stats.errors[type(e).__name__] += 1
+            if writer is not None:
+                writer.close()
+                writer = None
+            # back off a little so a refusing server is not hammered in a tight loop
+            await asyncio.sleep(0.05)
+
+    if writer is not None:
+        writer.close()
+
+
+async def _run_target(
+    url: str, paths: typ.List[str], connections: int, duration: float, token: typ.Optional[str]
+) -> typ.Tuple[_Stats, float]:
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    auth = f"Authorization: Token {token}\r\n" if token else ""
+    requests = [
+        f"GET {path} HTTP/1.1\r\nHost: {parts.netloc}\r\n{auth}Accept: application/json\r\n\r\n".encode()
+        for path in paths
+    ]
+
+    stats = _Stats()
+    started_at = time.monotonic()
+    deadline = started_at + duration
+    await asyncio.gather(
+        *(
+            _connection(host, port, requests, deadline, stats, offset)
+            for offset in range(connections)
+        )
+    )
+    return stats, time.monotonic() - started_at
+
+
+def _percentile(sorted_values: typ.List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))]
+
+
+def _report(name: str, stats: _Stats, elapsed: float) -> None:
+    latencies = sorted(stats.latencies_ms)
+    ok = sum(count for status, count in stats.statuses.items() if status < 400)
+    print(
+        f"{name:<10}{len(latencies) / elapsed:>10.0f}{ok / elapsed:>10.0f}"
+        f"{(statistics.median(latencies) if latencies else 0):>10.1f}"
+        f"{_percentile(latencies, 95):>10.1f}{_percentile(latencies, 99):>10.1f}"
+        f"{stats.connected:>8}  {dict(stats.statuses)} {dict(stats.errors)}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--target", action="append", required=True,
+        help="name=base_url of a running server, repeat to compare several",
+    )
+    parser.add_argument("--connections", type=int, default=1000)
+    parser.add_argument("--duration", type=float, default=30, help="seconds per target")
+    parser.add_argument("--path", action="append", help="GET path, repeat for a mix (default: articles and tags)")
+    parser.add_argument("--token", help="JWT sent as 'Authorization: Token <token>'")
+    args = parser.parse_args()
+
+    paths = args.path or DEFAULT_PATHS
+    print(f"{args.connections} connections, {args.duration:.0f}s per target, paths: {', '.join(paths)}\n")
+    print(f"{'target':<10}{'req/s':>10}{'ok/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'conns':>8}  statuses / errors")
+    for target in args.target:
+        name, _, url = target.partition("=")
+        stats, elapsed = asyncio.run(_run_target(url, paths, args.connections, args.duration, args.token))
+        _report(name, stats, elapsed)
+
+
+if __name__ == "__main__":
+    main()
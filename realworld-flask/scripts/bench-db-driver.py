@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Compare endpoint latency (p50/p99) between the psycopg2 and psycopg 3 database drivers
+Requires a migrated database configured through the usual POSTGRES_* environment variables
+
+    python scripts/bench-db-driver.py --requests 2000
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+from uuid import uuid4
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DRIVERS = ("psycopg2", "psycopg")
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def _seed(client):
+    """Create a user with a tagged, commented article to read back"""
+    suffix = uuid4().hex[:8]
+    user = client.post("/api/users", json={"user": {
+        "username": f"bench-{suffix}",
+        "email": f"bench-{suffix}@example.com",
+        "password": "bench",
+    }}).get_json()["user"]
+    headers = {"Authorization": f"Token {user['token']}"}
+    article = client.post("/api/articles", headers=headers, json={"article": {
+        "title": f"Bench {suffix}",
+        "description": "benchmark article",
+        "body": "body",
+        "tagList": ["bench", f"bench-{suffix}"],
+    }}).get_json()["article"]
+    client.post(f"/api/articles/{article['slug']}/comments", headers=headers,
+                json={"comment": {"body": "benchmark comment"}})
+    return user, article, headers
+
+
+def run_driver(requests):
+    """Time the endpoints in this process with the driver selected by DB_DRIVER"""
+    from realworld.app import create_app
+
+    client = create_app().test_client()
+    user, article, headers = _seed(client)
+    slug = article["slug"]
+    endpoints = {
+        "GET /api/articles": lambda: client.get("/api/articles", headers=headers),
+        "GET /api/articles?tag": lambda: client.get("/api/articles?tag=bench", headers=headers),
+        "GET /api/articles/:slug": lambda: client.get(f"/api/articles/{slug}", headers=headers),
+        "GET /api/articles/:slug/comments": lambda: client.get(f"/api/articles/{slug}/comments", headers=headers),
+        "GET /api/profiles/:username": lambda: client.get(f"/api/profiles/{user['username']}", headers=headers),
+        "GET /api/tags": lambda: client.get("/api/tags"),
+        "POST /api/articles/:slug/favorite": lambda: client.post(f"/api/articles/{slug}/favorite", headers=headers),
+    }
+
+    results = {}
+    for name, call in endpoints.items():
+        # warm up the pool and, for psycopg 3, the prepared statements
+        for _ in range(20):
+            call()
+        samples = []
+        for _ in range(requests):
+            start = time.perf_counter()
+            call()
+            samples.append((time.perf_counter() - start) * 1000)
+        results[name] = {"p50_ms": _percentile(samples, 50), "p99_ms": _percentile(samples, 99)}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=1000, help="timed requests per endpoint")
+    parser.add_argument("--driver", choices=DRIVERS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.driver:
+        print(json.dumps(run_driver(args.requests)))
+        return
+
+    # each driver runs in a fresh process, the engine is created at import time
+    results = {}
+    for driver in DRIVERS:
+        output = subprocess.run(
+            [sys.executable, __file__, "--driver", driver, "--requests", str(args.requests)],
+            env={**os.environ, "DB_DRIVER": driver, "LOG_LEVEL": "WARNING"},
+            check=True, capture_output=True, text=True,
+        ).stdout
+        results[driver] = json.loads(output.strip().splitlines()[-1])
+
+    print(f"{'endpoint':<36}" + "".join(f"{d + ' p50':>16}{d + ' p99':>16}" for d in DRIVERS))
+    for name in results[DRIVERS[0]]:
+        row = f"{name:<36}"
+        for driver in DRIVERS:
+            row += f"{results[driver][name]['p50_ms']:>14.2f}ms{results[driver][name]['p99_ms']:>14.2f}ms"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
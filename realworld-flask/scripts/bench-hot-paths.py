@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks of the pure Python per-request work, no database needed: building the article
+listing SQL, turning recorded rows into Article/Comment models, serializing responses with their
+camelCase aliases, validating request bodies, decoding tokens and generating slugs. The rows
+come from scripts/bench-fixtures (--record refreshes them from a database). Every benchmark warms
+up, then runs rounds of a calibrated number of calls with the garbage collector off and reports
+the fastest and the median time per call. Every round is followed by a round of a fixed pure
+Python reference loop, and the median ratio of the two is the benchmark's relative cost: it
+stays put when the whole machine is slower or busier. --compare checks the relative costs
+against the stored baselines, measures a slower one again to rule out noise and exits with 1
+when one stays more than --threshold percent slower:
+
+    python scripts/bench-hot-paths.py
+    python scripts/bench-hot-paths.py --compare                  # against scripts/bench-baselines.json
+    python scripts/bench-hot-paths.py --save-baseline            # after an intended change
+    python scripts/bench-hot-paths.py --filter model_dump --rounds 50
+    python scripts/bench-hot-paths.py --record                   # needs POSTGRES_* and data
+
+The ratio takes out the speed of the machine, not a different Python version, whose changes do
+not hit every benchmark alike; the report says when the stored baselines come from another one.
+"""
+
+import gc
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import statistics
+import typing as typ
+from datetime import datetime
+from collections import namedtuple
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import humps  # noqa: E402
+from realworld.api.core.models import Article, Profile  # noqa: E402
+from realworld.api.core.membership import MemberIds  # noqa: E402
+from realworld.api.core.auth import generate_jwt, _decode_jwt  # noqa: E402
+from realworld.api.routes.v1.articles import handler as articles_handler  # noqa: E402
+from realworld.api.routes.v1.articles.models import (  # noqa: E402
+    CreateArticleRequest,
+    MultipleArticlesResponse,
+    MultipleCommentsResponse,
+    SingleArticleResponse,
+)
+
+SCRIPTS = os.path.dirname(os.path.abspath(__file__))
+FIXTURES = os.path.join(SCRIPTS, "bench-fixtures")
+BASELINES = os.path.join(SCRIPTS, "bench-baselines.json")
+
+# seconds of calls before measuring, and the least a round takes
+WARMUP_SECONDS = 0.2
+MIN_ROUND_SECONDS = 0.02
+# times a regression is measured again before it is reported, it has to reproduce
+CONFIRM_RUNS = 2
+# calls of the reference loop after every round, about 10ms
+REFERENCE_CALLS = 200
+
+
+#
+# Fixtures
+#
+
+
+def _load_rows(name: str) -> list:
+    """Recorded rows as named tuples, attribute access like the SQLAlchemy rows they came from"""
+    with open(os.path.join(FIXTURES, f"{name}.json")) as f:
+        recorded = json.load(f)
+    Row = namedtuple(f"{name.title()}Row", recorded["columns"])
+    rows = []
+    for values in recorded["rows"]:
+        row = dict(zip(recorded["columns"], values))
+        for column in recorded["columns"]:
+            if column.endswith("_date") and row[column] is not None:
+                row[column] = datetime.fromisoformat(row[column])
+        rows.append(Row(**row))
+    return rows
+
+
+def _record() -> None:
+    """Replace the fixtures with the newest 20 articles and the comments of the most commented one"""
+    from sqlalchemy.sql import text as satext
+    from realworld.api.core.db import get_db_read_connection
+
+    def _encode(value):
+        if isinstance(value, datetime):
+            return value.isoformat()
+        if value is None or isinstance(value, (int, float, str, list)):
+            return value
+        # UUIDs
+        return str(value)
+
+    with get_db_read_connection(allow_replica=False) as db_conn:
+        articles = db_conn.execute(articles_handler._base_get_articles_query(limit=20, offset=0)).fetchall()
+        slug = db_conn.execute(satext(
+            "SELECT a.slug FROM articles a JOIN article_comments c ON c.article_id = a.id "
+            "GROUP BY a.slug ORDER BY COUNT(*) DESC LIMIT 1"
+        )).scalar()
+        comments = db_conn.execute(articles_handler.GET_ARTICLE_COMMENTS_QUERY.bindparams(slug=slug)).fetchall()[:20]
+
+    os.makedirs(FIXTURES, exist_ok=True)
+    for name, rows in (("articles", articles), ("comments", comments)):
+        if not rows:
+            raise SystemExit(f"No {name} to record, load some data first (scripts/generate-dataset.py)")
+        recorded = {"columns": list(rows[0]._fields), "rows": [[_encode(value) for value in row] for row in rows]}
+        with open(os.path.join(FIXTURES, f"{name}.json"), "w") as f:
+            json.dump(recorded, f, indent=1)
+            f.write("\n")
+        print(f"Recorded {len(rows)} {name}")
+
+
+#
+# Benchmarks
+#
+
+
+def benchmarks() -> typ.Dict[str, typ.Callable[[], typ.Any]]:
+    """name -> a call of the code path, with the arguments a typical request passes"""
+    articles = _load_rows("articles")
+    comments = _load_rows("comments")
+    # the viewer follows every other author and favorited a third of the page
+    following = MemberIds(row.author_user_id for row in articles[::2])
+    favorited = MemberIds(row.id for row in articles[::3])
+    models = [articles_handler._article_from_row(row, following, favorited) for row in articles]
+    comment_models = [articles_handler._comment_from_row(row, following) for row in comments]
+    token = generate_jwt(str(articles[0].author_user_id))
+    create_body = {"article": {
+        "title": articles[0].title,
+        "description": articles[0].description,
+        "body": articles[0].body,
+        "tagList": articles[0].tag_list or [],
+    }}
+    field_names = list(Article.model_fields) + list(Profile.model_fields)
+
+    return {
+        "query.listing": lambda: articles_handler._base_get_articles_query(limit=20, offset=0),
+        "query.filtered": lambda: articles_handler._base_get_articles_query(
+            curr_user_id=str(articles[0].author_user_id),
+            filter_tag="python",
+            author_username_filter=articles[0].author_username,
+            favorited_by_username_filter=articles[1].author_username,
+            limit=20,
+            offset=40,
+        ),
+        "query.feed": lambda: articles_handler._base_get_articles_query(
+            curr_user_id=str(articles[0].author_user_id), curr_user_feed=True, limit=20, offset=0
+        ),
+        "rows.articles_20": lambda: [
+            articles_handler._article_from_row(row, following, favorited) for row in articles
+        ],
+        "rows.comments_20": lambda: [articles_handler._comment_from_row(row, following) for row in comments],
+        "model_dump.articles_20": lambda: MultipleArticlesResponse(
+            articles=models, articles_count=len(models)
+        ).model_dump(),
+        # the same without the camelCase aliases, the difference is what aliasing costs
+        "model_dump.articles_20_no_alias": lambda: MultipleArticlesResponse(
+            articles=models, articles_count=len(models)
+        ).model_dump(by_alias=False),
+        "model_dump.article": lambda: SingleArticleResponse(article=models[0]).model_dump(),
+        "model_dump.comments_20": lambda: MultipleCommentsResponse(comments=comment_models).model_dump(),
+        "validate.create_article": lambda: CreateArticleRequest.model_validate(create_body),
+        # the alias generator, run for every field when a model's schema is built
+        "humps.camelize_fields": lambda: [humps.camelize(name) for name in field_names],
+        "jwt.decode_cached": lambda: _decode_jwt(token),
+        "jwt.decode_uncached": lambda: _decode_jwt.__wrapped__(token),
+        "jwt.encode": lambda: generate_jwt(str(articles[0].author_user_id)),
+        "slug.generate": lambda: articles_handler.generate_slug(articles[0].title),
+    }
+
+
+def _reference_workload():
+    """Plain interpreter work (a loop, str formatting, a dict, a sort) and no library code"""
+    counts = {}
+    for i in range(200):
+        key = f"key-{i % 50}"
+        counts[key] = counts.get(key, 0) + i
+    return sorted(counts.items(), key=lambda item: item[1])[:5]
+
+
+def _warm_up(func: typ.Callable) -> None:
+    # caches, lazily built validators, the specializing interpreter
+    deadline = time.perf_counter() + WARMUP_SECONDS
+    while time.perf_counter() < deadline:
+        func()
+
+
+def _calibrate(func: typ.Callable) -> int:
+    """Calls per round so that a round takes at least MIN_ROUND_SECONDS"""
+    calls = 1
+    while True:
+        # the fastest of three, one stall would otherwise end the calibration early
+        elapsed = min(_time_calls(func, calls) for _ in range(3))
+        if elapsed >= MIN_ROUND_SECONDS:
+            return calls
+        calls *= 2
+
+
+def _time_calls(func: typ.Callable, calls: int) -> float:
+    started_at = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return time.perf_counter() - started_at
+
+
+def measure(func: typ.Callable, rounds: int, calls: typ.Optional[int] = None) -> dict:
+    _warm_up(func)
+    calls = calls or _calibrate(func)
+
+    per_call_us, relative = [], []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(rounds):
+            per_call = _time_calls(func, calls) / calls
+            # right after, so that both see the same machine
+            reference = _time_calls(_reference_workload, REFERENCE_CALLS) / REFERENCE_CALLS
+            per_call_us.append(per_call * 1e6)
+            relative.append(per_call / reference)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    quartiles = statistics.quantiles(per_call_us, n=4) if len(per_call_us) > 1 else per_call_us * 3
+    return {
+        "median_us": _significant(statistics.median(per_call_us)),
+        "min_us": _significant(min(per_call_us)),
+        "iqr_us": _significant(quartiles[2] - quartiles[0]),
+        "relative": _significant(statistics.median(relative)),
+        "calls_per_round": calls,
+        "rounds": rounds,
+    }
+
+
+def _significant(value: float) -> float:
+    # the cached paths take a tenth of a microsecond, fixed decimals would round their changes away
+    return float(f"{value:.4g}")
+
+
+def _change(result: dict, baseline: dict) -> float:
+    """
+    Percent slower than the baseline, on the median round: the fastest one is as often a burst
+    of a boosted or briefly idle CPU as the true cost, and a baseline caught in one fails every
+    run. Relative to the reference loop, unless the baseline predates it.
+    """
+    key = "relative" if "relative" in baseline else "median_us"
+    return (result[key] - baseline[key]) / baseline[key] * 100
+
+
+def _environment() -> dict:
+    return {"python": platform.python_version(), "machine": platform.machine(), "processor": platform.processor() or None}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--filter", help="only the benchmarks whose name contains this")
+    parser.add_argument("--baseline", default=BASELINES, help="baselines file")
+    parser.add_argument("--compare", action="store_true", help="fail when slower than the baselines")
+    parser.add_argument("--threshold", type=float, default=15, help="percent slower that counts as a regression")
+    parser.add_argument("--save-baseline", action="store_true", help="store the results as the new baselines")
+    parser.add_argument("--output", help="also write the results as JSON here")
+    parser.add_argument("--record", action="store_true", help="refresh the row fixtures from the database and exit")
+    args = parser.parse_args()
+
+    if args.record:
+        _record()
+        return
+
+    baselines = {}
+    if args.compare or args.save_baseline:
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baselines = json.load(f)
+        elif args.compare:
+            raise SystemExit(f"No baselines at {args.baseline}, run with --save-baseline first")
+    if args.compare and baselines.get("environment") != _environment():
+        print(f"Note: the baselines were taken on {baselines.get('environment')}, this is {_environment()}\n")
+
+    _warm_up(_reference_workload)
+    selected = {name: func for name, func in benchmarks().items() if not args.filter or args.filter in name}
+    stored = baselines.get("benchmarks", {}) if args.compare else {}
+    results = {}
+    for name, func in selected.items():
+        # the baseline's calls per round, so that both measure the same amount of work
+        calls = stored.get(name, {}).get("calls_per_round")
+        results[name] = measure(func, args.rounds, calls)
+
+    def _slower(name: str) -> bool:
+        return name in stored and _change(results[name], stored[name]) > args.threshold
+
+    # measure a slower one again after the others, a burst of load on the machine has passed by then
+    for _ in range(CONFIRM_RUNS):
+        for name in filter(_slower, list(results)):
+            result = measure(selected[name], args.rounds, stored[name]["calls_per_round"])
+            results[name] = min(results[name], result, key=lambda r: r["relative"])
+
+    regressions = []
+    header = f"{'benchmark':<34}{'min us':>10}{'median us':>12}{'iqr us':>10}{'calls':>8}{'x ref':>10}"
+    print(header + (f"{'baseline':>10}{'change':>9}" if args.compare else ""))
+    for name, result in results.items():
+        line = (
+            f"{name:<34}{result['min_us']:>10.2f}{result['median_us']:>12.2f}"
+            f"{result['iqr_us']:>10.2f}{result['calls_per_round']:>8}{result['relative']:>10.4g}"
+        )
+        if args.compare:
+            baseline = stored.get(name)
+            if baseline is None:
+                line += f"{'(new)':>10}"
+            else:
+                change = _change(result, baseline)
+                line += f"{baseline.get('relative', baseline['median_us']):>10.4g}{change:>+8.1f}%"
+                if change > args.threshold:
+                    regressions.append(name)
+                    line += "  REGRESSION"
+        print(line)
+
+    report = {"environment": _environment(), "benchmarks": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+            f.write("\n")
+    if args.save_baseline:
+        # keep the baselines of the benchmarks not run this time (--filter)
+        stored = {**baselines.get("benchmarks", {}), **results}
+        with open(args.baseline, "w") as f:
+            json.dump({"environment": _environment(), "benchmarks": stored}, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"\nSaved {len(results)} baselines to {args.baseline}")
+    if regressions:
+        print(f"\n{len(regressions)} regressed more than {args.threshold:g}%: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
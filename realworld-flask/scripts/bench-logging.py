@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Logging overhead benchmark: time a trivial route through the Flask test client with no request
+logging, with the former synchronous before/after_request log lines, and with the queue-based
+access log (every request, and sampled). The output goes to an in-memory sink, --slow-write-ms
+makes every write block that long to show what a backed-up stdout does to request latency:
+
+    python scripts/bench-logging.py
+    python scripts/bench-logging.py --requests 2000 --slow-write-ms 1
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+import statistics
+from flask import Flask, jsonify, request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from realworld.api.core.logs import configure_logging, register_access_log, stop_logging  # noqa: E402
+
+
+class _Sink:
+    """A stdout stand-in that counts lines and optionally blocks on every write"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.lines = 0
+
+    def write(self, text: str) -> int:
+        if self.delay:
+            time.sleep(self.delay)
+        self.lines += text.count("\n")
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def _app() -> Flask:
+    app = Flask(__name__)
+
+    @app.route("/api/articles")
+    def articles():
+        return jsonify({"articles": [], "articlesCount": 0})
+
+    return app
+
+
+def _legacy_logging(app: Flask, sink: _Sink) -> None:
+    """The hooks and format string _configure_logging used before the queue pipeline"""
+    handler = logging.StreamHandler(sink)
+    handler.setFormatter(logging.Formatter(
+        '{"timestamp": "%(asctime)s", "level": "%(levelname)s", "logger": "%(name)s", '
+        '"message": "%(message)s", "container_id": "' + os.getenv("HOSTNAME", "unknown") + '"}',
+        '%Y-%m-%d %H:%M:%S',
+    ))
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    root.setLevel(logging.INFO)
+
+    @app.before_request
+    def log_request_info():
+        app.logger.info(f"Request: {request.method} {request.url} from {request.remote_addr}")
+
+    @app.after_request
+    def log_response_info(response):
+        app.logger.info(f"Response: {response.status_code} for {request.method} {request.url}")
+        return response
+
+
+def _run(mode: str, requests: int, rounds: int, delay: float) -> dict:
+    sink = _Sink(delay)
+    app = _app()
+    if mode == "legacy":
+        _legacy_logging(app, sink)
+    elif mode.startswith("queue"):
+        configure_logging(logging.INFO, stream=sink)
+        register_access_log(app, sample_rate=0.1 if mode == "queue-sampled" else 1.0)
+    else:
+        logging.getLogger().handlers[:] = [logging.NullHandler()]
+    app.logger.setLevel(logging.INFO)
+
+    client = app.test_client()
+    for _ in range(200):
+        client.get("/api/articles")
+
+    per_request_us = []
+    for _ in range(rounds):
+        started_at = time.perf_counter()
+        for _ in range(requests):
+            client.get("/api/articles")
+        per_request_us.append((time.perf_counter() - started_at) / requests * 1e6)
+
+    # let the listener drain, then count what actually got written
+    drain_started_at = time.perf_counter()
+    stop_logging()
+    return {
+        "us": statistics.median(per_request_us),
+        "lines": sink.lines,
+        "drain_s": time.perf_counter() - drain_started_at,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000, help="requests per round")
+    parser.add_argument("--rounds", type=int, default=5, help="rounds per mode, the median is reported")
+    parser.add_argument("--slow-write-ms", type=float, default=0, help="block every write to the sink this long")
+    args = parser.parse_args()
+
+    print(f"{args.requests} requests x {args.rounds} rounds, sink write delay {args.slow_write_ms}ms\n")
+    print(f"{'mode':<15}{'us/request':>12}{'overhead us':>13}{'lines':>9}{'drain s':>9}")
+    baseline = None
+    for mode in ("none", "legacy", "queue", "queue-sampled"):
+        result = _run(mode, args.requests, args.rounds, args.slow_write_ms / 1000)
+        baseline = baseline if baseline is not None else result["us"]
+        print(
+            f"{mode:<15}{result['us']:>12.1f}{result['us'] - baseline:>13.1f}"
+            f"{result['lines']:>9}{result['drain_s']:>9.2f}"
+        )
+    logging.getLogger().handlers[:] = []
+
+
+if __name__ == "__main__":
+    main()
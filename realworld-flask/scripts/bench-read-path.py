@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Compare the transactional path (get_db_connection) with the read-only path (get_db_read_connection)
+Reports latency per read and the implied number of network round trips, measured against a bare
+single round trip on the same connection pool. Requires the usual POSTGRES_* environment variables
+
+    python scripts/bench-read-path.py --iterations 5000
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from realworld.api.core import db
+from realworld.api.routes.v1.articles.handler import _base_get_articles_query
+
+
+def _time(iterations, fn):
+    for _ in range(min(100, iterations)):
+        fn()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    queries = {
+        "SELECT 1": lambda: text("SELECT 1"),
+        "article listing": lambda: _base_get_articles_query(limit=20, offset=0),
+    }
+
+    # one round trip: a statement on an autocommit connection that is already checked out
+    with db.registry.read_engine.connect() as conn:
+        rtt = _time(args.iterations, lambda: conn.execute(text("SELECT 1")).fetchall())
+
+    print(f"single round trip: {rtt:.3f}ms\n")
+    print(f"{'query':<18}{'get_db_connection':>20}{'get_db_read_connection':>24}{'saved round trips':>20}")
+    for name, query in queries.items():
+        def transactional():
+            with db.get_db_connection(read_only=False) as conn:
+                conn.execute(query()).fetchall()
+
+        def read_only():
+            with db.get_db_read_connection(allow_replica=False) as conn:
+                conn.execute(query()).fetchall()
+
+        transactional_p50 = _time(args.iterations, transactional)
+        read_only_p50 = _time(args.iterations, read_only)
+        saved = (transactional_p50 - read_only_p50) / rtt
+        print(f"{name:<18}{transactional_p50:>18.3f}ms{read_only_p50:>22.3f}ms{saved:>20.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Throughput of the production server (python -m realworld.serve) against the development server
+(flask run). Starts both on local ports with the current environment, waits until they answer,
+runs scripts/bench-concurrency.py against them and stops them again. Requires the usual POSTGRES_*
+environment variables and a migrated database
+
+    python scripts/bench-serving.py --connections 64 --duration 20 --workers 4
+"""
+
+import os
+import sys
+import time
+import signal
+import argparse
+import subprocess
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _start(command, port, extra_env):
+    env = {**os.environ, 'FLASK_APP': 'realworld.app', 'FLASK_RUN_PORT': str(port), **extra_env}
+    return subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def _wait_until_up(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/api/ping", timeout=1)
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server on port {port} did not come up within {timeout}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--connections", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--workers", type=int, help="SERVER_WORKERS for the production server")
+    parser.add_argument("--threads", type=int, help="SERVER_THREADS for the production server")
+    parser.add_argument("--path", action="append", help="GET path, repeat for a mix")
+    args = parser.parse_args()
+
+    production_env = {}
+    if args.workers:
+        production_env['SERVER_WORKERS'] = str(args.workers)
+    if args.threads:
+        production_env['SERVER_THREADS'] = str(args.threads)
+
+    servers = {
+        'flask-run': (9101, [sys.executable, '-m', 'flask', 'run', '--port', '9101'], {}),
+        'serve': (9102, [sys.executable, '-m', 'realworld.serve'], production_env),
+    }
+    processes = []
+    try:
+        for name, (port, command, extra_env) in servers.items():
+            processes.append(_start(command, port, extra_env))
+            _wait_until_up(port)
+
+        bench = [
+            sys.executable, os.path.join(ROOT, 'scripts', 'bench-concurrency.py'),
+            '--connections', str(args.connections), '--duration', str(args.duration),
+        ]
+        for path in args.path or []:
+            bench += ['--path', path]
+        for name, (port, _, _) in servers.items():
+            bench += ['--target', f"{name}=http://127.0.0.1:{port}"]
+        subprocess.run(bench, check=True)
+    finally:
+        for process in processes:
+            # SIGTERM is the graceful drain, the same signal ECS sends
+            process.send_signal(signal.SIGTERM)
+        for process in processes:
+            process.wait(timeout=60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Memory per prefork worker with and without SERVER_WARMUP. Starts the production server
+(python -m realworld.serve) in both modes, sends some traffic so the workers touch what a request
+touches, and reads the proportional set size (PSS: private pages plus a share of the pages shared
+with the master and the other workers) of every process from /proc/<pid>/smaps_rollup (Linux).
+Uses the current environment, routes that need the database just fail without one:
+
+    python scripts/bench-worker-memory.py --workers 4
+    python scripts/bench-worker-memory.py --workers 4 --requests 2000 --task-mb 512
+"""
+
+import os
+import sys
+import time
+import signal
+import argparse
+import subprocess
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_PATHS = ("/api/ping", "/api/tags", "/api/articles?limit=10", "/api/profiles?usernames=a,b", "/api/user")
+
+
+def _smaps_rollup(pid: int) -> dict:
+    """The kB fields of /proc/<pid>/smaps_rollup, e.g. {"Pss": 31000, "Rss": 52000, ...}"""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            name, _, value = line.partition(":")
+            if value.strip().endswith("kB"):
+                fields[name] = int(value.split()[0])
+    return fields
+
+
+def _children(pid: int) -> list:
+    children = []
+    for task in os.listdir(f"/proc/{pid}/task"):
+        with open(f"/proc/{pid}/task/{task}/children") as f:
+            children += [int(child) for child in f.read().split()]
+    return children
+
+
+def _wait_until_up(port: int, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/api/ping", timeout=1)
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server on port {port} did not come up within {timeout}s")
+
+
+def _get(url: str) -> None:
+    try:
+        with urllib.request.urlopen(url, timeout=10) as response:
+            response.read()
+    except urllib.error.HTTPError as e:
+        e.read()
+    except OSError:
+        pass
+
+
+def _measure(warmup: bool, args) -> dict:
+    port = args.port + (1 if warmup else 0)
+    env = {
+        **os.environ,
+        'FLASK_RUN_PORT': str(port),
+        'SERVER_WORKERS': str(args.workers),
+        'SERVER_PRELOAD': 'True',
+        'SERVER_WARMUP': str(warmup),
+    }
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'realworld.serve'], cwd=ROOT, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        _wait_until_up(port)
+        # let every worker finish booting before the traffic, gunicorn forks them one by one
+        time.sleep(args.settle)
+        urls = [f"http://127.0.0.1:{port}{path}" for path in args.path or DEFAULT_PATHS]
+        with ThreadPoolExecutor(args.workers * 4) as pool:
+            list(pool.map(_get, (urls[i % len(urls)] for i in range(args.requests))))
+        time.sleep(args.settle)
+
+        master = _smaps_rollup(server.pid)
+        workers = [_smaps_rollup(pid) for pid in _children(server.pid)]
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=60)
+
+    if not workers:
+        raise RuntimeError("No workers found, is the server failing to boot? Run it by hand to see")
+    per_worker = {
+        field: sum(worker.get(field, 0) for worker in workers) / len(workers)
+        for field in ("Pss", "Rss", "Shared_Clean", "Shared_Dirty", "Private_Dirty")
+    }
+    return {
+        "master_pss": master["Pss"],
+        "workers": len(workers),
+        "total_pss": master["Pss"] + sum(worker["Pss"] for worker in workers),
+        **per_worker,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4, help="SERVER_WORKERS")
+    parser.add_argument("--requests", type=int, default=1000, help="requests sent before measuring")
+    parser.add_argument("--path", action="append", help="GET path, repeat for a mix")
+    parser.add_argument("--port", type=int, default=9111, help="first of the two ports used")
+    parser.add_argument("--settle", type=float, default=2, help="seconds to wait before and after the traffic")
+    parser.add_argument("--task-mb", type=float, default=512, help="task memory for the workers-per-task estimate")
+    args = parser.parse_args()
+
+    print(f"{args.workers} workers, {args.requests} requests, kB per worker unless noted\n")
+    print(
+        f"{'mode':<10}{'PSS':>9}{'RSS':>9}{'shared':>9}{'private':>9}"
+        f"{'master PSS':>12}{'total PSS':>11}{'fit in task':>13}"
+    )
+    for warmup in (False, True):
+        result = _measure(warmup, args)
+        shared = result["Shared_Clean"] + result["Shared_Dirty"]
+        fit = int((args.task_mb * 1024 - result["master_pss"]) // result["Pss"])
+        print(
+            f"{'warmup' if warmup else 'default':<10}{result['Pss']:>9.0f}{result['Rss']:>9.0f}{shared:>9.0f}"
+            f"{result['Private_Dirty']:>9.0f}{result['master_pss']:>12}{result['total_pss']:>11}{fit:>13}"
+        )
+
+
+if __name__ == "__main__":
+    main()
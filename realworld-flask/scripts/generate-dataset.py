@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+Synthetic dataset generator: users, tags, articles, article tags, follows, favorites and comments
+with skewed popularity, loaded with COPY into the schema of the Alembic migrations. Popularity is
+Zipfian (a few authors write most articles, a few users gather most followers, a few articles most
+favorites and comments), how many users one follows or favorites is Pareto distributed. The data
+is deterministic: the same --seed and sizes give the same rows, ids included.
+
+At --scale 1 that is about 10M rows: 100k users, 1M articles, ~2.5M article tags, ~2M follows,
+~3M favorites and 1.5M comments. Requires the usual POSTGRES_* environment variables and an empty,
+migrated database (or --truncate):
+
+    python scripts/generate-dataset.py --scale 0.01              # ~100k rows, seconds
+    python scripts/generate-dataset.py --scale 1 --truncate --skip-fk-checks
+    python scripts/generate-dataset.py --scale 0.1 --output-dir /tmp/dataset   # COPY files only
+
+Users are loadtest<i> / loadtest<i>@example.com with the password "loadtest-password" (one bcrypt
+hash for all of them), so scripts/load-test.py --skip-seed runs against the generated data.
+"""
+
+import os
+import sys
+import time
+import random
+import bisect
+import logging
+import argparse
+import itertools
+import typing as typ
+from datetime import datetime, timedelta, timezone
+
+import bcrypt
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+logger = logging.getLogger(__name__)
+
+PASSWORD = "loadtest-password"
+_PASSWORD_SALT = b"$2b$12$loadtestloadtestloadte"
+
+# rows at --scale 1
+BASE_SIZES = {
+    "users": 100_000,
+    "tags": 1_000,
+    "articles": 1_000_000,
+    "follows": 2_000_000,
+    "favorites": 3_000_000,
+    "comments": 1_500_000,
+}
+
+# the first id segment tells the tables apart, the last one is the row number: deterministic and
+# ascending, so the primary key indexes are appended to rather than split all over
+_ID_PREFIX = {"users": "00000001", "articles": "00000002", "comments": "00000003", "tags": "00000004"}
+
+# fixed rather than now(), so the same seed gives the same rows on another day
+_EPOCH = datetime(2023, 1, 1, tzinfo=timezone.utc)
+_SPAN_DAYS = 730
+
+_WORDS = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor incididunt ut labore "
+    "et dolore magna aliqua python flask postgres query index cache latency worker request response "
+    "article comment profile follow favorite tag feed scale shard replica pool thread process memory "
+    "deploy release monitor trace metric alert budget design pattern service client server network"
+).split()
+
+_TAG_WORDS = (
+    "python flask postgres aws docker performance testing security design devops javascript react rust "
+    "go databases caching career startups architecture api linux networking observability ml data "
+    "frontend backend cloud kubernetes serverless"
+).split()
+
+
+def _id(table: str, index: int) -> str:
+    return f"{_ID_PREFIX[table]}-0000-4000-8000-{index:012x}"
+
+
+def _timestamp(fraction: float) -> str:
+    """A time in the generated period, `fraction` from 0 (start) to 1 (end)"""
+    return (_EPOCH + timedelta(days=_SPAN_DAYS * fraction)).isoformat()
+
+
+class _Popularity:
+    """Draws entity indexes with Zipf-distributed popularity, the most popular ones spread randomly"""
+
+    def __init__(self, count: int, exponent: float, rng: random.Random):
+        self.count = count
+        cumulative, total = [], 0.0
+        for rank in range(1, count + 1):
+            total += 1 / rank ** exponent
+            cumulative.append(total)
+        self._cumulative = cumulative
+        self._total = total
+        # rank -> index, so the popular users are not just the first ones created
+        self._ranked = list(range(count))
+        rng.shuffle(self._ranked)
+
+    def draw(self, rng: random.Random) -> int:
+        return self._ranked[bisect.bisect_left(self._cumulative, rng.random() * self._total)]
+
+
+def _out_degree(rng: random.Random, mean: float, cap: int, alpha: float = 2.0) -> int:
+    """A Pareto-distributed count with the given mean: most draws small, a few very large"""
+    return min(cap, int(mean * (alpha - 1) / alpha * rng.paretovariate(alpha) + 0.5))
+
+
+def _distinct(draw: typ.Callable[[], int], count: int, exclude: int = -1) -> typ.Set[int]:
+    """`count` distinct draws (fewer when the popular few keep coming up)"""
+    chosen: typ.Set[int] = set()
+    for _ in range(count * 3):
+        if len(chosen) >= count:
+            break
+        value = draw()
+        if value != exclude:
+            chosen.add(value)
+    return chosen
+
+
+#
+# Tables, each a generator of COPY text format lines
+#
+
+
+class Generator:
+    def __init__(self, sizes: dict, seed: int, skew: float):
+        self.sizes = sizes
+        self.seed = seed
+        self.skew = skew
+        self.counts: typ.Dict[str, int] = {}
+        popularity_rng = self._rng("popularity")
+        self.user_popularity = _Popularity(sizes["users"], skew, popularity_rng)
+        self.article_popularity = _Popularity(sizes["articles"], skew, popularity_rng)
+        self.tag_popularity = _Popularity(sizes["tags"], skew, popularity_rng)
+        bodies_rng = self._rng("bodies")
+        self.bodies = [
+            " ".join(bodies_rng.choices(_WORDS, k=bodies_rng.randint(50, 300))) for _ in range(1000)
+        ]
+
+    def _rng(self, table: str) -> random.Random:
+        # one stream per table, so resizing one table leaves the others' rows unchanged
+        return random.Random(f"{self.seed}:{table}")
+
+    def tables(self) -> typ.List[typ.Tuple[str, str, typ.Callable[[], typ.Iterator[str]]]]:
+        """(table, columns, rows) in foreign key order"""
+        return [
+            ("tags", "id, name", self.tags),
+            ("users", "id, username, email, password_hash, bio, image_url, created_date, updated_date", self.users),
+            ("articles", "id, author_user_id, slug, title, description, body, created_date, updated_date", self.articles),
+            ("article_tags", "tag_id, article_id", self.article_tags),
+            ("user_follows", "user_id, following_user_id", self.follows),
+            ("article_favorites", "user_id, article_id", self.favorites),
+            ("article_comments", "id, article_id, commenter_user_id, body, created_date, updated_date", self.comments),
+        ]
+
+    def tags(self) -> typ.Iterator[str]:
+        rng = self._rng("tags")
+        for index in range(self.sizes["tags"]):
+            name = _TAG_WORDS[index] if index < len(_TAG_WORDS) else f"{rng.choice(_TAG_WORDS)}-{index}"
+            yield f"{_id('tags', index)}\t{name}\n"
+
+    def users(self) -> typ.Iterator[str]:
+        rng = self._rng("users")
+        # one hash for everyone, bcrypt per user would take longer than the whole load (and a
+        # fixed salt keeps the rows deterministic)
+        password_hash = bcrypt.hashpw(PASSWORD.encode(), _PASSWORD_SALT).decode()
+        users = self.sizes["users"]
+        for index in range(users):
+            created = _timestamp(index / users * 0.5)
+            bio = " ".join(rng.choices(_WORDS, k=8)) if rng.random() < 0.6 else "\\N"
+            image = f"https://example.com/avatars/{index}.png" if rng.random() < 0.3 else "\\N"
+            yield (
+                f"{_id('users', index)}\tloadtest{index}\tloadtest{index}@example.com\t{password_hash}"
+                f"\t{bio}\t{image}\t{created}\t{created}\n"
+            )
+
+    def articles(self) -> typ.Iterator[str]:
+        rng = self._rng("articles")
+        articles = self.sizes["articles"]
+        for index in range(articles):
+            author = self.user_popularity.draw(rng)
+            words = rng.choices(_WORDS, k=rng.randint(3, 8))
+            # articles are created in id order over the second half of the period, after the users
+            created = _timestamp(0.5 + index / articles * 0.5)
+            yield (
+                f"{_id('articles', index)}\t{_id('users', author)}\t{'-'.join(words)}-{index:x}"
+                f"\t{' '.join(words).capitalize()}\t{' '.join(rng.choices(_WORDS, k=12))}"
+                f"\t{rng.choice(self.bodies)}\t{created}\t{created}\n"
+            )
+
+    def article_tags(self) -> typ.Iterator[str]:
+        rng = self._rng("article_tags")
+        tags = self.sizes["tags"]
+        for index in range(self.sizes["articles"]):
+            article_id = _id("articles", index)
+            for tag in _distinct(lambda: self.tag_popularity.draw(rng), min(tags, rng.randint(1, 4))):
+                yield f"{_id('tags', tag)}\t{article_id}\n"
+
+    def follows(self) -> typ.Iterator[str]:
+        rng = self._rng("follows")
+        users = self.sizes["users"]
+        mean = self.sizes["follows"] / users
+        for follower in range(users):
+            follower_id = _id("users", follower)
+            count = _out_degree(rng, mean, users - 1)
+            for followed in _distinct(lambda: self.user_popularity.draw(rng), count, exclude=follower):
+                yield f"{follower_id}\t{_id('users', followed)}\n"
+
+    def favorites(self) -> typ.Iterator[str]:
+        rng = self._rng("favorites")
+        users = self.sizes["users"]
+        mean = self.sizes["favorites"] / users
+        for user in range(users):
+            user_id = _id("users", user)
+            count = _out_degree(rng, mean, self.sizes["articles"])
+            for article in _distinct(lambda: self.article_popularity.draw(rng), count):
+                yield f"{user_id}\t{_id('articles', article)}\n"
+
+    def comments(self) -> typ.Iterator[str]:
+        rng = self._rng("comments")
+        articles = self.sizes["articles"]
+        for index in range(self.sizes["comments"]):
+            article = self.article_popularity.draw(rng)
+            # after the article, before the end of the period
+            created = _timestamp(0.5 + (article + rng.random() * (articles - article)) / articles * 0.5)
+            yield (
+                f"{_id('comments', index)}\t{_id('articles', article)}\t{_id('users', self.user_popularity.draw(rng))}"
+                f"\t{' '.join(rng.choices(_WORDS, k=rng.randint(5, 40)))}\t{created}\t{created}\n"
+            )
+
+
+def _chunks(rows: typ.Iterator[str], counter: typ.List[int], lines: int = 10_000) -> typ.Iterator[bytes]:
+    while True:
+        batch = list(itertools.islice(rows, lines))
+        if not batch:
+            return
+        counter[0] += len(batch)
+        yield "".join(batch).encode()
+
+
+class _CopySource:
+    """File-like view of the chunks for psycopg2's copy_expert"""
+
+    def __init__(self, chunks: typ.Iterator[bytes]):
+        self._chunks = chunks
+        self._buffer = b""
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        if size < 0:
+            data, self._buffer = self._buffer, b""
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+#
+# Loading
+#
+
+
+def _load(generator: Generator, args) -> None:
+    from realworld.api.core.db import registry, get_db_connection
+    from realworld.api.routes.v1.profiles.handler import reconcile_follow_counts
+
+    driver = registry.config["driver"]
+    connection = registry.engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        if args.truncate:
+            cursor.execute(
+                "TRUNCATE article_comments, article_favorites, article_tags, user_follows, articles, tags, users"
+            )
+        else:
+            cursor.execute("SELECT EXISTS (SELECT 1 FROM users) OR EXISTS (SELECT 1 FROM tags)")
+            if cursor.fetchone()[0]:
+                raise SystemExit("The database already has users or tags, pass --truncate to replace them")
+        if args.skip_fk_checks:
+            # skips the foreign key triggers (superuser only), the generated keys are consistent
+            cursor.execute("SET session_replication_role = replica")
+        cursor.execute("SET synchronous_commit = off")
+        connection.commit()
+
+        for table, columns, rows in generator.tables():
+            started_at, counter = time.perf_counter(), [0]
+            copy = f"COPY {table} ({columns}) FROM STDIN"
+            if driver == "psycopg":
+                with cursor.copy(copy) as copy_in:
+                    for chunk in _chunks(rows(), counter):
+                        copy_in.write(chunk)
+            else:
+                cursor.copy_expert(copy, _CopySource(_chunks(rows(), counter)), size=1 << 20)
+            connection.commit()
+            _report(table, counter[0], started_at)
+            generator.counts[table] = counter[0]
+
+        started_at = time.perf_counter()
+        cursor.execute(
+            "ANALYZE users; ANALYZE tags; ANALYZE articles; ANALYZE article_tags; "
+            "ANALYZE user_follows; ANALYZE article_favorites; ANALYZE article_comments"
+        )
+        connection.commit()
+        logger.info(f"Analyzed in {time.perf_counter() - started_at:.1f}s")
+    finally:
+        connection.close()
+
+    started_at = time.perf_counter()
+    with get_db_connection(read_only=False) as db_conn:
+        corrected = reconcile_follow_counts(db_conn)
+    logger.info(f"Follow counters set for {corrected} users in {time.perf_counter() - started_at:.1f}s")
+
+
+def _write_files(generator: Generator, output_dir: str) -> None:
+    os.makedirs(output_dir, exist_ok=True)
+    for table, columns, rows in generator.tables():
+        started_at, counter = time.perf_counter(), [0]
+        path = os.path.join(output_dir, f"{table}.copy")
+        with open(path, "wb") as f:
+            for chunk in _chunks(rows(), counter):
+                f.write(chunk)
+        _report(table, counter[0], started_at)
+        generator.counts[table] = counter[0]
+    with open(os.path.join(output_dir, "load.sql"), "w") as f:
+        for table, columns, _ in generator.tables():
+            f.write(f"\\copy {table} ({columns}) FROM '{table}.copy'\n")
+    logger.info(f"Wrote the COPY files to {output_dir}, load them with: cd {output_dir} && psql -f load.sql")
+
+
+def _report(table: str, rows: int, started_at: float) -> None:
+    seconds = time.perf_counter() - started_at
+    logger.info(f"{table:<18}{rows:>12,} rows {seconds:>8.1f}s {rows / seconds if seconds else 0:>12,.0f} rows/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=float, default=0.01, help="multiplies every table size (1 is ~10M rows)")
+    for table, size in BASE_SIZES.items():
+        parser.add_argument(f"--{table}", type=int, help=f"rows (for follows, favorites: about), {size:,} at scale 1")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skew", type=float, default=0.9, help="Zipf exponent of the popularity, higher is more skewed")
+    parser.add_argument("--truncate", action="store_true", help="empty the tables first")
+    parser.add_argument("--skip-fk-checks", action="store_true", help="skip foreign key triggers while loading (superuser)")
+    parser.add_argument("--output-dir", help="write COPY files and a psql script instead of loading")
+    args = parser.parse_args()
+
+    sizes = {
+        table: getattr(args, table) or max(1, int(size * args.scale))
+        for table, size in BASE_SIZES.items()
+    }
+    sizes["tags"] = max(sizes["tags"], 5)
+    logger.info(f"Generating {sizes} with seed {args.seed}, skew {args.skew}")
+
+    started_at = time.perf_counter()
+    generator = Generator(sizes, args.seed, args.skew)
+    if args.output_dir:
+        _write_files(generator, args.output_dir)
+    else:
+        _load(generator, args)
+
+    total = sum(generator.counts.values())
+    seconds = time.perf_counter() - started_at
+    logger.info(f"{total:,} rows in {seconds:.1f}s ({total / seconds:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,629 @@
+#!/usr/bin/env python3
+"""
+Load test: start the production server (python -m realworld.serve) against the local Postgres,
+seed it through the API with a deterministic dataset (users, follows, tagged articles, favorites
+and comments, all with skewed popularity), replay a weighted mix of requests at a fixed
+concurrency and write the throughput and latency percentiles per operation as JSON, to keep
+next to the commit and diff against the next run. Requires the usual POSTGRES_* environment
+variables and a migrated database (./run load-test does both):
+
+    ./run load-test --output loadtest.json
+    python scripts/load-test.py --concurrency 64 --duration 60 --workers 4 --output after.json
+    python scripts/load-test.py --url http://localhost:8080 --skip-seed --mix feed=30 --mix login=0
+    python scripts/load-test.py --compare before.json after.json
+
+Seeded users are loadtest<i> / loadtest<i>@example.com with the password "loadtest-password".
+Seeding is skipped when they already have articles, so reruns measure the same data.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import signal
+import asyncio
+import argparse
+import platform
+import subprocess
+import typing as typ
+from collections import Counter, defaultdict
+from urllib.parse import quote, urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PASSWORD = "loadtest-password"
+
+TAGS = [
+    "python", "flask", "postgres", "aws", "docker", "performance", "testing", "security", "design",
+    "devops", "javascript", "react", "rust", "go", "databases", "caching", "career", "startups",
+    "architecture", "api", "linux", "networking", "observability", "ml", "data", "frontend",
+    "backend", "cloud", "kubernetes", "serverless",
+]
+
+# operation -> weight, the mix of a read-heavy blog
+DEFAULT_MIX = {
+    "articles_recent": 10,
+    "articles_by_tag": 15,
+    "articles_by_author": 10,
+    "articles_favorited": 5,
+    "feed": 15,
+    "article": 20,
+    "comments": 10,
+    "comment_create": 2,
+    "favorite": 4,
+    "unfavorite": 4,
+    "login": 3,
+    "tags": 2,
+}
+
+
+def _zipf_weights(count: int, exponent: float) -> typ.List[float]:
+    """Cumulative weights of ranks 1..count, rank r drawn with probability ~ 1 / r^exponent"""
+    cumulative, total = [], 0.0
+    for rank in range(1, count + 1):
+        total += 1 / rank ** exponent
+        cumulative.append(total)
+    return cumulative
+
+
+class _Connection:
+    """One keep-alive HTTP/1.1 connection, reconnecting after errors"""
+
+    def __init__(self, host: str, port: int):
+        self.host, self.port = host, port
+        self.reader: typ.Optional[asyncio.StreamReader] = None
+        self.writer: typ.Optional[asyncio.StreamWriter] = None
+
+    async def request(
+        self, method: str, path: str, body: typ.Optional[dict] = None, token: typ.Optional[str] = None
+    ) -> typ.Tuple[int, bytes]:
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        payload = json.dumps(body).encode() if body is not None else b""
+        head = f"{method} {path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\nAccept: application/json\r\n"
+        if token:
+            head += f"Authorization: Token {token}\r\n"
+        if body is not None:
+            head += f"Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n"
+        try:
+            self.writer.write(head.encode() + b"\r\n" + payload)
+            return await self._read_response()
+        except BaseException:
+            self.close()
+            raise
+
+    async def _read_response(self) -> typ.Tuple[int, bytes]:
+        head = await self.reader.readuntil(b"\r\n\r\n")
+        lines = head.decode("latin-1").split("\r\n")
+        version, status = lines[0].split(" ", 2)[:2]
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await self.reader.readuntil(b"\r\n")).split(b";")[0], 16)
+                chunks.append((await self.reader.readexactly(size + 2))[:-2])
+                if size == 0:
+                    break
+            data = b"".join(chunks)
+        elif "content-length" in headers:
+            data = await self.reader.readexactly(int(headers["content-length"]))
+        else:
+            data = await self.reader.read()
+            self.close()
+            return int(status), data
+
+        if version != "HTTP/1.1" or headers.get("connection", "").lower() == "close":
+            self.close()
+        return int(status), data
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+async def _gather_limited(coroutines: typ.Iterable[typ.Awaitable], limit: int) -> list:
+    semaphore = asyncio.Semaphore(limit)
+
+    async def _run(coroutine):
+        async with semaphore:
+            return await coroutine
+
+    return await asyncio.gather(*(_run(coroutine) for coroutine in coroutines))
+
+
+class _Pool:
+    """A fixed set of connections handed out one per in-flight request"""
+
+    def __init__(self, host: str, port: int, size: int):
+        self._idle: "asyncio.Queue[_Connection]" = asyncio.Queue()
+        for _ in range(size):
+            self._idle.put_nowait(_Connection(host, port))
+
+    async def request(self, *args, **kwds) -> typ.Tuple[int, bytes]:
+        connection = await self._idle.get()
+        try:
+            return await connection.request(*args, **kwds)
+        finally:
+            self._idle.put_nowait(connection)
+
+    async def json(self, method: str, path: str, body: typ.Optional[dict] = None, token: typ.Optional[str] = None):
+        status, data = await self.request(method, path, body, token)
+        return status, (json.loads(data) if data.startswith((b"{", b"[")) else None)
+
+    def close(self) -> None:
+        while not self._idle.empty():
+            self._idle.get_nowait().close()
+
+
+#
+# Dataset
+#
+
+
+class Dataset:
+    """What the workload draws from: tokens, usernames, article slugs and tags, most popular first"""
+
+    def __init__(self):
+        self.tokens: typ.List[str] = []
+        self.logins: typ.List[typ.Tuple[str, str]] = []
+        self.usernames: typ.List[str] = []
+        self.slugs: typ.List[str] = []
+        self.tags: typ.List[str] = []
+
+    def summary(self) -> dict:
+        return {
+            "sessions": len(self.tokens),
+            "usernames": len(self.usernames),
+            "articles": len(self.slugs),
+            "tags": len(self.tags),
+        }
+
+
+def _user(index: int) -> dict:
+    return {"username": f"loadtest{index}", "email": f"loadtest{index}@example.com", "password": PASSWORD}
+
+
+async def _login(pool: _Pool, index: int) -> typ.Optional[str]:
+    user = _user(index)
+    status, body = await pool.json("POST", "/api/users/login", {"user": {"email": user["email"], "password": PASSWORD}})
+    return body["user"]["token"] if status == 200 else None
+
+
+async def _register_or_login(pool: _Pool, index: int) -> str:
+    status, body = await pool.json("POST", "/api/users", {"user": _user(index)})
+    if status == 200:
+        return body["user"]["token"]
+    if (token := await _login(pool, index)) is None:
+        raise RuntimeError(f"Could neither register nor log in loadtest{index} (HTTP {status})")
+    return token
+
+
+async def seed(pool: _Pool, args, rng: random.Random) -> dict:
+    """Create the dataset through the API, returns what was created"""
+    started_at = time.monotonic()
+    tokens = await _gather_limited((_register_or_login(pool, i) for i in range(args.users)), args.concurrency)
+
+    status, body = await pool.json("GET", "/api/articles?author=loadtest0&limit=1")
+    if status == 200 and body["articles"]:
+        print(f"Users already have articles, reusing the seeded dataset ({args.users} users)")
+        return {"users": args.users, "reused": True}
+
+    # a few prolific authors write most articles, a few tags label most of them
+    author_weights = _zipf_weights(args.users, 1.1)
+    tag_weights = _zipf_weights(len(TAGS), 1.0)
+    articles = []
+    for index in range(args.articles):
+        author = rng.choices(range(args.users), cum_weights=author_weights)[0]
+        tags = sorted(set(rng.choices(TAGS, cum_weights=tag_weights, k=rng.randint(1, 4))))
+        articles.append((author, {"article": {
+            "title": f"Load test article {index} {rng.choice(TAGS)}",
+            "description": f"About {', '.join(tags)}",
+            "body": " ".join(rng.choices(TAGS, k=rng.randint(50, 400))),
+            "tagList": tags,
+        }}))
+
+    async def _create_article(author: int, body: dict) -> typ.Optional[str]:
+        status, created = await pool.json("POST", "/api/articles", body, tokens[author])
+        return created["article"]["slug"] if status == 200 else None
+
+    slugs = [
+        slug for slug in await _gather_limited(
+            (_create_article(author, body) for author, body in articles), args.concurrency
+        ) if slug
+    ]
+
+    # popular users gather most followers, popular (early) articles most favorites and comments
+    user_weights = _zipf_weights(args.users, 1.0)
+    article_weights = _zipf_weights(len(slugs), 0.9)
+    follows = {
+        (follower, followed)
+        for follower in range(args.users)
+        for followed in rng.choices(range(args.users), cum_weights=user_weights, k=args.follows_per_user)
+        if followed != follower
+    }
+    favorites = {
+        (rng.randrange(args.users), rng.choices(slugs, cum_weights=article_weights)[0])
+        for _ in range(args.favorites)
+    }
+    comments = [
+        (rng.randrange(args.users), rng.choices(slugs, cum_weights=article_weights)[0])
+        for _ in range(args.comments)
+    ]
+
+    await _gather_limited(
+        (pool.request("POST", f"/api/profiles/loadtest{followed}/follow", None, tokens[follower])
+         for follower, followed in follows),
+        args.concurrency,
+    )
+    await _gather_limited(
+        (pool.request("POST", f"/api/articles/{quote(slug)}/favorite", None, tokens[user])
+         for user, slug in favorites),
+        args.concurrency,
+    )
+    await _gather_limited(
+        (pool.request("POST", f"/api/articles/{quote(slug)}/comments",
+                      {"comment": {"body": f"Comment {index} on {slug}"}}, tokens[user])
+         for index, (user, slug) in enumerate(comments)),
+        args.concurrency,
+    )
+    seeded = {
+        "users": args.users,
+        "articles": len(slugs),
+        "follows": len(follows),
+        "favorites": len(favorites),
+        "comments": len(comments),
+        "seconds": round(time.monotonic() - started_at, 1),
+    }
+    print(f"Seeded {seeded}")
+    return seeded
+
+
+async def discover(pool: _Pool, args) -> Dataset:
+    """Log in the sessions and collect the slugs, authors and tags the workload draws from"""
+    dataset = Dataset()
+    logins = range(min(args.sessions, args.users))
+    dataset.tokens = [token for token in await _gather_limited((_login(pool, i) for i in logins), args.concurrency) if token]
+    dataset.logins = [(_user(i)["email"], PASSWORD) for i in logins]
+    if not dataset.tokens:
+        raise RuntimeError("No loadtest user could log in, seed the database first (drop --skip-seed)")
+
+    status, body = await pool.json("GET", "/api/tags")
+    dataset.tags = body["tags"] if status == 200 else []
+    authors = Counter()
+    for offset in range(0, args.discover_articles, 100):
+        status, body = await pool.json("GET", f"/api/articles?limit=100&offset={offset}")
+        if status != 200 or not body["articles"]:
+            break
+        for article in body["articles"]:
+            dataset.slugs.append(article["slug"])
+            authors[article["author"]["username"]] += 1
+    # most prolific first, so the Zipf draws favour them
+    dataset.usernames = [username for username, _ in authors.most_common()]
+    if not dataset.slugs:
+        raise RuntimeError("No articles found, seed the database first (drop --skip-seed)")
+    return dataset
+
+
+#
+# Workload
+#
+
+
+class _Operations:
+    """One method per operation of the mix, each returns the HTTP status"""
+
+    def __init__(self, pool: _Pool, dataset: Dataset, rng: random.Random):
+        self.pool, self.dataset, self.rng = pool, dataset, rng
+        self._slug_weights = _zipf_weights(len(dataset.slugs), 0.9)
+        self._user_weights = _zipf_weights(len(dataset.usernames), 1.0)
+        self._tag_weights = _zipf_weights(len(dataset.tags), 1.0) if dataset.tags else []
+
+    def _slug(self) -> str:
+        return quote(self.rng.choices(self.dataset.slugs, cum_weights=self._slug_weights)[0])
+
+    def _username(self) -> str:
+        return quote(self.rng.choices(self.dataset.usernames, cum_weights=self._user_weights)[0])
+
+    def _token(self) -> str:
+        return self.rng.choice(self.dataset.tokens)
+
+    def _viewer(self) -> typ.Optional[str]:
+        # half the readers are logged in, which adds the following/favorited lookups
+        return self._token() if self.rng.random() < 0.5 else None
+
+    async def _get(self, path: str, token: typ.Optional[str] = None) -> int:
+        return (await self.pool.request("GET", path, None, token))[0]
+
+    async def articles_recent(self) -> int:
+        return await self._get("/api/articles?limit=20", self._viewer())
+
+    async def articles_by_tag(self) -> int:
+        if not self.dataset.tags:
+            return await self.articles_recent()
+        tag = self.rng.choices(self.dataset.tags, cum_weights=self._tag_weights)[0]
+        return await self._get(f"/api/articles?tag={quote(tag)}&limit=20", self._viewer())
+
+    async def articles_by_author(self) -> int:
+        return await self._get(f"/api/articles?author={self._username()}&limit=20", self._viewer())
+
+    async def articles_favorited(self) -> int:
+        return await self._get(f"/api/articles?favorited={self._username()}&limit=20", self._viewer())
+
+    async def feed(self) -> int:
+        return await self._get("/api/articles/feed?limit=20", self._token())
+
+    async def article(self) -> int:
+        return await self._get(f"/api/articles/{self._slug()}", self._viewer())
+
+    async def comments(self) -> int:
+        return await self._get(f"/api/articles/{self._slug()}/comments", self._viewer())
+
+    async def comment_create(self) -> int:
+        body = {"comment": {"body": f"Load test comment {self.rng.random()}"}}
+        return (await self.pool.request("POST", f"/api/articles/{self._slug()}/comments", body, self._token()))[0]
+
+    async def favorite(self) -> int:
+        return (await self.pool.request("POST", f"/api/articles/{self._slug()}/favorite", None, self._token()))[0]
+
+    async def unfavorite(self) -> int:
+        return (await self.pool.request("DELETE", f"/api/articles/{self._slug()}/favorite", None, self._token()))[0]
+
+    async def login(self) -> int:
+        email, password = self.rng.choice(self.dataset.logins)
+        body = {"user": {"email": email, "password": password}}
+        return (await self.pool.request("POST", "/api/users/login", body))[0]
+
+    async def tags(self) -> int:
+        return await self._get("/api/tags")
+
+
+class _Results:
+    def __init__(self):
+        self.latencies_ms: typ.Dict[str, typ.List[float]] = defaultdict(list)
+        self.statuses: typ.Dict[str, Counter] = defaultdict(Counter)
+        self.errors: typ.Dict[str, Counter] = defaultdict(Counter)
+
+
+async def _worker(
+    operations: _Operations, mix: typ.List[typ.Tuple[str, float]], measure_from: float, deadline: float,
+    results: _Results,
+) -> None:
+    names = [name for name, _ in mix]
+    cumulative = _cumulative([weight for _, weight in mix])
+    while (now := time.monotonic()) < deadline:
+        name = operations.rng.choices(names, cum_weights=cumulative)[0]
+        started_at = time.perf_counter()
+        try:
+            status = await getattr(operations, name)()
+        except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError) as e:
+            if now >= measure_from:
+                results.errors[name][type(e).__name__] += 1
+            # back off a little so a refusing server is not hammered in a tight loop
+            await asyncio.sleep(0.05)
+            continue
+        if now >= measure_from:
+            results.latencies_ms[name].append((time.perf_counter() - started_at) * 1000)
+            results.statuses[name][status] += 1
+
+
+def _cumulative(weights: typ.List[float]) -> typ.List[float]:
+    cumulative, total = [], 0.0
+    for weight in weights:
+        total += weight
+        cumulative.append(total)
+    return cumulative
+
+
+def _percentile(sorted_values: typ.List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))]
+
+
+def _summary(latencies: typ.List[float], statuses: Counter, errors: Counter, seconds: float) -> dict:
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "throughput_rps": round(len(latencies) / seconds, 1),
+        "errors": sum(count for status, count in statuses.items() if status >= 500) + sum(errors.values()),
+        "client_errors": sum(count for status, count in statuses.items() if 400 <= status < 500),
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "mean_ms": round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+        "p50_ms": round(_percentile(latencies, 50), 2),
+        "p95_ms": round(_percentile(latencies, 95), 2),
+        "p99_ms": round(_percentile(latencies, 99), 2),
+        "max_ms": round(latencies[-1], 2) if latencies else 0.0,
+    }
+
+
+async def run_workload(pool: _Pool, dataset: Dataset, args, mix: typ.Dict[str, float]) -> dict:
+    results = _Results()
+    started_at = time.monotonic()
+    measure_from = started_at + args.warmup
+    deadline = measure_from + args.duration
+    weighted = [(name, weight) for name, weight in mix.items() if weight > 0]
+    await asyncio.gather(*(
+        _worker(_Operations(pool, dataset, random.Random(args.seed * 1000 + i)), weighted, measure_from, deadline, results)
+        for i in range(args.concurrency)
+    ))
+
+    everything = _Results()
+    for name in results.latencies_ms.keys() | results.errors.keys():
+        everything.latencies_ms["all"] += results.latencies_ms[name]
+        everything.statuses["all"].update(results.statuses[name])
+        everything.errors["all"].update(results.errors[name])
+    return {
+        "total": _summary(everything.latencies_ms["all"], everything.statuses["all"], everything.errors["all"], args.duration),
+        "operations": {
+            name: _summary(results.latencies_ms[name], results.statuses[name], results.errors[name], args.duration)
+            for name in sorted(results.latencies_ms.keys() | results.errors.keys())
+        },
+    }
+
+
+#
+# Server and reporting
+#
+
+
+def _start_server(port: int, args) -> subprocess.Popen:
+    env = {**os.environ, 'FLASK_RUN_PORT': str(port)}
+    if args.workers:
+        env['SERVER_WORKERS'] = str(args.workers)
+    if args.threads:
+        env['SERVER_THREADS'] = str(args.threads)
+    log = open(os.path.join(ROOT, 'load-test-server.log'), 'w')
+    return subprocess.Popen([sys.executable, '-m', 'realworld.serve'], cwd=ROOT, env=env, stdout=log, stderr=log)
+
+
+async def _wait_until_up(pool: _Pool, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await pool.request("GET", "/api/ping"))[0] == 200:
+                return
+        except OSError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server did not come up within {timeout}s, see load-test-server.log")
+
+
+def _git_commit() -> typ.Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def _main(args, mix: typ.Dict[str, float]) -> dict:
+    parts = urlsplit(args.url or f"http://127.0.0.1:{args.port}")
+    pool = _Pool(parts.hostname, parts.port or 80, args.concurrency)
+    rng = random.Random(args.seed)
+    try:
+        await _wait_until_up(pool)
+        seeded = None if args.skip_seed else await seed(pool, args, rng)
+        dataset = await discover(pool, args)
+        print(f"Running {args.duration:.0f}s (+{args.warmup:.0f}s warm-up) at concurrency {args.concurrency}, dataset {dataset.summary()}")
+        results = await run_workload(pool, dataset, args, mix)
+    finally:
+        pool.close()
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "warmup_s": args.warmup,
+            "seed": args.seed,
+            "mix": mix,
+            "server": {
+                "url": args.url,
+                "workers": os.getenv("SERVER_WORKERS") if args.workers is None else args.workers,
+                "threads": os.getenv("SERVER_THREADS") if args.threads is None else args.threads,
+            },
+            "seeded": seeded,
+            "dataset": dataset.summary(),
+        },
+        **results,
+    }
+
+
+def _print_results(report: dict) -> None:
+    print(f"\n{'operation':<22}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}")
+    for name, summary in [*report["operations"].items(), ("all", report["total"])]:
+        print(
+            f"{name:<22}{summary['throughput_rps']:>9.1f}{summary['p50_ms']:>9.1f}"
+            f"{summary['p95_ms']:>9.1f}{summary['p99_ms']:>9.1f}{summary['errors']:>8}"
+        )
+
+
+def compare(before_path: str, after_path: str) -> None:
+    """Per operation change of throughput and latency between two reports"""
+    with open(before_path) as f:
+        before = json.load(f)
+    with open(after_path) as f:
+        after = json.load(f)
+
+    def _change(old: float, new: float) -> str:
+        return f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+
+    print(f"{before['meta'].get('commit')} -> {after['meta'].get('commit')}\n")
+    print(f"{'operation':<22}{'req/s':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'errors':>12}")
+    rows = [(name, before["operations"].get(name), summary) for name, summary in after["operations"].items()]
+    for name, old, new in [*rows, ("all", before["total"], after["total"])]:
+        if old is None:
+            print(f"{name:<22}{'(new)':>10}")
+            continue
+        print(
+            f"{name:<22}{_change(old['throughput_rps'], new['throughput_rps']):>10}"
+            f"{_change(old['p50_ms'], new['p50_ms']):>10}{_change(old['p95_ms'], new['p95_ms']):>10}"
+            f"{_change(old['p99_ms'], new['p99_ms']):>10}{old['errors']:>6} -> {new['errors']:<4}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="test a running server instead of starting one, e.g. http://localhost:8080")
+    parser.add_argument("--port", type=int, default=9131, help="port of the server started here")
+    parser.add_argument("--workers", type=int, help="SERVER_WORKERS for the server started here")
+    parser.add_argument("--threads", type=int, help="SERVER_THREADS for the server started here")
+    parser.add_argument("--concurrency", type=int, default=32, help="requests in flight")
+    parser.add_argument("--duration", type=float, default=30, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=5, help="seconds of traffic before measuring")
+    parser.add_argument("--mix", action="append", default=[], metavar="OPERATION=WEIGHT",
+                        help=f"change the weight of an operation, one of {', '.join(DEFAULT_MIX)}")
+    parser.add_argument("--seed", type=int, default=42, help="seed of the dataset and of the request mix")
+    parser.add_argument("--skip-seed", action="store_true", help="use the loadtest users already in the database")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--articles", type=int, default=2000)
+    parser.add_argument("--follows-per-user", type=int, default=20)
+    parser.add_argument("--favorites", type=int, default=5000)
+    parser.add_argument("--comments", type=int, default=3000)
+    parser.add_argument("--sessions", type=int, default=50, help="users logged in for the authenticated requests")
+    parser.add_argument("--discover-articles", type=int, default=2000, help="article slugs to draw from")
+    parser.add_argument("--output", help="write the JSON report here (printed to stdout otherwise)")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="compare two reports and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    mix = dict(DEFAULT_MIX)
+    for item in args.mix:
+        name, _, weight = item.partition("=")
+        if name not in DEFAULT_MIX:
+            parser.error(f"unknown operation {name!r}, use one of {', '.join(DEFAULT_MIX)}")
+        mix[name] = float(weight)
+
+    server = None if args.url else _start_server(args.port, args)
+    try:
+        report = asyncio.run(_main(args, mix))
+    finally:
+        if server is not None:
+            # SIGTERM is the graceful drain, the same signal ECS sends
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=60)
+
+    _print_results(report)
+    encoded = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(encoded + "\n")
+        print(f"\nWrote {args.output}")
+    else:
+        print(encoded)
+
+
+if __name__ == "__main__":
+    main()
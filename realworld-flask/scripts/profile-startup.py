@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Cold-start profile: import the app in a fresh interpreter with `python -X importtime` and report
+the import tree with the cumulative and self cost of each module, the most expensive modules and
+the cost per top-level package. With --budget-ms it exits non-zero when the import is slower,
+so CI catches a heavy import that sneaks back into the startup path:
+
+    python scripts/profile-startup.py
+    python scripts/profile-startup.py --min-ms 2 --top 30
+    python scripts/profile-startup.py --budget-ms 1500 --repeat 5
+
+Each run is a new process, the fastest one is reported (the others mostly measure noise from a
+cold page cache or a busy machine). Importing the app needs no database or credentials.
+"""
+
+import os
+import re
+import sys
+import argparse
+import subprocess
+import typing as typ
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+class _Import:
+    def __init__(self, name: str, self_us: int, cumulative_us: int, depth: int):
+        self.name = name
+        self.self_us = self_us
+        self.cumulative_us = cumulative_us
+        self.depth = depth
+        self.children: typ.List["_Import"] = []
+
+
+def _profile(module: str) -> typ.List[_Import]:
+    """Import `module` in a fresh interpreter, returns the top-level imports in import order"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        sys.exit(f"import {module} failed:\n{result.stderr}")
+
+    # importtime prints a module after its children, one indent level (2 spaces) per depth
+    roots: typ.List[_Import] = []
+    pending: typ.Dict[int, typ.List[_Import]] = defaultdict(list)
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        depth = (len(indent) - 1) // 2
+        node = _Import(name, int(self_us), int(cumulative_us), depth)
+        node.children = pending.pop(depth + 1, [])
+        (pending[depth - 1] if depth else roots).append(node)
+    return roots
+
+
+def _walk(nodes: typ.List[_Import]) -> typ.Iterator[_Import]:
+    for node in nodes:
+        yield node
+        yield from _walk(node.children)
+
+
+def _find(nodes: typ.List[_Import], name: str) -> typ.Optional[_Import]:
+    return next((node for node in _walk(nodes) if node.name == name), None)
+
+
+def _print_tree(nodes: typ.List[_Import], min_us: int, indent: int = 0) -> None:
+    for node in sorted(nodes, key=lambda node: -node.cumulative_us):
+        if node.cumulative_us < min_us:
+            continue
+        print(f"{node.cumulative_us / 1000:>9.1f}{node.self_us / 1000:>9.1f}  {'  ' * indent}{node.name}")
+        _print_tree(node.children, min_us, indent + 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="realworld.app", help="module to import (default: realworld.app)")
+    parser.add_argument("--repeat", type=int, default=3, help="fresh interpreters to run, the fastest is reported")
+    parser.add_argument("--min-ms", type=float, default=5, help="hide imports cheaper than this (cumulative)")
+    parser.add_argument("--top", type=int, default=15, help="modules listed by self time")
+    parser.add_argument("--budget-ms", type=float, help="fail when importing the module takes longer")
+    args = parser.parse_args()
+
+    runs = []
+    for _ in range(args.repeat):
+        roots = _profile(args.module)
+        target = _find(roots, args.module)
+        if target is None:
+            sys.exit(f"{args.module} was not imported (already loaded by the interpreter?)")
+        runs.append((target.cumulative_us, roots, target))
+    runs.sort(key=lambda run: run[0])
+    total_us, roots, target = runs[0]
+    everything = list(_walk([target]))
+
+    print(f"import {args.module}: {total_us / 1000:.1f}ms (fastest of {args.repeat}, "
+          f"slowest {runs[-1][0] / 1000:.1f}ms), {len(everything)} modules\n")
+
+    print(f"{'cumul ms':>9}{'self ms':>9}  module (imports of at least {args.min_ms:g}ms)")
+    _print_tree([target], int(args.min_ms * 1000))
+
+    print(f"\n{'self ms':>9}  most expensive modules")
+    for node in sorted(everything, key=lambda node: -node.self_us)[:args.top]:
+        print(f"{node.self_us / 1000:>9.1f}  {node.name}")
+
+    packages: typ.Dict[str, int] = defaultdict(int)
+    for node in everything:
+        packages[node.name.split(".")[0]] += node.self_us
+    print(f"\n{'self ms':>9}  per top-level package")
+    for package, self_us in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{self_us / 1000:>9.1f}  {package}")
+
+    if args.budget_ms is not None:
+        if total_us / 1000 > args.budget_ms:
+            print(f"\nFAIL: import {args.module} took {total_us / 1000:.1f}ms, budget is {args.budget_ms:g}ms")
+            sys.exit(1)
+        print(f"\nOK: import {args.module} took {total_us / 1000:.1f}ms, budget is {args.budget_ms:g}ms")
+
+
+if __name__ == "__main__":
+    main()
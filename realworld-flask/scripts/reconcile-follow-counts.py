@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Reconcile users.followers_count/following_count with user_follows
+Counters are maintained by follow/unfollow, this job repairs any drift (e.g. manual data fixes)
+"""
+
+import os
+import sys
+import logging
+
+# Add the parent directory to the path so we can import our modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from realworld.api.core.db import get_db_connection
+from realworld.api.routes.v1.profiles.handler import reconcile_follow_counts
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def main():
+    """Main reconciliation function"""
+    logger.info("Reconciling follow counters...")
+
+    try:
+        with get_db_connection() as db_conn:
+            corrected = reconcile_follow_counts(db_conn)
+    except Exception as e:
+        logger.error(f"Follow counter reconciliation failed: {e}")
+        sys.exit(1)
+
+    logger.info(f"Follow counters reconciled, {corrected} users corrected")
+
+if __name__ == "__main__":
+    main()
@@ -11,5 +11,15 @@ if [ "${FLASK_ENV}" = "production" ] || [ "${INIT_DB}" = "true" ]; then
 fi
 
 # Start the application
-echo "Starting Flask application..."
-exec python -m flask run
+if [ "${SERVER_MODE}" = "asgi" ]; then
+    echo "Starting ASGI application..."
+    exec uvicorn realworld.asgi:app --host "${FLASK_RUN_HOST:-0.0.0.0}" --port "${FLASK_RUN_PORT:-8080}"
+fi
+
+if [ "${SERVER_MODE}" = "dev" ]; then
+    echo "Starting Flask development server..."
+    exec python -m flask run
+fi
+
+echo "Starting production WSGI server..."
+exec python -m realworld.serve
@@ -0,0 +1,44 @@
+import uuid
+import pytest
+from sqlalchemy.exc import SQLAlchemyError
+from realworld.app import create_app
+from realworld.api.core.db import registry
+
+
+@pytest.fixture(scope="session")
+def app():
+    app = create_app()
+    app.testing = True
+    return app
+
+
+@pytest.fixture(scope="session")
+def database(app):
+    """The primary engine, the test is skipped when no database is reachable"""
+    try:
+        with registry.engine.connect():
+            pass
+    except SQLAlchemyError as e:
+        pytest.skip(f"No database: {e}")
+    return registry.engine
+
+
+@pytest.fixture
+def client(app, database):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_user(app, database):
+    """Register a user with a unique name, returns (username, Authorization headers)"""
+
+    def register():
+        username = f"test-{uuid.uuid4().hex[:12]}"
+        response = app.test_client().post(
+            "/api/users",
+            json={"user": {"username": username, "email": f"{username}@example.com", "password": "password"}},
+        )
+        assert response.status_code == 200, response.json
+        return username, {"Authorization": f"Token {response.json['user']['token']}"}
+
+    return register
@@ -0,0 +1,23 @@
+import pytest
+
+pytest.importorskip("starlette")
+pytest.importorskip("a2wsgi")
+
+from types import SimpleNamespace
+from realworld.asgi import check_supported_settings
+
+
+def test_default_settings_are_supported():
+    check_supported_settings(SimpleNamespace(ADMISSION_MAX_IN_FLIGHT=0), {"replica_hosts": []})
+
+
+@pytest.mark.parametrize(
+    "max_in_flight, replica_hosts, variable",
+    [
+        (0, ["replica:5432"], "DB_REPLICA_HOSTS"),
+        (16, [], "ADMISSION_MAX_IN_FLIGHT"),
+    ],
+)
+def test_settings_the_async_routes_ignore_are_refused(max_in_flight, replica_hosts, variable):
+    with pytest.raises(ValueError, match=variable):
+        check_supported_settings(SimpleNamespace(ADMISSION_MAX_IN_FLIGHT=max_in_flight), {"replica_hosts": replica_hosts})
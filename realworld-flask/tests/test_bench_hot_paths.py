@@ -0,0 +1,28 @@
+import os
+import sys
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_hot_paths_are_not_slower_than_the_baselines(capsys):
+    """
+    scripts/bench-hot-paths.py --compare, its report is printed on every run. The costs are
+    relative to a reference loop timed alongside, so they carry over to other machines within
+    the default threshold, and a regression that reproduces fails the test
+    """
+    result = subprocess.run(
+        [
+            sys.executable,
+            os.path.join(ROOT, "scripts", "bench-hot-paths.py"),
+            "--compare",
+            "--threshold",
+            os.getenv("BENCH_THRESHOLD", "30"),
+        ],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    with capsys.disabled():
+        print(f"\n{result.stdout}{result.stderr}")
+    assert result.returncode == 0, result.stdout + result.stderr
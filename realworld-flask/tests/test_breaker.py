@@ -0,0 +1,42 @@
+import time
+import pytest
+from realworld.api.core.breaker import CircuitBreaker, CircuitOpenError, CLOSED, HALF_OPEN, OPEN
+
+RESET_TIMEOUT = 0.05
+
+
+@pytest.fixture
+def breaker():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=RESET_TIMEOUT)
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    return breaker
+
+
+def test_half_open_lets_a_single_trial_through(breaker):
+    assert not breaker.allows_calls()
+    time.sleep(RESET_TIMEOUT * 1.5)
+    assert breaker.allows_calls()
+
+    breaker.before_call()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allows_calls()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.state == CLOSED and breaker.allows_calls()
+
+
+def test_trial_that_never_reports_back_expires(breaker):
+    time.sleep(RESET_TIMEOUT * 1.5)
+    # e.g. the trial timed out waiting for the pool, neither success nor failure is recorded
+    breaker.before_call()
+    assert not breaker.allows_calls()
+
+    time.sleep(RESET_TIMEOUT * 1.5)
+    assert breaker.state == HALF_OPEN
+    assert breaker.allows_calls()
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == OPEN
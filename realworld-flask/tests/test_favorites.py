@@ -0,0 +1,56 @@
+import time
+import uuid
+from sqlalchemy import text
+from realworld.api.core.db import format_pin_token, PinToken, PRIMARY_PIN_HEADER
+
+
+def _create_article(app, headers) -> str:
+    response = app.test_client().post(
+        "/api/articles",
+        headers=headers,
+        json={"article": {"title": f"Test {uuid.uuid4().hex}", "description": "d", "body": "b", "tagList": []}},
+    )
+    assert response.status_code == 200, response.json
+    return response.json["article"]["slug"]
+
+
+def test_favorite_and_unfavorite(app, make_user):
+    _, author = make_user()
+    _, reader = make_user()
+    slug = _create_article(app, author)
+
+    response = app.test_client().post(f"/api/articles/{slug}/favorite", headers=reader)
+    assert response.status_code == 200, response.json
+    assert (response.json["article"]["favorited"], response.json["article"]["favoritesCount"]) == (True, 1)
+
+    response = app.test_client().delete(f"/api/articles/{slug}/favorite", headers=reader)
+    assert response.status_code == 200, response.json
+    assert (response.json["article"]["favorited"], response.json["article"]["favoritesCount"]) == (False, 0)
+
+    article = app.test_client().get(f"/api/articles/{slug}", headers=reader).json["article"]
+    assert (article["favorited"], article["favoritesCount"]) == (False, 0)
+
+    # unfavoriting again is a no-op
+    response = app.test_client().delete(f"/api/articles/{slug}/favorite", headers=reader)
+    assert response.status_code == 200, response.json
+    assert response.json["article"]["favorited"] is False
+
+
+def test_pinned_client_sees_a_favorite_made_by_another_worker(app, database, make_user):
+    _, author = make_user()
+    reader_name, reader = make_user()
+    slug = _create_article(app, author)
+    assert app.test_client().get(f"/api/articles/{slug}", headers=reader).json["article"]["favorited"] is False
+
+    # committed by another worker, this process's favorites index does not hear about it
+    with database.begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO article_favorites (article_id, user_id) "
+                "SELECT a.id, u.id FROM articles a, users u WHERE a.slug = :slug AND u.username = :username"
+            ),
+            {"slug": slug, "username": reader_name},
+        )
+
+    pinned = {**reader, PRIMARY_PIN_HEADER: format_pin_token(PinToken(caches_until=time.time() + 20), app.secret_key)}
+    assert app.test_client().get(f"/api/articles/{slug}", headers=pinned).json["article"]["favorited"] is True
@@ -0,0 +1,48 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import text
+
+THREADS = 8
+OPERATIONS = 200
+
+COUNTS_QUERY = text(
+    """
+    SELECT
+        u.username,
+        u.followers_count,
+        u.following_count,
+        (SELECT COUNT(*) FROM user_follows f WHERE f.following_user_id = u.id) AS actual_followers,
+        (SELECT COUNT(*) FROM user_follows f WHERE f.user_id = u.id) AS actual_following
+    FROM users u
+    WHERE u.username = ANY(:usernames)
+    """
+)
+
+
+def test_concurrent_follows_keep_the_counters_exact(app, database, make_user):
+    """
+    Concurrent follows and unfollows of the same pairs: duplicate follows and unfollows of a
+    missing follow must not move the counters, and no increment may be lost
+    """
+    users = [make_user() for _ in range(3)]
+    target, _ = make_user()
+    usernames = [username for username, _ in users] + [target]
+    pairs = [(headers, target) for _, headers in users] + [(users[0][1], users[1][0])]
+
+    def run(seed: int) -> None:
+        client = app.test_client()
+        rnd = random.Random(seed)
+        for _ in range(OPERATIONS // THREADS):
+            headers, username = rnd.choice(pairs)
+            method = client.post if rnd.random() < 0.5 else client.delete
+            response = method(f"/api/profiles/{username}/follow", headers=headers)
+            assert response.status_code == 200, response.json
+
+    with ThreadPoolExecutor(THREADS) as pool:
+        list(pool.map(run, range(THREADS)))
+
+    with database.connect() as conn:
+        rows = conn.execute(COUNTS_QUERY, {"usernames": usernames}).fetchall()
+    assert len(rows) == len(usernames)
+    for row in rows:
+        assert (row.followers_count, row.following_count) == (row.actual_followers, row.actual_following), row
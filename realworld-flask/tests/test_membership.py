@@ -0,0 +1,143 @@
+import time
+import uuid
+import pytest
+from sqlalchemy import text
+from realworld.api.core.db import after_commit, get_db_connection, format_pin_token, parse_pin_token, PinToken, PRIMARY_PIN_HEADER
+from realworld.api.core.membership import ViewerMembershipIndex, follow_index
+
+
+def _user_id(database, username: str) -> str:
+    with database.connect() as conn:
+        return str(conn.execute(text("SELECT id FROM users WHERE username = :u"), {"u": username}).scalar())
+
+
+def _follow_elsewhere(database, follower: str, followed: str) -> None:
+    """A follow committed by another worker, this process's index does not hear about it"""
+    with database.begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO user_follows (user_id, following_user_id) "
+                "SELECT f.id, t.id FROM users f, users t WHERE f.username = :f AND t.username = :t"
+            ),
+            {"f": follower, "t": followed},
+        )
+
+
+def _cache_bypass(app, seconds: float = 20) -> dict:
+    return {PRIMARY_PIN_HEADER: format_pin_token(PinToken(caches_until=time.time() + seconds), app.secret_key)}
+
+
+def test_pinned_client_sees_a_follow_made_by_another_worker(app, database, make_user):
+    follower, viewer = make_user()
+    target, _ = make_user()
+    assert app.test_client().get(f"/api/profiles/{target}", headers=viewer).json["profile"]["following"] is False
+
+    _follow_elsewhere(database, follower, target)
+
+    # without the bypass the cached ids are served until they expire (FOLLOW_INDEX_TTL_SECONDS)
+    assert app.test_client().get(f"/api/profiles/{target}", headers=viewer).json["profile"]["following"] is False
+    # a primary pin alone keeps the cached ids
+    primary_only = {PRIMARY_PIN_HEADER: format_pin_token(PinToken(primary_until=time.time() + 10), app.secret_key)}
+    assert app.test_client().get(f"/api/profiles/{target}", headers={**viewer, **primary_only}).json["profile"]["following"] is False
+    pinned = app.test_client().get(f"/api/profiles/{target}", headers={**viewer, **_cache_bypass(app)})
+    assert pinned.json["profile"]["following"] is True
+
+
+def test_follow_bypasses_the_caches_for_the_index_ttl(app, database, make_user):
+    _, viewer = make_user()
+    target, _ = make_user()
+    # load the viewer's ids into this process's index before the write
+    assert app.test_client().get(f"/api/profiles/{target}", headers=viewer).json["profile"]["following"] is False
+
+    followed_at = time.time()
+    response = app.test_client().post(f"/api/profiles/{target}/follow", headers=viewer)
+    assert response.json["profile"]["following"] is True
+    token = parse_pin_token(response.headers[PRIMARY_PIN_HEADER], app.secret_key)
+    assert token.caches_until >= followed_at + follow_index.stats()["ttl_seconds"] - 1
+    # no replicas in the tests, so nothing pins the client's reads to the primary
+    assert token.primary_until == 0
+
+    # this process's copy was updated after the commit, no token needed here
+    assert app.test_client().get(f"/api/profiles/{target}", headers=viewer).json["profile"]["following"] is True
+
+    response = app.test_client().delete(f"/api/profiles/{target}/follow", headers=viewer)
+    assert response.json["profile"]["following"] is False
+    assert app.test_client().get(f"/api/profiles/{target}", headers=viewer).json["profile"]["following"] is False
+
+
+def test_rolled_back_follow_leaves_the_index_unchanged(app, database, make_user):
+    viewer, _ = make_user()
+    target, _ = make_user()
+    viewer_id, target_id = _user_id(database, viewer), _user_id(database, target)
+
+    with app.test_request_context(method="GET"):
+        with get_db_connection(read_only=False) as conn:
+            assert target_id not in follow_index.get(conn, viewer_id)
+
+    with app.test_request_context(method="POST"):
+        with pytest.raises(RuntimeError):
+            with get_db_connection() as conn:
+                follow_index.add(viewer_id, target_id)
+                raise RuntimeError("rolled back")
+
+    with app.test_request_context(method="GET"):
+        with get_db_connection(read_only=False) as conn:
+            assert target_id not in follow_index.get(conn, viewer_id)
+
+
+def test_index_is_bounded_by_the_ids_it_holds():
+    index = ViewerMembershipIndex("SELECT :viewer_id", max_viewers=100, max_ids=5, ttl_seconds=60)
+    first, second = [uuid.uuid4() for _ in range(3)], [uuid.uuid4() for _ in range(3)]
+    now = time.monotonic()
+
+    assert first[0] in index._load("viewer-1", [(i,) for i in first], now)
+    index._load("viewer-2", [(str(i),) for i in second], now)
+    # six ids do not fit, the least recently used viewer goes
+    assert index._lookup("viewer-1", now) is None
+    assert str(second[2]) in index._lookup("viewer-2", now)
+    assert index.stats()["member_ids"] == 3
+    assert index.stats()["member_id_bytes"] == 3 * 16
+
+    # a viewer holding more than max_ids ids is never cached
+    index._load("viewer-3", [(uuid.uuid4(),) for _ in range(6)], now)
+    assert index._lookup("viewer-3", now) is None
+    assert len(index) == 1
+
+
+def test_failing_after_commit_callback_keeps_the_committed_write(app, database, make_user):
+    viewer, _ = make_user()
+    target, _ = make_user()
+    viewer_id, target_id = _user_id(database, viewer), _user_id(database, target)
+    ran = []
+
+    def fail():
+        raise RuntimeError("callback failed")
+
+    with app.test_request_context(method="POST"):
+        with get_db_connection() as conn:
+            conn.execute(
+                text("INSERT INTO user_follows (user_id, following_user_id) VALUES (:f, :t)"),
+                {"f": viewer_id, "t": target_id},
+            )
+            after_commit(fail)
+            after_commit(lambda: ran.append(True))
+
+    assert ran == [True]
+    with app.test_request_context(method="GET"):
+        with get_db_connection(read_only=False) as conn:
+            assert target_id in follow_index.get(conn, viewer_id)
+
+
+def test_forged_or_unbounded_bypass_is_ignored(app, database, make_user):
+    follower, viewer = make_user()
+    target, _ = make_user()
+    assert app.test_client().get(f"/api/profiles/{target}", headers=viewer).json["profile"]["following"] is False
+    _follow_elsewhere(database, follower, target)
+
+    unsigned = {PRIMARY_PIN_HEADER: f"0:{time.time() + 20:.0f}"}
+    forged = {PRIMARY_PIN_HEADER: format_pin_token(PinToken(caches_until=time.time() + 20), "not-the-secret")}
+    # signed, but further ahead than the index ever hands out
+    forever = _cache_bypass(app, seconds=follow_index.stats()["ttl_seconds"] + 3600)
+    for headers in (unsigned, forged, forever):
+        response = app.test_client().get(f"/api/profiles/{target}", headers={**viewer, **headers})
+        assert response.json["profile"]["following"] is False
@@ -0,0 +1,40 @@
+import pytest
+from realworld.api.core.db import connection_budget, get_database_config
+from realworld.serve import apply_worker_pool_budget
+
+POOL_VARIABLES = ("DB_POOL_SIZE", "DB_MAX_OVERFLOW", "DB_READ_POOL_SIZE", "DB_READ_MAX_OVERFLOW")
+
+
+@pytest.fixture(autouse=True)
+def pool_environment(monkeypatch):
+    for name in POOL_VARIABLES:
+        monkeypatch.delenv(name, raising=False)
+    return monkeypatch
+
+
+def test_read_pool_is_carved_out_of_the_pool_settings(pool_environment):
+    pool_environment.setenv("DB_POOL_SIZE", "10")
+    pool_environment.setenv("DB_MAX_OVERFLOW", "20")
+    db_config = get_database_config()
+    assert (db_config["pool_size"], db_config["read_pool_size"]) == (5, 5)
+    assert (db_config["max_overflow"], db_config["read_max_overflow"]) == (10, 10)
+    assert connection_budget(db_config) == 30
+
+
+def test_explicit_read_pool_is_carved_out_too(pool_environment):
+    pool_environment.setenv("DB_POOL_SIZE", "10")
+    pool_environment.setenv("DB_MAX_OVERFLOW", "20")
+    pool_environment.setenv("DB_READ_POOL_SIZE", "4")
+    pool_environment.setenv("DB_READ_MAX_OVERFLOW", "50")
+    db_config = get_database_config()
+    assert (db_config["pool_size"], db_config["read_pool_size"]) == (6, 4)
+    # more than the whole budget leaves the write pool its minimum
+    assert (db_config["max_overflow"], db_config["read_max_overflow"]) == (0, 20)
+    assert connection_budget(db_config) == 30
+
+
+def test_workers_share_the_task_budget(pool_environment):
+    pool_environment.setenv("DB_POOL_SIZE", "16")
+    pool_environment.setenv("DB_MAX_OVERFLOW", "8")
+    assert apply_worker_pool_budget(4) == {"DB_POOL_SIZE": 4, "DB_MAX_OVERFLOW": 2}
+    assert connection_budget(get_database_config()) * 4 == 24
@@ -0,0 +1,59 @@
+import time
+import pytest
+from realworld.api.core.db import registry, _select_replica_engine
+from realworld.api.core.health import ReplicaLagProber
+from realworld.api.core.query_budget import get_query_count
+
+
+@pytest.fixture
+def replicas(database, monkeypatch):
+    """Configure DB_REPLICA_HOSTS for one test, the registry is rebuilt before and after"""
+
+    def configure(*hosts):
+        monkeypatch.setenv("DB_REPLICA_HOSTS", ",".join(hosts))
+        registry.reset()
+        return registry.replicas
+
+    yield configure
+    monkeypatch.undo()
+    registry.reset()
+
+
+@pytest.fixture
+def prober():
+    prober = ReplicaLagProber()
+    yield prober
+    prober.stop()
+
+
+def test_replica_without_a_lag_measurement_is_skipped(app, replicas):
+    replicas("localhost:5432")
+    with app.test_request_context(method="GET"):
+        assert _select_replica_engine() is None
+        assert get_query_count() == 0
+
+
+def test_lag_is_probed_outside_the_request(app, replicas, prober):
+    # a primary is not a standby, its lag is 0
+    [replica] = replicas("localhost:5432")
+    prober.ensure_started()
+    prober.probe()
+    assert replica.lag_seconds == 0
+
+    with app.test_request_context(method="GET"):
+        assert _select_replica_engine() is replica.engine
+        assert get_query_count() == 0
+    response = app.test_client().get("/api/articles")
+    assert response.status_code == 200, response.json
+
+
+def test_unreachable_replica_does_not_hold_up_requests(app, replicas, prober):
+    [replica] = replicas("localhost:1")
+    prober.ensure_started()
+    prober.probe()
+    assert replica.lag_seconds == float("inf")
+
+    started_at = time.perf_counter()
+    with app.test_request_context(method="GET"):
+        assert _select_replica_engine() is None
+    assert time.perf_counter() - started_at < 0.1
@@ -0,0 +1,26 @@
+import os
+import importlib.util
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts", "profile-startup.py")
+MODULE = "realworld.app"
+# same budget as scripts/profile-startup.py --budget-ms in the deploy workflow
+BUDGET_MS = float(os.getenv("STARTUP_IMPORT_BUDGET_MS", "1500"))
+REPEAT = 3
+
+
+def _load_profiler():
+    spec = importlib.util.spec_from_file_location("profile_startup", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_app_imports_within_the_cold_start_budget():
+    """Scale-out tasks cannot serve until the app is imported, the fastest of a few fresh interpreters counts"""
+    profiler = _load_profiler()
+    timings_ms = []
+    for _ in range(REPEAT):
+        target = profiler._find(profiler._profile(MODULE), MODULE)
+        assert target is not None, f"{MODULE} was not imported"
+        timings_ms.append(target.cumulative_us / 1000)
+    assert min(timings_ms) <= BUDGET_MS, f"import {MODULE} took {min(timings_ms):.1f}ms, budget is {BUDGET_MS:g}ms"